@@ -0,0 +1,187 @@
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from string import Template
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agenda_templates')
+RULES_FILE = 'rules.json'
+AGENDA_CACHE_SIZE = int(os.environ.get('SMARTSTART_AGENDA_CACHE_SIZE', 1024))
+
+# How often render() looks at the template files for changes
+RELOAD_CHECK_SECONDS = float(os.environ.get('SMARTSTART_AGENDA_RELOAD_SECONDS', 2))
+
+# Attendee-count buckets: (largest count, name used in rules, $size in templates)
+BUCKETS = ((0, 'none', 'no attendees'), (1, 'one', 'one-on-one'), (5, 'small', 'small group'),
+           (15, 'medium', 'team'))
+LARGE_BUCKET = ('large', 'large group')
+_BUCKET_BOUNDS = [bound for bound, _, _ in BUCKETS]
+
+# Placeholders a template may use
+TEMPLATE_FIELDS = {'title', 'size'}
+
+def normalize_title(title):
+    """Collapse runs of whitespace, so near-identical titles share a cached agenda"""
+    return ' '.join((title or '').split())
+
+def attendee_bucket(attendee_count):
+    """(name, label) of the size bucket an attendee count falls in"""
+    index = bisect_left(_BUCKET_BOUNDS, attendee_count)
+    return BUCKETS[index][1:] if index < len(BUCKETS) else LARGE_BUCKET
+
+class _Rule:
+    __slots__ = ('template', 'buckets', 'pattern')
+
+    def __init__(self, template, buckets, pattern):
+        self.template = template
+        self.buckets = buckets
+        self.pattern = pattern
+
+    def matches(self, lowered_title, bucket):
+        if self.buckets is not None and bucket not in self.buckets:
+            return False
+        return self.pattern is None or self.pattern.search(lowered_title) is not None
+
+def _placeholders(template):
+    """Names a string.Template substitutes, or None if it has a malformed $
+
+    Template.get_identifiers() and is_valid() only exist from Python 3.11.
+    """
+    names = set()
+    for match in template.pattern.finditer(template.template):
+        if match.group('invalid') is not None:
+            return None
+        name = match.group('named') or match.group('braced')
+        if name is not None:
+            names.add(name)
+    return names
+
+def _signature(directory):
+    """Name, mtime and size of every file in a directory, to notice edits"""
+    return tuple(sorted((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                        for entry in os.scandir(directory) if entry.is_file()))
+
+def _compile(directory):
+    """Templates, rule table and signature of a template directory; ValueError if unusable"""
+    # Taken first, so an edit made while loading is picked up by the next check
+    signature = _signature(directory)
+    templates = {}
+    for filename, _, _ in signature:
+        name, extension = os.path.splitext(filename)
+        if extension != '.txt':
+            continue
+        with open(os.path.join(directory, filename), encoding='utf-8') as f:
+            template = Template(f.read().rstrip('\n'))
+        placeholders = _placeholders(template)
+        if placeholders is None or placeholders - TEMPLATE_FIELDS:
+            raise ValueError(f'{filename}: invalid placeholder(s), expected only ${", $".join(sorted(TEMPLATE_FIELDS))}')
+        templates[name] = template
+
+    with open(os.path.join(directory, RULES_FILE), encoding='utf-8') as f:
+        rule_specs = json.load(f)
+    bucket_names = {name for _, name, _ in BUCKETS} | {LARGE_BUCKET[0]}
+    rules = []
+    for spec in rule_specs:
+        if spec.get('template') not in templates:
+            raise ValueError(f"{RULES_FILE}: unknown template {spec.get('template')!r}")
+        buckets = set(spec['attendees']) if 'attendees' in spec else None
+        if buckets is not None and buckets - bucket_names:
+            raise ValueError(f'{RULES_FILE}: unknown attendee bucket(s) {sorted(buckets - bucket_names)}')
+        keywords = spec.get('keywords')
+        # Keywords match anywhere in the lower-cased title
+        pattern = re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords)) if keywords else None
+        rules.append(_Rule(spec['template'], buckets, pattern))
+    if not rules or rules[-1].buckets is not None or rules[-1].pattern is not None:
+        raise ValueError(f'{RULES_FILE}: the last rule must be a catch-all default')
+    return templates, rules, signature
+
+class AgendaTemplates:
+    """Meeting agendas from a directory of template files, chosen by a rule table
+
+    Each <name>.txt file is a string.Template ($title, $size) compiled once
+    when the directory is loaded. rules.json lists rules in priority order;
+    a rule matches on attendee-count buckets ("attendees") and/or title
+    keywords ("keywords"), and the last one is the default. Rendered
+    agendas are cached by (template, normalized title, bucket) with LRU
+    eviction.
+
+    Edits to the directory are picked up without a restart: at most every
+    RELOAD_CHECK_SECONDS, render() compares file modification times and
+    reloads everything (clearing the cache) when they changed. A directory
+    that fails to load leaves the previous templates in place.
+    """
+
+    def __init__(self, directory=TEMPLATE_DIR, cache_size=AGENDA_CACHE_SIZE, check_interval=RELOAD_CHECK_SECONDS):
+        self.directory = directory
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._next_check = 0.0
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'reloads': 0, 'reload_errors': 0}
+        self._templates, self._rules, self._signature = _compile(directory)
+
+    def _check_reload(self):
+        # Called with the lock held
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            signature = _signature(self.directory)
+        except OSError as exc:
+            print(f'❌ Could not check agenda templates: {exc}')
+            return
+        if signature == self._signature:
+            return
+        try:
+            self._templates, self._rules, self._signature = _compile(self.directory)
+        except (OSError, ValueError) as exc:
+            # Not retried until the files change again
+            self._signature = signature
+            self.counters['reload_errors'] += 1
+            print(f'❌ Could not reload agenda templates, keeping the previous ones: {exc}')
+            return
+        self._cache.clear()
+        self.counters['reloads'] += 1
+        print(f'🔄 Reloaded {len(self._templates)} agenda templates')
+
+    def choose(self, title, attendee_count):
+        """Name of the template the rules pick for a meeting"""
+        with self._lock:
+            self._check_reload()
+            return self._choose(normalize_title(title).lower(), attendee_bucket(attendee_count)[0])
+
+    def _choose(self, lowered_title, bucket):
+        for rule in self._rules:
+            if rule.matches(lowered_title, bucket):
+                return rule.template
+
+    def render(self, title, attendee_count):
+        """Agenda text for a meeting title and number of attendees"""
+        title = normalize_title(title)
+        bucket, size = attendee_bucket(attendee_count)
+        with self._lock:
+            self._check_reload()
+            name = self._choose(title.lower(), bucket)
+            key = (name, title, bucket)
+            agenda = self._cache.get(key)
+            if agenda is not None:
+                self._cache.move_to_end(key)
+                self.counters['hits'] += 1
+                return agenda
+            self.counters['misses'] += 1
+            agenda = self._templates[name].safe_substitute(title=title, size=size)
+            self._cache[key] = agenda
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.counters['evictions'] += 1
+        return agenda
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, templates=sorted(self._templates), rules=len(self._rules),
+                        cached=len(self._cache), cache_size=self.cache_size)
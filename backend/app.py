@@ -1,28 +1,52 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import json
 import os
 import hashlib
 from datetime import datetime, timedelta
 import uuid
 import random
+import threading
+from werkzeug.test import EnvironBuilder
+
+from conditional import ConditionalGet
+from dashboard import DashboardAggregates
+from employee_views import EmployeeChanges
+from org_tree import SCOPES, TEAM, OrgTree
+from search_index import TeamSearchIndex
+from events import RETRY_SECONDS as STREAM_RETRY_SECONDS, hub
+from fanout import NotificationFanout
+from agendas import AgendaTemplates
+from availability import (TIME_SLOTS, cache_info as availability_cache_info, date_range, member_statuses,
+                          suggest_slots, team_availability, team_availability_range)
+from mailer import MailQueue, render_invitation, transport_from_env
+from meeting_calendar import SLOTS_PER_HOUR, MeetingCalendar, MeetingConflict, parse_time_slot
+from pagination import MAX_LIMIT, parse_page_args
+from reminders import ReminderScheduler, meeting_start, request_start
+from storage import DATA_DIR, cache_stats, get_repository
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['ETag', 'X-Next-Cursor', 'X-Prev-Cursor', 'X-Total-Count'])
 
-def load_data(filename):
-    """Load data from JSON file"""
-    try:
-        with open(f'data/{filename}', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+repo = get_repository()
+calendar = MeetingCalendar(repo)
+agendas = AgendaTemplates()
+versioned = ConditionalGet(repo)
+mail_queue = MailQueue(transport_from_env())
+employee_changes = EmployeeChanges(repo)
+org = employee_changes.register(OrgTree(repo))
+dashboard = employee_changes.register(DashboardAggregates(repo, org))
+team_search = employee_changes.register(TeamSearchIndex(repo))
+
+# ETag inputs for routes that also depend on the clock: member statuses change
+# daily and the 7-day escalation window moves continuously
+def current_day():
+    return datetime.now().strftime('%Y-%m-%d')
 
-def save_data(filename, data):
-    """Save data to JSON file"""
-    os.makedirs('data', exist_ok=True)
-    with open(f'data/{filename}', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def current_minute():
+    return datetime.now().strftime('%Y-%m-%dT%H:%M')
+
+# Hourly availability slots as 15-minute slot windows in the booked-meeting calendar
+HOURLY_WINDOWS = [(parse_time_slot(time), parse_time_slot(time) + SLOTS_PER_HOUR) for time in TIME_SLOTS]
 
 def generate_member_status(member_id, date):
     """Generate dynamic status based on member ID and date"""
@@ -60,54 +84,8 @@ def generate_member_schedule(member_id, date):
 
 def generate_team_availability_with_details(date, team_members):
     """Generate detailed team availability for a specific date"""
-    times = ['9:00 AM', '10:00 AM', '11:00 AM', '2:00 PM', '3:00 PM']
-    availability = []
-    
-    for time in times:
-        available_members = []
-        unavailable_members = []
-        
-        for member in team_members:
-            member_schedule = generate_member_schedule(member['id'], date)
-            time_slot = next((slot for slot in member_schedule if slot['time'] == time), None)
-            
-            if time_slot and time_slot['available'] and member['status'] == 'available':
-                available_members.append({
-                    'id': member['id'],
-                    'name': member['name'],
-                    'role': member['role']
-                })
-            else:
-                reason = 'Away' if member['status'] != 'available' else (time_slot['meeting'] if time_slot and time_slot['meeting'] else 'Busy')
-                unavailable_members.append({
-                    'id': member['id'],
-                    'name': member['name'],
-                    'role': member['role'],
-                    'reason': reason
-                })
-        
-        available_count = len(available_members)
-        total_members = len(team_members)
-        
-        if available_count <= 5:
-            status = 'poor'
-        elif available_count <= 8:
-            status = 'limited'
-        else:
-            status = 'excellent'
-        
-        availability.append({
-            'time': time,
-            'availableMembers': available_members,
-            'unavailableMembers': unavailable_members,
-            'status': status,
-            'allAvailable': available_count == total_members,
-            'availableCount': available_count,
-            'canScheduleTeam': available_count >= 5,
-            'canScheduleSmall': available_count >= 2
-        })
-    
-    return availability
+    # Computed over the whole members x slots matrix in one pass, with booked meetings marked busy
+    return team_availability(date, team_members, calendar.slot_lookup(HOURLY_WINDOWS))
 
 def generate_meeting_link(title, platform='google_meet'):
     """Generate realistic meeting links"""
@@ -134,186 +112,153 @@ def generate_meeting_link(title, platform='google_meet'):
             'meeting_code': meeting_code
         }
 
-def generate_professional_agenda(title, attendee_count):
-    """Generate professional meeting agenda templates"""
-    
-    if attendee_count == 1:
-        return f"""🤖 AI-Generated Agenda for: {title}
-Meeting Type: One-on-One Meeting
-
-📋 Finance One-on-One Meeting Agenda
-
-1. Personal Check-in (5 minutes)
-   - How are things going overall?
-   - Work-life balance discussion
-
-2. Current Finance Work Discussion (15 minutes)
-   - Budget analysis progress and challenges
-   - Support needed from manager/colleague
-   - Recent financial accomplishments
-
-3. Professional Development (10 minutes)
-   - Finance skill building opportunities
-   - Career goals and certifications (CPA, CFA)
-   - Training or learning needs
-
-4. Feedback Exchange (10 minutes)
-   - Performance feedback
-   - Process improvement suggestions
-   - Open communication
-
-5. Action Planning (10 minutes)
-   - Next steps and priorities
-   - Goal setting for upcoming period
-   - Resource requirements
-
-📝 Follow-up Actions:
-- [ ] Financial analysis task - Due: [Date]
-- [ ] Budget review completion - Due: [Date]
-
-💡 Meeting Tips:
-- Start and end on time
-- Keep discussions focused
-- Encourage open communication
-- Document decisions and action items"""
-    
-    elif 'budget' in title.lower() or 'financial' in title.lower():
-        return f"""🤖 AI-Generated Agenda for: {title}
-Meeting Type: Financial Planning Meeting
-
-📋 Financial Planning Meeting Agenda
-
-1. Budget Overview (10 minutes)
-   - Current budget status and variance analysis
-   - Key financial metrics and KPIs
-   - Timeline adherence
-
-2. Financial Analysis Discussion (20 minutes)
-   - Revenue and expense analysis
-   - Cash flow projections
-   - Risk assessment and mitigation
-
-3. Resource & Budget Review (10 minutes)
-   - Department budget allocation
-   - Expense approvals and adjustments
-   - Cost center performance
-
-4. Compliance & Audit (10 minutes)
-   - Regulatory compliance status
-   - Internal audit findings
-   - Documentation requirements
-
-5. Next Period Planning (10 minutes)
-   - Upcoming financial tasks and priorities
-   - Role assignments
-   - Deliverable timelines
-
-📝 Action Items:
-- [ ] Budget variance report - Assigned to: [Name] - Due: [Date]
-- [ ] Financial statement review - Assigned to: [Name] - Due: [Date]
-
-💡 Meeting Tips:
-- Start and end on time
-- Keep discussions focused
-- Ensure compliance requirements are met
-- Document all financial decisions"""
-    
-    else:
-        return f"""🤖 AI-Generated Agenda for: {title}
-Meeting Type: Finance Team Meeting
-
-📋 Finance Team Meeting Agenda
-
-1. Opening & Check-ins (5 minutes)
-   - Welcome and attendance
-   - Quick status updates from team members
-
-2. Financial Updates (15 minutes)
-   - Monthly/quarterly financial status review
-   - Key milestones and deliverables
-   - Budget variance and challenges discussion
-
-3. Key Discussion Points (15 minutes)
-   - Strategic financial initiatives
-   - Process improvements
-   - Compliance and audit updates
-
-4. Action Items & Next Steps (10 minutes)
-   - Task assignments
-   - Deadlines and priorities
-   - Follow-up meetings if needed
-
-5. Closing (5 minutes)
-   - Questions and clarifications
-   - Next meeting scheduling
-
-📝 Action Items Template:
-- [ ] Financial report preparation - Assigned to: [Name] - Due: [Date]
-- [ ] Budget analysis completion - Assigned to: [Name] - Due: [Date]
-
-💡 Meeting Tips:
-- Start and end on time
-- Keep discussions focused
-- Ensure regulatory compliance
-- Document all financial decisions and action items"""
-
-def create_notification(type, title, message, recipient_ids=None, meeting_request_id=None):
-    """Create a notification"""
+_notification_id_lock = threading.Lock()
+_last_notification_id = 0
+
+def next_notification_id():
+    """Millisecond timestamp id for a notification event, bumped so events created in the same millisecond stay distinct
+
+    Inbox entries get their own ids from the store.
+    """
+    global _last_notification_id
+    with _notification_id_lock:
+        _last_notification_id = max(int(datetime.now().timestamp() * 1000), _last_notification_id + 1)
+        return _last_notification_id
+
+DEFAULT_MANAGER_ID = 'mgr_001'
+
+def manager_args():
+    """(manager_id, scope) for manager routes; raises ValueError on a bad scope, LookupError on an unknown manager"""
+    manager_id = request.args.get('manager_id', DEFAULT_MANAGER_ID)
+    scope = request.args.get('scope', TEAM)
+    if scope not in SCOPES:
+        raise ValueError(f"scope must be one of: {', '.join(SCOPES)}")
+    if not org.is_manager(manager_id):
+        raise LookupError(f'Manager {manager_id} not found')
+    return manager_id, scope
+
+def paged_response(body, page):
+    """JSON response for a cursor page; cursors go in the body (if it is an object) and in headers"""
+    if isinstance(body, dict):
+        body.update(next_cursor=page.next_cursor, prev_cursor=page.prev_cursor)
+    response = jsonify(body)
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+    if page.prev_cursor:
+        response.headers['X-Prev-Cursor'] = page.prev_cursor
+    return response
+
+def stream_topics(user_ids=(), employee_ids=()):
+    """Stream topics for users (e.g. 'emp_001') and employees (numeric ids), plus their managers"""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    employee_ids = set(employee_ids)
+    topics = set()
+    for employee in repo.list_employees():
+        if employee['id'] in employee_ids or employee.get('employee_id') in user_ids:
+            user_ids.add(employee.get('employee_id'))
+            if employee.get('manager_id'):
+                topics.add(f"manager:{employee['manager_id']}")
+    managers = repo.get_managers()
+    topics.update(f'user:{user_id}' for user_id in user_ids)
+    topics.update(f'manager:{user_id}' for user_id in user_ids if user_id in managers)
+    return topics
+
+# Bookkeeping of the fan-out, kept out of API responses
+INTERNAL_NOTIFICATION_FIELDS = ('delivery_key', 'event_id')
+
+def public_notification(notification):
+    """An inbox entry as clients see it"""
+    return {key: value for key, value in notification.items() if key not in INTERNAL_NOTIFICATION_FIELDS}
+
+def publish_notification(notification):
+    """Push a stored inbox entry to open streams"""
+    topics = [f'user:{recipient_id}' for recipient_id in notification['recipient_ids']] or ['*']
+    hub.publish('notification', public_notification(notification), topics)
+
+fanout = NotificationFanout(repo, publish=publish_notification)
+
+def create_notification(type, title, message, recipient_ids=None, meeting_request_id=None, key=None):
+    """Create a notification
+
+    Delivery to the recipients' inboxes happens in the background; key makes
+    it idempotent (the same key and recipient is only ever delivered once).
+    """
+    # Stored as strings by every backend, so 7 and '7' reach the same inbox
+    recipient_ids = list(dict.fromkeys(str(recipient_id) for recipient_id in recipient_ids or []))
     notification = {
-        'id': int(datetime.now().timestamp() * 1000),
+        'id': next_notification_id(),
         'type': type,  # 'meeting_invite', 'meeting_update', 'meeting_reminder', 'system'
         'title': title,
         'message': message,
-        'recipient_ids': recipient_ids or [],
+        'recipient_ids': recipient_ids,
         'meeting_request_id': meeting_request_id,
         'created_at': datetime.now().isoformat(),
         'read': False
     }
     
-    # Save notification to data file
-    notifications_data = load_data('notifications.json')
-    if 'notifications' not in notifications_data:
-        notifications_data['notifications'] = []
-    
-    notifications_data['notifications'].append(notification)
-    save_data('notifications.json', notifications_data)
-    
-    return notification
+    # One inbox entry per recipient, written and pushed to open streams by the fan-out worker
+    return fanout.submit(notification, key)
 
-def simulate_email_sending(meeting_data):
-    """Enhanced email simulation with meeting links and detailed content"""
-    attendees = meeting_data.get('attendees', [])
-    attendee_count = len(attendees)
-    meeting_link_data = meeting_data.get('meeting_link_data', {})
-    
-    print("\n" + "="*70)
-    print("📧 BPI FINANCE DEPARTMENT MEETING INVITATION")
-    print("="*70)
-    print(f"📋 Meeting: {meeting_data.get('title', 'Finance Team Meeting')}")
-    print(f"📅 Date: {meeting_data.get('date', 'TBD')}")
-    print(f"⏰ Time: {meeting_data.get('time', 'TBD')}")
-    print(f"⏱️ Duration: {meeting_data.get('duration', '30 minutes')}")
-    print(f"🎥 Platform: {meeting_data.get('video_platform', 'Google Meet').title()}")
-    
-    # Enhanced meeting link display
-    if meeting_link_data:
-        print(f"🔗 Meeting Link: {meeting_link_data.get('url', 'N/A')}")
-        if meeting_data.get('video_platform') == 'zoom':
-            print(f"🆔 Meeting ID: {meeting_link_data.get('meeting_id', 'N/A')}")
-            print(f"🔑 Passcode: {meeting_link_data.get('passcode', 'N/A')}")
-        else:
-            print(f"📱 Meeting Code: {meeting_link_data.get('meeting_code', 'N/A')}")
-    
-    print(f"👥 Finance Team Attendees ({attendee_count}): {', '.join(attendees)}")
-    
-    if meeting_data.get('agenda'):
-        print(f"📋 Custom Agenda: {meeting_data['agenda']}")
-    
-    if meeting_data.get('ai_agenda'):
-        print(f"\n🤖 AI-Generated Finance Agenda:\n{meeting_data['ai_agenda']}")
-    
-    print("="*70)
-    return True
+def meeting_invitation(meeting_data):
+    """Invitation emails for a meeting's attendees; runs on a mail worker"""
+    attendee_ids = set(meeting_data.get('attendeeIds', []))
+    recipients = [(employee['name'], employee['email']) for employee in repo.list_employees()
+                  if employee['id'] in attendee_ids and employee.get('email')]
+    return render_invitation(meeting_data, recipients)
+
+def meeting_reminder_source(meeting):
+    """A booked meeting as (key, start, payload) for the reminder scheduler"""
+    starts_at = meeting_start(meeting)
+    return (f"meeting:{meeting['id']}", starts_at, {
+        'title': meeting.get('title', 'Finance Team Meeting'),
+        'starts_at': starts_at,
+        'when': f"{meeting.get('date')} at {meeting.get('time')}",
+        'recipient_ids': meeting.get('attendeeIds', []),
+        'meeting_request_id': None
+    })
+
+def request_reminder_source(meeting_request):
+    """An accepted meeting request as (key, start, payload) for the reminder scheduler"""
+    starts_at = request_start(meeting_request)
+    return (f"meeting_request:{meeting_request['id']}", starts_at, {
+        'title': meeting_request.get('title') or 'Meeting',
+        'starts_at': starts_at,
+        'when': starts_at.strftime('%Y-%m-%d at %I:%M %p') if starts_at else None,
+        'recipient_ids': [meeting_request['from_user'], meeting_request['to_user']],
+        'meeting_request_id': meeting_request['id']
+    })
+
+def reminder_sources():
+    """Every stored meeting and accepted meeting request that has a start time"""
+    sources = [meeting_reminder_source(meeting) for meeting in repo.list_meetings()]
+    sources += [request_reminder_source(meeting_request)
+                for meeting_request in repo.list_meeting_requests_by_status('accepted')]
+    return [source for source in sources if source[1] is not None]
+
+def send_reminder(key, offset, payload):
+    """Notify a meeting's participants; the key makes a repeated reminder a no-op"""
+    # A reminder sent late (the server was down at its offset) says how long is actually left
+    minutes = min(offset, max(1, round((payload['starts_at'] - datetime.now()).total_seconds() / 60)))
+    create_notification(
+        'meeting_reminder',
+        f"Reminder: {payload['title']}",
+        f"\"{payload['title']}\" starts in {minutes} minutes ({payload['when']})",
+        payload['recipient_ids'],
+        payload['meeting_request_id'],
+        key=f'reminder:{key}:{offset}'
+    )
+
+def reminder_versions():
+    return repo.version('meetings'), repo.version('meeting_requests')
+
+reminders = ReminderScheduler(reminder_sources, send_reminder, versions=reminder_versions)
+
+@app.before_request
+def start_reminders():
+    # Started on the first request rather than at import, so each forked worker gets its own thread
+    # (serve.py turns this off while it warms the app up in the master, before forking)
+    if app.config.get('START_REMINDERS', True):
+        reminders.ensure_started()
 
 def initialize_default_data():
     """Initialize default unified employee data"""
@@ -487,11 +432,7 @@ def initialize_default_data():
     }
     
     # Save all data
-    save_data('employees.json', unified_employees)
-    save_data('meeting_requests.json', {'meeting_requests': template_meeting_requests})
-    save_data('meetings.json', {'meetings': [], 'requests': []})
-    save_data('notifications.json', {'notifications': []})
-    save_data('manager_data.json', manager_data)
+    repo.seed(unified_employees, template_meeting_requests, manager_data)
 
 # ===== UNIFIED API ROUTES =====
 
@@ -499,39 +440,89 @@ def initialize_default_data():
 @app.route('/api/teams/members/<date>', methods=['GET'])
 def get_team_members_for_date(date):
     """Get finance team members with dynamic status for a specific date"""
-    data = load_data('employees.json')
-    base_members = data.get('employees', [])
+    base_members = repo.list_employees()
     
     # Generate dynamic status for each member based on the date
-    members_with_status = []
-    for member in base_members:
-        member_copy = member.copy()
-        member_copy['status'] = generate_member_status(member['id'], date)
-        members_with_status.append(member_copy)
+    statuses = member_statuses([member['id'] for member in base_members], date)
+    members_with_status = [dict(member, status=status) for member, status in zip(base_members, statuses)]
     
     return jsonify(members_with_status)
 
 @app.route('/api/schedules/team/<date>', methods=['GET'])
 def get_team_availability(date):
     """Get detailed finance team availability for a specific date"""
-    data = load_data('employees.json')
-    base_members = data.get('employees', [])
+    base_members = repo.list_employees()
     
     # Generate dynamic status for each member
-    team_members = []
-    for member in base_members:
-        member_copy = member.copy()
-        member_copy['status'] = generate_member_status(member['id'], date)
-        team_members.append(member_copy)
+    statuses = member_statuses([member['id'] for member in base_members], date)
+    team_members = [dict(member, status=status) for member, status in zip(base_members, statuses)]
     
     # Generate detailed team availability
     availability = generate_team_availability_with_details(date, team_members)
     return jsonify(availability)
 
+@app.route('/api/schedules/team/range', methods=['GET'])
+def get_team_availability_range():
+    """Get finance team availability for every date in a range (e.g. a calendar week or month)"""
+    start = request.args.get('start')
+    end = request.args.get('end', start)
+    if not start:
+        return jsonify({'error': 'start date is required'}), 400
+    try:
+        dates = date_range(start, end)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid date range: {str(e)}'}), 400
+    
+    days = team_availability_range(dates, repo.list_employees(), calendar.slot_lookup(HOURLY_WINDOWS))
+    return jsonify({'start': dates[0], 'end': dates[-1], 'days': days})
+
+@app.route('/api/schedules/suggest', methods=['POST'])
+def suggest_meeting_slots():
+    """Suggest the best meeting slots for a group of attendees across a date window"""
+    data = request.get_json() or {}
+    attendee_ids = data.get('attendee_ids') or data.get('attendeeIds') or []
+    if not attendee_ids:
+        return jsonify({'error': 'attendee_ids are required'}), 400
+    if not isinstance(attendee_ids, list) or not all(
+            isinstance(attendee_id, (int, str)) and not isinstance(attendee_id, bool) for attendee_id in attendee_ids):
+        return jsonify({'error': 'attendee_ids must be a list of ids'}), 400
+    
+    start = data.get('start') or datetime.now().strftime('%Y-%m-%d')
+    try:
+        end = data.get('end') or (datetime.fromisoformat(start) + timedelta(days=13)).strftime('%Y-%m-%d')
+        dates = date_range(start, end)
+        # Accept either minutes or the frontend's "30 minutes" labels
+        duration = int(str(data.get('duration', 30)).split()[0])
+        quorum = int(data.get('quorum', len(attendee_ids)))
+        top_k = min(int(data.get('top_k', 5)), 50)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid request: {str(e)}'}), 400
+    if duration <= 0 or top_k <= 0:
+        return jsonify({'error': 'duration and top_k must be positive'}), 400
+    
+    if data.get('skip_weekends', True):
+        dates = [d for d in dates if datetime.fromisoformat(d).weekday() < 5]
+    
+    suggestions = suggest_slots(attendee_ids, dates, duration, max(1, min(quorum, len(attendee_ids))), top_k,
+                                calendar.slot_lookup(HOURLY_WINDOWS))
+    return jsonify({
+        'attendee_count': len(attendee_ids),
+        'duration': duration,
+        'quorum': quorum,
+        'suggestions': suggestions
+    })
+
 @app.route('/api/schedules/member/<int:member_id>/<date>', methods=['GET'])
 def get_member_schedule(member_id, date):
     """Get individual finance member schedule for a specific date"""
     schedule = generate_member_schedule(member_id, date)
+    
+    # Booked meetings take precedence over the simulated schedule
+    booked = calendar.slot_lookup(HOURLY_WINDOWS)(member_id, date)
+    for slot, title in zip(schedule, booked):
+        if title:
+            slot['available'] = False
+            slot['meeting'] = title
     return jsonify(schedule)
 
 # Meeting routes
@@ -547,13 +538,12 @@ def create_meeting():
     if not meeting_data.get('attendees'):
         return jsonify({'success': False, 'error': 'Attendees are required'}), 400
     
+    allow_conflicts = bool(meeting_data.pop('allow_conflicts', None))
+    
     # Generate AI agenda if requested
     if meeting_data.get('use_ai'):
         attendee_count = len(meeting_data.get('attendees', []))
-        enhanced_agenda = generate_professional_agenda(
-            meeting_data.get('title', ''),
-            attendee_count
-        )
+        enhanced_agenda = agendas.render(meeting_data.get('title', ''), attendee_count)
         meeting_data['ai_agenda'] = enhanced_agenda
     
     # Generate meeting link with detailed info
@@ -563,28 +553,46 @@ def create_meeting():
     meeting_data['meeting_link'] = meeting_link_data['url']
     meeting_data['video_platform'] = video_platform
     
-    # Create notification for attendees
     attendee_ids = meeting_data.get('attendeeIds', [])
-    notification = create_notification(
-        'meeting_invite',
-        f'Finance Meeting: {meeting_data.get("title")}',
-        f'You have been invited to "{meeting_data.get("title")}" on {meeting_data.get("date")} at {meeting_data.get("time")}',
-        attendee_ids
-    )
-    
-    # Simulate email sending with enhanced content
-    email_result = simulate_email_sending(meeting_data)
-    
-    # Save meeting
-    meetings = load_data('meetings.json')
-    meeting_data['id'] = len(meetings.get('meetings', [])) + 1
     meeting_data['created_at'] = datetime.now().isoformat()
-    meeting_data['notification_id'] = notification['id']
+    invited = []
+    
+    def invite(conflicts):
+        # Runs once the meeting is known to fit, inside the meetings write
+        if conflicts:
+            meeting_data['conflicts'] = conflicts
+        notification = create_notification(
+            'meeting_invite',
+            f'Finance Meeting: {meeting_data.get("title")}',
+            f'You have been invited to "{meeting_data.get("title")}" on {meeting_data.get("date")} at {meeting_data.get("time")}',
+            attendee_ids
+        )
+        meeting_data['notification_id'] = notification['id']
+        invited.append(notification)
     
-    if 'meetings' not in meetings:
-        meetings['meetings'] = []
-    meetings['meetings'].append(meeting_data)
-    save_data('meetings.json', meetings)
+    # Save meeting, unless it double-books an attendee; checked in the same write, so it holds across workers
+    versions_before = reminder_versions()
+    try:
+        conflicts = calendar.book(meeting_data, repo.add_meeting, allow_conflicts, prepare=invite)
+    except MeetingConflict as e:
+        return jsonify({
+            'success': False,
+            'error': 'Scheduling conflict with existing meetings',
+            'conflicts': e.conflicts
+        }), 409
+    notification = invited[0]
+    reminders.schedule(*meeting_reminder_source(meeting_data))
+    reminders.record_write(versions_before, reminder_versions())
+    
+    # Invitations are rendered and sent by the mail workers, not while the request waits
+    email_result = mail_queue.submit(meeting_invitation, dict(meeting_data))
+    hub.publish('meeting', {
+        'id': meeting_data['id'],
+        'title': meeting_data.get('title'),
+        'date': meeting_data.get('date'),
+        'time': meeting_data.get('time'),
+        'attendeeIds': attendee_ids
+    }, stream_topics(employee_ids=attendee_ids))
     
     return jsonify({
         'success': True,
@@ -592,7 +600,8 @@ def create_meeting():
         'email_sent': email_result,
         'ai_agenda': meeting_data.get('ai_agenda'),
         'meeting_link_data': meeting_link_data,
-        'notification': notification
+        'notification': notification,
+        'conflicts': conflicts
     })
 
 # Meeting request routes
@@ -621,13 +630,12 @@ def create_meeting_request():
         'response_reason': None
     }
     
-    # Save meeting request
-    meeting_requests_data = load_data('meeting_requests.json')
-    if 'meeting_requests' not in meeting_requests_data:
-        meeting_requests_data['meeting_requests'] = []
-    
-    meeting_requests_data['meeting_requests'].append(meeting_request)
-    save_data('meeting_requests.json', meeting_requests_data)
+    # Save meeting request (pending requests have no reminders yet)
+    versions_before = reminder_versions()
+    repo.add_meeting_request(meeting_request)
+    reminders.record_write(versions_before, reminder_versions())
+    hub.publish('meeting_request', meeting_request,
+                stream_topics([meeting_request['from_user'], meeting_request['to_user']]))
     
     # Create notification for recipient
     create_notification(
@@ -635,7 +643,8 @@ def create_meeting_request():
         f'New Meeting Request: {meeting_request["title"]}',
         f'Meeting request from {meeting_request["from_user"]}: {meeting_request["description"]}',
         [meeting_request['to_user']],
-        request_id
+        request_id,
+        key=f'meeting_request:{request_id}:created'
     )
     
     print(f"\n📧 MEETING REQUEST SENT")
@@ -654,39 +663,39 @@ def respond_to_meeting_request(request_id):
     response = data.get('response')
     reason = data.get('reason', '')
     
-    # Load meeting requests
-    meeting_requests_data = load_data('meeting_requests.json')
-    meeting_requests = meeting_requests_data.get('meeting_requests', [])
-    
     # Find and update the request
-    request_found = False
-    for req in meeting_requests:
-        if req['id'] == request_id:
-            req['status'] = response
-            req['response_datetime'] = datetime.now().isoformat()
-            req['response_reason'] = reason
-            request_found = True
-            
-            # Create notification for requester
-            create_notification(
-                'meeting_response',
-                f'Meeting Request {response.title()}',
-                f'Your meeting request "{req["title"]}" has been {response}' + (f': {reason}' if reason else ''),
-                [req['from_user']],
-                request_id
-            )
-            
-            print(f"\n📧 MEETING REQUEST RESPONSE")
-            print(f"Request: {req['title']}")
-            print(f"Response: {response.upper()}")
-            print(f"Reason: {reason}")
-            
-            break
+    versions_before = reminder_versions()
+    req = repo.update_meeting_request(request_id, {
+        'status': response,
+        'response_datetime': datetime.now().isoformat(),
+        'response_reason': reason
+    })
     
-    if not request_found:
+    if not req:
         return jsonify({'success': False, 'error': 'Meeting request not found'}), 404
+    key, starts_at, payload = request_reminder_source(req)
+    if response == 'accepted' and starts_at is not None:
+        reminders.schedule(key, starts_at, payload)
+    else:
+        reminders.cancel(key)
+    reminders.record_write(versions_before, reminder_versions())
+    hub.publish('meeting_request', dict(req), stream_topics([req['from_user'], req['to_user']]))
+    
+    # Create notification for requester
+    create_notification(
+        'meeting_response',
+        f'Meeting Request {response.title()}',
+        f'Your meeting request "{req["title"]}" has been {response}' + (f': {reason}' if reason else ''),
+        [req['from_user']],
+        request_id,
+        key=f'meeting_request:{request_id}:{response}'
+    )
+    
+    print(f"\n📧 MEETING REQUEST RESPONSE")
+    print(f"Request: {req['title']}")
+    print(f"Response: {response.upper()}")
+    print(f"Reason: {reason}")
     
-    save_data('meeting_requests.json', meeting_requests_data)
     return jsonify({'success': True})
 
 # Employee roadmap routes
@@ -834,198 +843,167 @@ def update_task_status(employee_id, task_id):
             'task_completed',
             'Task Completed',
             f'Task {task_id} has been completed',
-            [employee_id]
+            [employee_id],
+            key=f'task:{employee_id}:{task_id}:completed'
         )
     
     return jsonify({'success': True, 'task_id': task_id, 'status': status, 'progress': progress})
 
+# Fields a manager can change on a team member, with their validators
+EMPLOYEE_FIELDS = {
+    'name': lambda value: isinstance(value, str) and value.strip() != '',
+    'position': lambda value: isinstance(value, str),
+    'role': lambda value: isinstance(value, str),
+    'status': lambda value: isinstance(value, str),
+    'activity': lambda value: isinstance(value, str),
+    'completion': lambda value: isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 100,
+    'pending_items': lambda value: isinstance(value, int) and not isinstance(value, bool) and value >= 0,
+    'days_since_checkin': lambda value: isinstance(value, int) and not isinstance(value, bool) and value >= 0,
+    'risk_level': lambda value: value in ('low', 'medium', 'high'),
+    'last_checkin': lambda value: isinstance(value, str),
+    'next_checkin': lambda value: isinstance(value, str),
+    'manager_id': lambda value: isinstance(value, str),
+}
+
+@app.route('/api/employees/<int:employee_id>', methods=['PATCH'])
+def update_employee(employee_id):
+    """Update a team member's onboarding fields"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return jsonify({'error': 'Request body must be a non-empty object'}), 400
+    unknown = sorted(set(data) - set(EMPLOYEE_FIELDS))
+    if unknown:
+        return jsonify({'error': f"Fields cannot be updated: {', '.join(unknown)}"}), 400
+    invalid = sorted(field for field, value in data.items() if not EMPLOYEE_FIELDS[field](value))
+    if invalid:
+        return jsonify({'error': f"Invalid values for: {', '.join(invalid)}"}), 400
+
+    # Written through employee_changes so the dashboard aggregates apply the delta
+    employee = employee_changes.update(employee_id, data)
+    if employee is None:
+        return jsonify({'error': 'Employee not found'}), 404
+
+    hub.publish('employee', employee, stream_topics(employee_ids=[employee_id]))
+    return jsonify({'success': True, 'employee': employee})
+
 @app.route('/api/employee/<employee_id>/meeting-requests', methods=['GET'])
 def get_employee_meeting_requests(employee_id):
     """Get meeting requests for an employee"""
-    meeting_requests_data = load_data('meeting_requests.json')
-    all_requests = meeting_requests_data.get('meeting_requests', [])
-    
-    # Filter requests for this employee (sent to them or sent by them)
-    employee_requests = [
-        req for req in all_requests 
-        if req.get('from_user') == employee_id or req.get('to_user') == employee_id
-    ]
-    
-    # Sort by created_at (most recent first)
-    employee_requests.sort(key=lambda x: x['created_at'], reverse=True)
+    try:
+        limit, before, after = parse_page_args(request.args, default_limit=50)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Requests sent to or by this employee, most recent first
+    page = repo.list_meeting_requests_for_user(employee_id, limit, before, after)
     
-    return jsonify({'meeting_requests': employee_requests})
+    return paged_response({'meeting_requests': page.items}, page)
 
 # Notification routes
 @app.route('/api/user/<user_id>/notifications', methods=['GET'])
 def get_user_notifications(user_id):
     """Get notifications for a user"""
-    notifications_data = load_data('notifications.json')
-    all_notifications = notifications_data.get('notifications', [])
-    
-    # Filter notifications for this user
-    user_notifications = [
-        notif for notif in all_notifications 
-        if user_id in notif.get('recipient_ids', []) or not notif.get('recipient_ids')
-    ]
-    
-    # Sort by created_at (most recent first)
-    user_notifications.sort(key=lambda x: x['created_at'], reverse=True)
-    
-    unread_count = len([n for n in user_notifications if not n.get('read', False)])
+    try:
+        limit, before, after = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Most recent notifications addressed to this user or broadcast to everyone
+    page, unread_count = repo.list_notifications_for_user(user_id, limit, before, after)
     
-    return jsonify({
-        'notifications': user_notifications[:20],
+    return paged_response({
+        'notifications': [public_notification(notification) for notification in page.items],
         'unread_count': unread_count
-    })
+    }, page)
 
 @app.route('/api/user/<user_id>/notifications/<int:notification_id>/read', methods=['POST'])
 def mark_notification_read(user_id, notification_id):
-    """Mark a notification as read"""
-    notifications_data = load_data('notifications.json')
-    notifications = notifications_data.get('notifications', [])
-    
-    for notification in notifications:
-        if notification['id'] == notification_id:
-            notification['read'] = True
-            break
-    
-    save_data('notifications.json', notifications_data)
+    """Mark a notification in the user's inbox as read"""
+    repo.mark_notification_read(notification_id, user_id)
     return jsonify({'success': True})
 
+@app.route('/api/user/<user_id>/notifications/read', methods=['POST'])
+def mark_notifications_read(user_id):
+    """Mark several notifications as read, or all of the user's unread ones"""
+    data = request.get_json(silent=True) or {}
+    notification_ids = data.get('notification_ids')
+    if notification_ids is None:
+        notification_ids = repo.list_unread_notification_ids(user_id)
+    elif not isinstance(notification_ids, list):
+        return jsonify({'error': 'notification_ids must be a list'}), 400
+
+    updated = repo.mark_notifications_read(notification_ids, user_id)
+    unread_count = repo.count_unread_notifications(user_id)
+    return jsonify({'success': True, 'updated': updated, 'unread_count': unread_count})
+
 # Manager dashboard routes
 @app.route('/api/manager/dashboard/overview', methods=['GET'])
+@versioned('employees', 'escalation_history', vary=current_minute)
 def get_dashboard_overview():
     """Get enhanced dashboard overview statistics"""
     try:
-        employees_data = load_data('employees.json')
-        team_members = employees_data.get('employees', [])
-        
-        # Filter out the manager herself
-        team_members = [m for m in team_members if m.get('position') != 'Finance Manager']
-        
-        active_new_hires = len([m for m in team_members if m.get("status") == "active" and m.get("completion", 0) < 100])
-        require_attention = len([m for m in team_members if m.get("risk_level") == "high"])
-        completion_rate = round(sum(m.get("completion", 0) for m in team_members) / len(team_members)) if team_members else 0
-        overdue_count = len([m for m in team_members if m.get("status") == "Overdue" or m.get("risk_level") == "high"])
+        manager_id, scope = manager_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+
+    try:
+        # Team counters are maintained per employee change
+        overview = dashboard.overview(manager_id, scope)
         
         # Get recent escalations
-        manager_data = load_data('manager_data.json')
-        escalation_history = manager_data.get("escalation_history", [])
-        recent_escalations = len([e for e in escalation_history 
-                                if datetime.fromisoformat(e.get("created_at", "2025-08-01T00:00:00")) > datetime.now() - timedelta(days=7)])
+        overview["recent_escalations"] = repo.count_escalations_since(datetime.now() - timedelta(days=7))
         
-        return jsonify({
-            "active_new_hires": active_new_hires,
-            "require_attention": require_attention,
-            "completion_rate": completion_rate,
-            "overdue_count": overdue_count,
-            "recent_escalations": recent_escalations,
-            "total_team_members": len(team_members)
-        })
+        return jsonify(overview)
     except Exception as e:
         return jsonify({"error": f"Failed to load overview: {str(e)}"}), 500
 
 @app.route('/api/manager/analytics', methods=['GET'])
+@versioned('employees')
 def get_analytics():
     """Get comprehensive analytics data"""
     try:
-        employees_data = load_data('employees.json')
-        team_members = employees_data.get('employees', [])
-        
-        # Filter out the manager
-        team_members = [m for m in team_members if m.get('position') != 'Finance Manager']
-        total_members = len(team_members)
-        
-        if total_members == 0:
-            return jsonify({
-                "completion_rates": {
-                    "overall": 0,
-                    "on_schedule": 0,
-                    "at_risk": 0,
-                    "overdue_tasks": 0
-                },
-                "team_metrics": {
-                    "total_members": 0,
-                    "completed": 0,
-                    "in_progress": 0,
-                    "overdue": 0
-                }
-            })
-        
-        # Calculate status counts
-        completed_count = len([m for m in team_members if m.get("completion", 0) == 100])
-        in_progress_count = len([m for m in team_members if 0 < m.get("completion", 0) < 100])
-        overdue_count = len([m for m in team_members if m.get("risk_level") == "high"])
-        
-        # Calculate risk levels
-        high_risk_count = len([m for m in team_members if m.get("risk_level") == "high"])
-        medium_risk_count = len([m for m in team_members if m.get("risk_level") == "medium"])
-        low_risk_count = len([m for m in team_members if m.get("risk_level") == "low"])
-        
-        # Calculate overall completion rate
-        total_completion = sum(m.get("completion", 0) for m in team_members)
-        overall_completion = round(total_completion / total_members)
-        
-        # Calculate percentages for dashboard metrics
-        on_schedule = round((completed_count + low_risk_count) / total_members * 100)
-        at_risk = round(medium_risk_count / total_members * 100)
-        overdue_tasks = round(high_risk_count / total_members * 100)
-        
-        return jsonify({
-            "completion_rates": {
-                "overall": overall_completion,
-                "on_schedule": on_schedule,
-                "at_risk": at_risk,
-                "overdue_tasks": overdue_tasks
-            },
-            "team_metrics": {
-                "total_members": total_members,
-                "completed": completed_count,
-                "in_progress": in_progress_count,
-                "overdue": overdue_count,
-                "high_risk": high_risk_count,
-                "medium_risk": medium_risk_count,
-                "low_risk": low_risk_count
-            }
-        })
+        manager_id, scope = manager_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+
+    try:
+        return jsonify(dashboard.analytics(manager_id, scope))
         
     except Exception as e:
         print(f"Analytics error: {str(e)}")
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route('/api/manager/team/performance', methods=['GET'])
+@versioned('employees')
 def get_team_performance():
     """Get team performance data with filtering"""
+    search_query = request.args.get('search', '')
+    status_filter = request.args.get('status', '')
     try:
-        search_query = request.args.get('search', '').lower()
-        status_filter = request.args.get('status', '')
-        
-        employees_data = load_data('employees.json')
-        team_members = employees_data.get('employees', [])
-        
-        # Filter out the manager
-        team_members = [m for m in team_members if m.get('position') != 'Finance Manager']
-        
-        # Apply search filter
-        if search_query:
-            team_members = [
-                member for member in team_members 
-                if search_query in member.get("name", "").lower() or 
-                   search_query in member.get("position", "").lower() or
-                   search_query in member.get("activity", "").lower()
-            ]
-        
-        # Apply status filter
-        if status_filter:
-            if status_filter == "Complete":
-                team_members = [m for m in team_members if m.get("completion", 0) == 100]
-            elif status_filter == "In Progress":
-                team_members = [m for m in team_members if 0 < m.get("completion", 0) < 100]
-            elif status_filter == "Overdue":
-                team_members = [m for m in team_members if m.get("risk_level") == "high"]
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+    if offset < 0 or (limit is not None and not 1 <= limit <= MAX_LIMIT):
+        return jsonify({'error': f'offset must be >= 0 and limit between 1 and {MAX_LIMIT}'}), 400
+    try:
+        manager_id, scope = manager_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+
+    try:
+        # Token, prefix and typo-tolerant lookup, most relevant first (list order without a search)
+        total, team_members = team_search.search(search_query, status_filter, offset, limit,
+                                                 member_ids=org.member_ids(manager_id, scope))
         
-        # Convert completion to status for display
+        # Convert completion to status for display (on copies, the loaded records are read-only)
+        team_members = [dict(member) for member in team_members]
         for member in team_members:
             if member.get("completion", 0) == 100:
                 member["status"] = "Complete"
@@ -1034,7 +1012,9 @@ def get_team_performance():
             else:
                 member["status"] = "In Progress"
         
-        return jsonify(team_members)
+        response = jsonify(team_members)
+        response.headers['X-Total-Count'] = str(total)
+        return response
     except Exception as e:
         return jsonify({"error": f"Failed to load team performance: {str(e)}"}), 500
 
@@ -1042,8 +1022,7 @@ def get_team_performance():
 def get_coaching_scripts():
     """Get all AI-generated coaching scripts"""
     try:
-        manager_data = load_data('manager_data.json')
-        return jsonify(manager_data.get("coaching_scripts", {}))
+        return jsonify(repo.get_coaching_scripts())
     except Exception as e:
         return jsonify({"error": f"Failed to load coaching scripts: {str(e)}"}), 500
 
@@ -1051,8 +1030,7 @@ def get_coaching_scripts():
 def get_specific_coaching_script(script_type):
     """Get a specific coaching script by type with detailed guidance"""
     try:
-        manager_data = load_data('manager_data.json')
-        scripts = manager_data.get("coaching_scripts", {})
+        scripts = repo.get_coaching_scripts()
         script = scripts.get(script_type)
         if script:
             return jsonify(script)
@@ -1064,8 +1042,7 @@ def get_specific_coaching_script(script_type):
 def get_escalation_paths():
     """Get available escalation paths"""
     try:
-        manager_data = load_data('manager_data.json')
-        return jsonify(manager_data.get("escalation_paths", []))
+        return jsonify(repo.get_escalation_paths())
     except Exception as e:
         return jsonify({"error": f"Failed to load escalation paths: {str(e)}"}), 500
 
@@ -1086,9 +1063,7 @@ def create_escalation():
         if not escalation_type or not employee_id:
             return jsonify({"error": "Missing required fields"}), 400
         
-        # Load manager data
-        manager_data = load_data('manager_data.json')
-        escalation_paths = manager_data.get("escalation_paths", [])
+        escalation_paths = repo.get_escalation_paths()
         
         # Find the escalation path
         escalation_path = next(
@@ -1100,12 +1075,7 @@ def create_escalation():
             return jsonify({"error": "Escalation type not found"}), 404
         
         # Find the employee
-        employees_data = load_data('employees.json')
-        employees = employees_data.get('employees', [])
-        employee = next(
-            (emp for emp in employees if emp["id"] == employee_id), 
-            None
-        )
+        employee = repo.get_employee(employee_id)
         
         if not employee:
             return jsonify({"error": "Employee not found"}), 404
@@ -1130,11 +1100,8 @@ def create_escalation():
         }
         
         # Add to escalation history
-        if "escalation_history" not in manager_data:
-            manager_data["escalation_history"] = []
-        
-        manager_data["escalation_history"].append(escalation_record)
-        save_data('manager_data.json', manager_data)
+        repo.add_escalation(escalation_record)
+        hub.publish('escalation', escalation_record, stream_topics(employee_ids=[employee['id']]))
         
         return jsonify({
             "success": True,
@@ -1150,11 +1117,13 @@ def create_escalation():
 def get_escalation_history():
     """Get escalation history"""
     try:
-        manager_data = load_data('manager_data.json')
-        history = manager_data.get("escalation_history", [])
-        # Sort by creation date (most recent first)
-        history.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        return jsonify(history[:20])  # Return last 20
+        limit, before, after = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        # Sorted by creation date (most recent first); the list body is kept, cursors go in headers
+        page = repo.list_escalation_history(limit, before, after)
+        return paged_response(list(page.items), page)
     except Exception as e:
         return jsonify({"error": f"Failed to load escalation history: {str(e)}"}), 500
 
@@ -1162,17 +1131,20 @@ def get_escalation_history():
 def get_manager_notifications():
     """Get recent notifications for manager"""
     try:
-        employees_data = load_data('employees.json')
-        team_members = employees_data.get('employees', [])
-        
-        # Filter out the manager
-        team_members = [m for m in team_members if m.get('position') != 'Finance Manager']
+        manager_id, scope = manager_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+
+    try:
+        # Only the members that make the first 10 alerts are looked up
+        high_risk_members, completed_members = dashboard.alert_members(manager_id, scope)
         
         # Generate notifications based on team data
         notifications = []
         
         # High-risk employees
-        high_risk_members = [m for m in team_members if m.get("risk_level") == "high"]
         for member in high_risk_members:
             notifications.append({
                 "id": f"notif-{member['id']}-risk",
@@ -1184,7 +1156,6 @@ def get_manager_notifications():
             })
         
         # Completions
-        completed_members = [m for m in team_members if m.get("completion", 0) >= 90 and m.get("completion", 0) < 100]
         for member in completed_members:
             notifications.append({
                 "id": f"notif-{member['id']}-completion",
@@ -1195,27 +1166,26 @@ def get_manager_notifications():
                 "read": False
             })
         
-        return jsonify(notifications[:10])
+        return jsonify(notifications)
     except Exception as e:
         return jsonify({"error": f"Failed to load notifications: {str(e)}"}), 500
 
 # Statistics routes
 @app.route('/api/stats', methods=['GET'])
+@versioned('employees', 'meeting_requests', 'notifications', vary=current_day)
 def get_stats():
     """Get finance dashboard statistics"""
     today = datetime.now().strftime('%Y-%m-%d')
     
     # Get team members for today
-    employees_data = load_data('employees.json')
-    base_members = employees_data.get('employees', [])
+    base_members = repo.list_employees()
     
     # Generate dynamic status
     available_count = 0
     busy_count = 0
     away_count = 0
     
-    for member in base_members:
-        status = generate_member_status(member['id'], today)
+    for status in member_statuses([member['id'] for member in base_members], today):
         if status == 'available':
             available_count += 1
         elif status == 'busy':
@@ -1224,14 +1194,8 @@ def get_stats():
             away_count += 1
     
     # Get meeting requests and notifications
-    meeting_requests_data = load_data('meeting_requests.json')
-    notifications_data = load_data('notifications.json')
-    
-    pending_requests = len([req for req in meeting_requests_data.get('meeting_requests', []) 
-                           if req.get('status') == 'pending'])
-    
-    unread_notifications = len([notif for notif in notifications_data.get('notifications', [])
-                               if not notif.get('read', False)])
+    pending_requests = repo.count_meeting_requests('pending')
+    unread_notifications = repo.count_unread_notifications()
     
     return jsonify({
         'total_members': len(base_members),
@@ -1246,17 +1210,96 @@ def get_stats():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    employees_data = load_data('employees.json')
-    manager_data = load_data('manager_data.json')
-    
     return jsonify({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "version": "3.0.0 - Unified Backend",
-        "employees": len(employees_data.get('employees', [])),
-        "escalation_paths": len(manager_data.get('escalation_paths', []))
+        "storage": repo.name,
+        "employees": len(repo.list_employees()),
+        "escalation_paths": len(repo.get_escalation_paths()),
+        "data_cache": cache_stats(),
+        "availability_cache": availability_cache_info(),
+        "agenda_templates": agendas.stats(),
+        "stream": hub.stats(),
+        "email": mail_queue.stats(),
+        "notification_fanout": fanout.stats(),
+        "reminders": reminders.stats()
     })
 
+# Batched reads
+MAX_BATCH_REQUESTS = 20
+UNBATCHABLE_PATHS = ('/api/batch', '/api/stream')
+
+@app.route('/api/batch', methods=['POST'])
+def batch_requests():
+    """Run several GET requests against one snapshot of the data and return all results"""
+    data = request.get_json(silent=True) or {}
+    sub_requests = data.get('requests')
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({'error': 'requests must be a non-empty list'}), 400
+    if len(sub_requests) > MAX_BATCH_REQUESTS:
+        return jsonify({'error': f'at most {MAX_BATCH_REQUESTS} requests per batch'}), 400
+
+    responses = []
+    with repo.snapshot():
+        for index, sub_request in enumerate(sub_requests):
+            # A bare string is shorthand for {'path': ...}
+            if isinstance(sub_request, str):
+                sub_request = {'path': sub_request}
+            if not isinstance(sub_request, dict):
+                sub_request = {}
+            path = sub_request.get('path')
+            result = {'id': sub_request.get('id', index), 'path': path}
+
+            if not isinstance(path, str) or not path.startswith('/api/') or path.split('?')[0] in UNBATCHABLE_PATHS:
+                result.update(status=400, body={'error': 'path must be an /api/ read endpoint'})
+            elif (sub_request.get('method') or 'GET').upper() != 'GET':
+                result.update(status=405, body={'error': 'only GET requests can be batched'})
+            else:
+                headers = {key: value for key, value in (sub_request.get('headers') or {}).items()
+                           if key.lower() == 'if-none-match'}
+                builder = EnvironBuilder(path=path, method='GET', headers=headers)
+                try:
+                    with app.request_context(builder.get_environ()):
+                        response = app.full_dispatch_request()
+                finally:
+                    builder.close()
+                result['status'] = response.status_code
+                result['body'] = response.get_json(silent=True) if response.is_json else None
+                if response.headers.get('ETag'):
+                    result['etag'] = response.headers['ETag']
+            responses.append(result)
+
+    return jsonify({'responses': responses})
+
+# Push channel
+@app.route('/api/stream', methods=['GET'])
+def stream_events():
+    """Server-sent events for a user and/or a manager's team"""
+    user_id = request.args.get('user_id')
+    manager_id = request.args.get('manager_id')
+    if not user_id and not manager_id:
+        return jsonify({'error': 'user_id or manager_id is required'}), 400
+
+    topics = set()
+    if user_id:
+        topics.add(f'user:{user_id}')
+    if manager_id:
+        topics.add(f'manager:{manager_id}')
+    subscription = hub.subscribe(topics)
+    if subscription is None:
+        # Every stream pins a server thread; past the cap, clients fall back to polling and retry later
+        response = Response(f'retry: {STREAM_RETRY_SECONDS * 1000}\n\n', status=503, mimetype='text/event-stream')
+        response.headers['Retry-After'] = str(STREAM_RETRY_SECONDS)
+        return response
+
+    response = Response(hub.stream(subscription), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    # The generator's own cleanup never runs if the client leaves before the first chunk
+    response.call_on_close(lambda: hub.unsubscribe(subscription))
+    return response
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -1266,15 +1309,15 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
-if __name__ == '__main__':
-    # Ensure data directory exists and initialize default data
-    os.makedirs('data', exist_ok=True)
-    
-    # Initialize default data files if they don't exist
-    required_files = ['employees.json', 'meetings.json', 'notifications.json', 'meeting_requests.json', 'manager_data.json']
-    if not all(os.path.exists(f'data/{file}') for file in required_files):
+def ensure_data():
+    """Create the data directory and seed the default data if the store is empty"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    if not repo.is_initialized():
         print("🔧 Initializing BPI Finance Department unified data...")
         initialize_default_data()
+
+if __name__ == '__main__':
+    ensure_data()
     
     print("🚀 BPI SmartStart - Unified Backend System")
     print("=" * 60)
@@ -1282,5 +1325,6 @@ if __name__ == '__main__':
     print("📄 Unified Backend Server: http://localhost:5000")
     print("💰 Finance Department Focus")
     print("🔄 All functions integrated into single backend")
+    print("⚠️  Development server; run python serve.py in production")
     
     app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,205 @@
+import hashlib
+import heapq
+import math
+import os
+from datetime import date as date_type, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+TIME_SLOTS = ['9:00 AM', '10:00 AM', '11:00 AM', '2:00 PM', '3:00 PM']
+SLOT_HOURS = [9, 10, 11, 14, 15]
+STATUS_NAMES = np.array(['available', 'busy', 'away'])
+MEMBER_DAY_CACHE_SIZE = int(os.environ.get('SMARTSTART_AVAILABILITY_CACHE', 50000))
+MAX_RANGE_DAYS = 62
+
+def _hash_prefix(text):
+    """First 32 bits of the MD5 digest, as used by the schedule simulation"""
+    return int.from_bytes(hashlib.md5(text.encode()).digest()[:4], 'big')
+
+@lru_cache(maxsize=MEMBER_DAY_CACHE_SIZE)
+def member_day(member_id, date):
+    """(status code, slot hashes) for one member on one date, memoized in a bounded LRU"""
+    bucket = _hash_prefix(f"{member_id}_{date}") % 100
+    # 70% available, 20% busy, 10% away
+    status_code = 0 if bucket < 70 else 1 if bucket < 90 else 2
+    slot_hashes = tuple(_hash_prefix(f"{member_id}_{date}_{time}") for time in TIME_SLOTS)
+    return status_code, slot_hashes
+
+def member_status_codes(member_ids, date):
+    """Vectorized generate_member_status: 0 available, 1 busy, 2 away"""
+    return np.fromiter((member_day(member_id, date)[0] for member_id in member_ids),
+                       dtype=np.int8, count=len(member_ids))
+
+def member_statuses(member_ids, date):
+    """Status names for every member on a date, in one pass"""
+    return STATUS_NAMES[member_status_codes(member_ids, date)].tolist()
+
+def slot_hash_matrix(member_ids, date):
+    """members x slots matrix of schedule hashes (one MD5 per member and slot)"""
+    return np.array([member_day(member_id, date)[1] for member_id in member_ids],
+                    dtype=np.int64).reshape(len(member_ids), len(TIME_SLOTS))
+
+def date_range(start, end):
+    """ISO dates from start to end inclusive; raises ValueError if invalid or too long"""
+    first = date_type.fromisoformat(start)
+    last = date_type.fromisoformat(end)
+    if last < first:
+        raise ValueError('end must not be before start')
+    days = (last - first).days + 1
+    if days > MAX_RANGE_DAYS:
+        raise ValueError(f'range is limited to {MAX_RANGE_DAYS} days')
+    return [(first + timedelta(days=offset)).isoformat() for offset in range(days)]
+
+def team_availability_range(dates, base_members, booked_lookup=None):
+    """Team availability for several dates, reusing memoized member days"""
+    member_ids = [member['id'] for member in base_members]
+    days = []
+    for date in dates:
+        statuses = member_statuses(member_ids, date)
+        team_members = [dict(member, status=status) for member, status in zip(base_members, statuses)]
+        days.append({'date': date, 'availability': team_availability(date, team_members, booked_lookup)})
+    return days
+
+def member_day_mask(member_id, date):
+    """Bitset of a member's free slots on a date (bit i set = TIME_SLOTS[i] free)"""
+    status_code, slot_hashes = member_day(member_id, date)
+    if status_code != 0:
+        return 0
+    mask = 0
+    for slot, slot_hash in enumerate(slot_hashes):
+        # 75% chance of being available for time slots
+        if slot_hash % 100 < 75:
+            mask |= 1 << slot
+    return mask
+
+def _format_minutes(minutes):
+    """Minutes after midnight in the TIME_SLOTS style, e.g. 570 -> '9:30 AM'"""
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour % 24 < 12 else 'PM'}"
+
+def _popcount(bits):
+    return bin(bits).count('1')
+
+def _meeting_starts(slot_count):
+    """Start slots where slot_count consecutive hourly slots fit without a break"""
+    return [
+        start for start in range(len(SLOT_HOURS) - slot_count + 1)
+        if SLOT_HOURS[start + slot_count - 1] - SLOT_HOURS[start] == slot_count - 1
+    ]
+
+def suggest_slots(attendee_ids, dates, duration_minutes, quorum, top_k=5, booked_lookup=None):
+    """Rank meeting slots by how many attendees are free for the whole duration
+
+    Each day is turned into one attendee bitset per time slot (bit a set =
+    attendee a is free), so a candidate slot costs an AND over the slots it
+    spans plus a popcount. booked_lookup(member_id, date) returns the booked
+    meeting title (or None) per time slot and clears those bits.
+    """
+    slot_count = max(1, math.ceil(duration_minutes / 60))
+    starts = _meeting_starts(slot_count)
+    all_attendees = (1 << len(attendee_ids)) - 1
+    candidates = []
+
+    for day_index, date in enumerate(dates):
+        slot_bits = [0] * len(TIME_SLOTS)
+        for bit, member_id in enumerate(attendee_ids):
+            mask = member_day_mask(member_id, date)
+            if booked_lookup is not None and mask:
+                for slot, title in enumerate(booked_lookup(member_id, date)):
+                    if title:
+                        mask &= ~(1 << slot)
+            slot = 0
+            while mask:
+                if mask & 1:
+                    slot_bits[slot] |= 1 << bit
+                mask >>= 1
+                slot += 1
+
+        for start in starts:
+            free = all_attendees
+            for slot in range(start, start + slot_count):
+                free &= slot_bits[slot]
+            count = _popcount(free)
+            if count >= quorum:
+                # Most attendees first, then earliest day and time
+                candidates.append((count, -day_index, -start, date, free))
+
+    suggestions = []
+    for count, _, negative_start, date, free in heapq.nlargest(top_k, candidates):
+        start = -negative_start
+        suggestions.append({
+            'date': date,
+            'time': TIME_SLOTS[start],
+            'end_time': _format_minutes(SLOT_HOURS[start] * 60 + duration_minutes),
+            'slots': slot_count,
+            'availableCount': count,
+            'allAvailable': count == len(attendee_ids),
+            'availableAttendeeIds': [member_id for bit, member_id in enumerate(attendee_ids) if free >> bit & 1],
+            'unavailableAttendeeIds': [member_id for bit, member_id in enumerate(attendee_ids) if not free >> bit & 1]
+        })
+    return suggestions
+
+def cache_info():
+    info = member_day.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': info.maxsize}
+
+def team_availability(date, team_members, booked_lookup=None):
+    """Batched generate_team_availability_with_details over the members x slots matrix
+
+    booked_lookup(member_id, date), if given, returns the title of a booked
+    meeting (or None) per time slot; those slots count as unavailable.
+    """
+    member_ids = [member['id'] for member in team_members]
+    slot_hashes = slot_hash_matrix(member_ids, date)
+
+    # 75% chance of being available for time slots
+    slot_free = (slot_hashes % 100) < 75
+    member_available = np.fromiter((member['status'] == 'available' for member in team_members),
+                                   dtype=bool, count=len(team_members))
+    available = slot_free & member_available[:, None]
+
+    booked_titles = {}
+    if booked_lookup is not None:
+        booked = np.zeros_like(available)
+        for index, member_id in enumerate(member_ids):
+            for slot, title in enumerate(booked_lookup(member_id, date)):
+                if title:
+                    booked[index, slot] = True
+                    booked_titles[(index, slot)] = title
+        available &= ~booked
+    available_counts = available.sum(axis=0)
+    meeting_numbers = slot_hashes % 99 + 100
+
+    grades = np.select([available_counts <= 5, available_counts <= 8], ['poor', 'limited'], default='excellent')
+    total_members = len(team_members)
+    summaries = [{'id': m['id'], 'name': m['name'], 'role': m['role']} for m in team_members]
+
+    availability = []
+    for slot, time in enumerate(TIME_SLOTS):
+        available_members = []
+        unavailable_members = []
+        for index in np.flatnonzero(available[:, slot]).tolist():
+            available_members.append(summaries[index])
+        for index in np.flatnonzero(~available[:, slot]).tolist():
+            if not member_available[index]:
+                reason = 'Away'
+            elif (index, slot) in booked_titles:
+                reason = booked_titles[(index, slot)]
+            else:
+                reason = f"Budget Review #{meeting_numbers[index, slot]}"
+            unavailable_members.append(dict(summaries[index], reason=reason))
+
+        available_count = int(available_counts[slot])
+        availability.append({
+            'time': time,
+            'availableMembers': available_members,
+            'unavailableMembers': unavailable_members,
+            'status': str(grades[slot]),
+            'allAvailable': available_count == total_members,
+            'availableCount': available_count,
+            'canScheduleTeam': available_count >= 5,
+            'canScheduleSmall': available_count >= 2
+        })
+
+    return availability
@@ -0,0 +1,47 @@
+import os
+import threading
+
+class WorkerThreads:
+    """Daemon threads running target, started on first use in each process
+
+    Threads do not survive a fork, so ensure_started() (re)starts them
+    whenever it runs in a process that hasn't got them alive, e.g. in every
+    forked worker. on_start, if given, runs just before they start.
+    """
+
+    def __init__(self, target, name, count=1, on_start=None):
+        self.target = target
+        self.name = name
+        self.count = count
+        self.on_start = on_start
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+
+    def _alive(self):
+        return self._pid == os.getpid() and all(thread.is_alive() for thread in self._threads)
+
+    def ensure_started(self):
+        if self._alive():
+            return
+        with self._lock:
+            if self._alive():
+                return
+            self._pid = os.getpid()
+            if self.on_start is not None:
+                self.on_start()
+            names = [self.name] if self.count == 1 else [f'{self.name}-{i}' for i in range(self.count)]
+            self._threads = [threading.Thread(target=self.target, name=name, daemon=True) for name in names]
+            for thread in self._threads:
+                thread.start()
+
+def latency_summary(seconds):
+    """{'p50', 'p95', 'max'} in milliseconds for latency samples in seconds, or None without samples"""
+    latencies = sorted(seconds)
+    if not latencies:
+        return None
+    return {
+        'p50': round(latencies[len(latencies) // 2] * 1000, 1),
+        'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+        'max': round(latencies[-1] * 1000, 1)
+    }
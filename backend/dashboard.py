@@ -0,0 +1,169 @@
+import heapq
+from bisect import bisect_left, insort
+from itertools import islice
+
+from employee_views import EmployeeView
+from org_tree import TEAM
+
+MAX_NOTIFICATIONS = 10
+
+def member_counters(member):
+    """What one team member contributes to the dashboard counters"""
+    completion = member.get('completion', 0)
+    risk_level = member.get('risk_level')
+    return {
+        'members': 1,
+        'completion_sum': completion,
+        'active_new_hires': int(member.get('status') == 'active' and completion < 100),
+        'completed': int(completion == 100),
+        'in_progress': int(0 < completion < 100),
+        'overdue': int(member.get('status') == 'Overdue' or risk_level == 'high'),
+        'high_risk': int(risk_level == 'high'),
+        'medium_risk': int(risk_level == 'medium'),
+        'low_risk': int(risk_level == 'low'),
+    }
+
+def _near_completion(member):
+    return 90 <= member.get('completion', 0) < 100
+
+class _Aggregate:
+    """Running counters for one team, plus the members behind its alerts"""
+
+    __slots__ = ('counters', 'high_risk_members', 'near_completion_members')
+
+    def __init__(self):
+        self.counters = dict.fromkeys(member_counters({}), 0)
+        # (position in the employee list, id), so alerts keep the list order
+        self.high_risk_members = []
+        self.near_completion_members = []
+
+    def add(self, key, member, sign):
+        for name, value in member_counters(member).items():
+            self.counters[name] += sign * value
+        for members, flagged in ((self.high_risk_members, member.get('risk_level') == 'high'),
+                                 (self.near_completion_members, _near_completion(member))):
+            if not flagged:
+                continue
+            if sign > 0:
+                insort(members, key)
+            else:
+                del members[bisect_left(members, key)]
+
+class DashboardAggregates(EmployeeView):
+    """Per-manager dashboard counters, updated per employee change
+
+    Every employee is counted in the aggregate of the team the org tree puts
+    them in, so overview, analytics and alert reads are O(1) for a team and
+    O(sub-managers) for a skip-level manager's whole org, instead of passes
+    over all employees. Register it after the org tree, which must already
+    reflect a change when the aggregates apply it.
+    """
+
+    def __init__(self, repo, org):
+        super().__init__(repo)
+        self.org = org
+        self._aggregates = {}
+        self._members = {}
+        self._positions = {}
+
+    def _add(self, member, sign):
+        manager_id = self.org.manager_of(member)
+        if not manager_id:
+            return
+        aggregate = self._aggregates.get(manager_id)
+        if aggregate is None:
+            aggregate = self._aggregates[manager_id] = _Aggregate()
+        aggregate.add((self._positions[member['id']], member['id']), member, sign)
+
+    def rebuild(self, employees):
+        self.org.ensure_current()
+        self._aggregates = {}
+        self._members = {}
+        self._positions = {}
+        for position, member in enumerate(employees):
+            self._positions[member['id']] = position
+            self._members[member['id']] = member
+            self._add(member, 1)
+
+    def apply(self, before, after):
+        self._add(before, -1)
+        self._members[after['id']] = after
+        self._add(after, 1)
+
+    def _team_aggregates(self, manager_id, scope):
+        self.ensure_current()
+        return [self._aggregates[manager] for manager in self.org.managers_under(manager_id, scope)
+                if manager in self._aggregates]
+
+    def _counters(self, manager_id, scope):
+        counters = dict(_Aggregate().counters)
+        for aggregate in self._team_aggregates(manager_id, scope):
+            for name, value in aggregate.counters.items():
+                counters[name] += value
+        return counters
+
+    def overview(self, manager_id, scope=TEAM):
+        """Employee part of the dashboard overview"""
+        with self._lock:
+            counters = self._counters(manager_id, scope)
+        members = counters['members']
+        return {
+            'active_new_hires': counters['active_new_hires'],
+            'require_attention': counters['high_risk'],
+            'completion_rate': round(counters['completion_sum'] / members) if members else 0,
+            'overdue_count': counters['overdue'],
+            'total_team_members': members
+        }
+
+    def analytics(self, manager_id, scope=TEAM):
+        with self._lock:
+            counters = self._counters(manager_id, scope)
+        total = counters['members']
+        if total == 0:
+            return {
+                'completion_rates': {'overall': 0, 'on_schedule': 0, 'at_risk': 0, 'overdue_tasks': 0},
+                'team_metrics': {'total_members': 0, 'completed': 0, 'in_progress': 0, 'overdue': 0}
+            }
+        return {
+            'completion_rates': {
+                'overall': round(counters['completion_sum'] / total),
+                'on_schedule': round((counters['completed'] + counters['low_risk']) / total * 100),
+                'at_risk': round(counters['medium_risk'] / total * 100),
+                'overdue_tasks': round(counters['high_risk'] / total * 100)
+            },
+            'team_metrics': {
+                'total_members': total,
+                'completed': counters['completed'],
+                'in_progress': counters['in_progress'],
+                'overdue': counters['high_risk'],
+                'high_risk': counters['high_risk'],
+                'medium_risk': counters['medium_risk'],
+                'low_risk': counters['low_risk']
+            }
+        }
+
+    def alert_members(self, manager_id, scope=TEAM, limit=MAX_NOTIFICATIONS):
+        """(high-risk members, near-completion members), at most limit in total, in list order"""
+        with self._lock:
+            aggregates = self._team_aggregates(manager_id, scope)
+            high_risk = [self._members[member_id] for _, member_id in
+                         islice(heapq.merge(*(a.high_risk_members for a in aggregates)), limit)]
+            near_completion = [self._members[member_id] for _, member_id in
+                               islice(heapq.merge(*(a.near_completion_members for a in aggregates)),
+                                      limit - len(high_risk))]
+            return high_risk, near_completion
+
+    def check_consistency(self):
+        """Differences between the incremental aggregates and a full recompute (empty if consistent)"""
+        with self._lock:
+            self.ensure_current()
+            fresh = DashboardAggregates(self.repo, self.org)
+            fresh.rebuild(self.repo.list_employees())
+            differences = {}
+            for team in set(self._aggregates) | set(fresh._aggregates):
+                mine = self._aggregates.get(team) or _Aggregate()
+                theirs = fresh._aggregates.get(team) or _Aggregate()
+                for name in ('counters', 'high_risk_members', 'near_completion_members'):
+                    if getattr(mine, name) != getattr(theirs, name):
+                        differences[(team, name)] = (getattr(mine, name), getattr(theirs, name))
+            return differences
@@ -0,0 +1,68 @@
+import threading
+
+class EmployeeView:
+    """State derived from the employee records, kept current without rereading them
+
+    Subclasses implement rebuild(employees) and apply(before, after). The
+    view rebuilds whenever repo.version('employees') moved without it being
+    told, e.g. after a write from another process, and otherwise applies
+    each change made in this process as a delta.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._lock = threading.RLock()
+        self._version = None
+
+    def rebuild(self, employees):
+        raise NotImplementedError
+
+    def apply(self, before, after):
+        raise NotImplementedError
+
+    def ensure_current(self):
+        with self._lock:
+            version = self.repo.version('employees')
+            if version != self._version:
+                self.rebuild(self.repo.list_employees())
+                self._version = version
+
+    def employee_changed(self, before, after, version_before, version_after):
+        """Apply one in-process change, or fall back to a rebuild if the view was stale"""
+        with self._lock:
+            if self._version == version_before:
+                self.apply(before, after)
+                self._version = version_after
+            else:
+                self._version = None
+
+class EmployeeChanges:
+    """Writes employee changes and notifies the registered views
+
+    Writes from this process are serialized so every listener sees the
+    versions on either side of exactly one change; writes from other
+    processes show up as a version the views didn't expect, and they rebuild.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def register(self, view):
+        self.listeners.append(view)
+        return view
+
+    def update(self, employee_id, changes):
+        """Apply changes to an employee, returning the updated record or None if missing"""
+        with self._lock:
+            version_before = self.repo.version('employees')
+            before = self.repo.get_employee(employee_id)
+            if before is None:
+                return None
+            after = self.repo.update_employee(employee_id, changes)
+            if after is not None:
+                version_after = self.repo.version('employees')
+                for listener in self.listeners:
+                    listener.employee_changed(before, after, version_before, version_after)
+            return after
@@ -0,0 +1,133 @@
+import json
+import os
+import queue
+import threading
+import time
+
+SUBSCRIBER_QUEUE_SIZE = int(os.environ.get('SMARTSTART_STREAM_QUEUE', 100))
+# Every open stream holds a server thread for as long as it is connected
+MAX_STREAMS = int(os.environ.get('SMARTSTART_MAX_STREAMS', 16))
+# Sent with a refused stream: how long the client should wait before trying again
+RETRY_SECONDS = 30
+HEARTBEAT_SECONDS = 15
+BROADCAST = '*'
+
+class Subscription:
+    """One stream client's bounded event queue
+
+    When the client falls behind and the queue is full, further events are
+    dropped and a single 'resync' event is delivered instead, telling the
+    client to reload rather than trust a partial sequence.
+    """
+
+    def __init__(self, topics, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self.topics = frozenset(topics)
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._overflowed = False
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            self._overflowed = True
+
+    def next_event(self, timeout=HEARTBEAT_SECONDS):
+        """Next event, a resync marker after an overflow, or None on timeout"""
+        if self._overflowed:
+            self._overflowed = False
+            # Everything queued before the overflow is stale as well
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            return {'id': None, 'type': 'resync', 'data': {'dropped': self.dropped}}
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class EventHub:
+    """In-process pub/sub for the SSE stream, fanning events out by topic
+
+    Topics are 'user:<user_id>', 'manager:<manager_id>' or '*' for everyone.
+    Publishing never blocks on slow subscribers. At most max_streams
+    subscriptions are open at once, so streams can't take every thread.
+    """
+
+    def __init__(self, max_streams=MAX_STREAMS):
+        self.max_streams = max_streams
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._open = set()
+        self._next_id = 0
+        self.published = 0
+        self.refused = 0
+
+    def subscribe(self, topics):
+        """A new subscription, or None when max_streams are already open"""
+        subscription = Subscription(set(topics) | {BROADCAST})
+        with self._lock:
+            if len(self._open) >= self.max_streams:
+                self.refused += 1
+                return None
+            self._open.add(subscription)
+            for topic in subscription.topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription not in self._open:
+                return
+            self._open.discard(subscription)
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def publish(self, event_type, data, topics):
+        """Deliver an event to every subscriber of any of the topics"""
+        with self._lock:
+            self._next_id += 1
+            event = {'id': self._next_id, 'type': event_type, 'data': data}
+            targets = set()
+            for topic in topics:
+                targets.update(self._subscribers.get(topic, ()))
+            self.published += 1
+        for subscription in targets:
+            subscription.offer(event)
+        return len(targets)
+
+    def stream(self, subscription):
+        """SSE lines for a subscription, with heartbeat comments while idle"""
+        try:
+            yield f'retry: 3000\n: connected {time.time():.0f}\n\n'
+            while True:
+                event = subscription.next_event()
+                if event is None:
+                    yield ': heartbeat\n\n'
+                    continue
+                lines = f"event: {event['type']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n"
+                if event['id'] is not None:
+                    lines = f"id: {event['id']}\n" + lines
+                yield lines + '\n'
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._open),
+                'max_streams': self.max_streams,
+                'refused': self.refused,
+                'published': self.published,
+                'queued': sum(subscription.queue.qsize() for subscription in self._open),
+                'dropped': sum(subscription.dropped for subscription in self._open)
+            }
+
+hub = EventHub()
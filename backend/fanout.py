@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from collections import deque
+
+from background import WorkerThreads, latency_summary
+
+FANOUT_BATCH = int(os.environ.get('SMARTSTART_FANOUT_BATCH', 500))
+
+# Wait after a failed batch write: doubles per consecutive failure, capped
+RETRY_SECONDS = 0.5
+MAX_RETRY_SECONDS = 30.0
+
+LATENCY_SAMPLES = 1000
+
+class _Event:
+    __slots__ = ('notification', 'recipient_ids', 'key', 'offset', 'submitted_at')
+
+    def __init__(self, notification, recipient_ids, key):
+        self.notification = notification
+        self.recipient_ids = recipient_ids
+        self.key = key
+        self.offset = 0
+        self.submitted_at = time.time()
+
+    @property
+    def remaining(self):
+        return max(len(self.recipient_ids), 1) - self.offset
+
+class NotificationFanout:
+    """Writes notification events as per-recipient inbox entries from a background worker
+
+    submit() takes an event (a notification with its full recipient list)
+    and returns at once. The worker expands events into one entry per
+    recipient, or a single broadcast entry for an empty list, and writes
+    them with repo.add_notifications() in batches of up to batch_size, so a
+    company-wide meeting costs a few writes instead of holding up the
+    request. Entries keep the event's id as event_id, get their own id from
+    the store and carry delivery_key '<event key>:<recipient>'; the store
+    skips keys it already has, so a batch retried after a failed write never
+    delivers twice. publish(entry) runs for every entry actually added.
+    """
+
+    def __init__(self, repo, publish=None, batch_size=FANOUT_BATCH):
+        self.repo = repo
+        self.publish = publish
+        self.batch_size = batch_size
+        self._cond = threading.Condition()
+        self._events = deque()
+        self._pending_entries = 0
+        self._in_flight = 0
+        self._worker = WorkerThreads(self._run, 'notification-fanout')
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.counters = {'events': 0, 'written': 0, 'duplicates': 0, 'batches': 0, 'write_errors': 0}
+
+    def submit(self, notification, key=None):
+        """Queue a notification event for delivery to its recipient_ids (everyone if empty)"""
+        event = _Event(notification, list(dict.fromkeys(notification.get('recipient_ids') or [])),
+                       key or f"notification-{notification['id']}")
+        with self._cond:
+            self._worker.ensure_started()
+            self._events.append(event)
+            self._pending_entries += event.remaining
+            self.counters['events'] += 1
+            self._cond.notify()
+        return notification
+
+    def _entry(self, event, index):
+        notification = event.notification
+        entry = dict(notification, event_id=notification['id'])
+        if event.recipient_ids:
+            recipient_id = event.recipient_ids[index]
+            entry.update(recipient_ids=[recipient_id], delivery_key=f'{event.key}:{recipient_id}')
+        else:
+            entry['delivery_key'] = f'{event.key}:*'
+        return entry
+
+    def _take(self):
+        """Up to batch_size entries from the oldest events, with the events they complete"""
+        with self._cond:
+            while not self._events:
+                self._cond.wait()
+            entries, completed = [], []
+            for event in self._events:
+                count = min(event.remaining, self.batch_size - len(entries))
+                entries.extend(self._entry(event, event.offset + i) for i in range(count))
+                if count == event.remaining:
+                    completed.append(event)
+                if len(entries) >= self.batch_size:
+                    break
+            self._in_flight = len(entries)
+            return entries, completed
+
+    def _run(self):
+        failures = 0
+        while True:
+            entries, completed = self._take()
+            try:
+                added = self.repo.add_notifications(entries)
+            except Exception as exc:
+                failures += 1
+                with self._cond:
+                    self.counters['write_errors'] += 1
+                    self._in_flight = 0
+                print(f'❌ Notification fan-out write failed ({len(entries)} entries): {exc}')
+                time.sleep(min(MAX_RETRY_SECONDS, RETRY_SECONDS * 2 ** (failures - 1)))
+                continue
+            failures = 0
+
+            written_at = time.time()
+            with self._cond:
+                # Advance the events this batch covered; the same entries are taken again after a failure
+                remaining = len(entries)
+                while remaining:
+                    event = self._events[0]
+                    step = min(event.remaining, remaining)
+                    event.offset += step
+                    remaining -= step
+                    if event.remaining == 0:
+                        self._events.popleft()
+                        self._latencies.append(written_at - event.submitted_at)
+                self._pending_entries -= len(entries)
+                self._in_flight = 0
+                self.counters['batches'] += 1
+                self.counters['written'] += len(added)
+                self.counters['duplicates'] += len(entries) - len(added)
+                self._cond.notify_all()
+
+            if self.publish is not None:
+                for entry in added:
+                    self.publish(entry)
+
+    def flush(self, timeout=None):
+        """Wait until every submitted event is written; False on timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._events:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stats(self):
+        with self._cond:
+            latencies = latency_summary(self._latencies)
+            stats = dict(self.counters,
+                         pending_events=len(self._events),
+                         pending_entries=self._pending_entries,
+                         in_flight=self._in_flight,
+                         oldest_pending_seconds=round(time.time() - self._events[0].submitted_at, 3)
+                         if self._events else 0)
+        if latencies:
+            stats['latency_ms'] = latencies
+        return stats
@@ -0,0 +1,65 @@
+from pagination import DEFAULT_LIMIT, SortedIndex
+from storage import FrozenDict, freeze
+
+BROADCAST = '*'
+
+def _recipients(notification):
+    # As strings, like create_notification and the SQLite store; older files may hold numeric ids
+    recipient_ids = notification.get('recipient_ids') or []
+    return list(dict.fromkeys(str(recipient_id) for recipient_id in recipient_ids)) or [BROADCAST]
+
+def visible_to(notification, user_id):
+    """Whether a notification is in a user's inbox: addressed to them or broadcast"""
+    recipients = _recipients(notification)
+    return recipients == [BROADCAST] or str(user_id) in recipients
+
+class InboxIndex(SortedIndex):
+    """Per-user notification lists with running unread counters
+
+    Notifications addressed to users are kept in one list per recipient and
+    broadcasts (empty recipient_ids) in a shared list, each sorted by
+    (created_at, id). A page merges the user's list with the broadcast list
+    from the cursor, so it costs O(page size) regardless of how many
+    notifications exist. Unread counters are adjusted on every insert and
+    read instead of being recounted.
+    """
+
+    def __init__(self, notifications=()):
+        self._unread = {}
+        self.total_unread = 0
+        super().__init__(notifications, groups=_recipients)
+
+    def add(self, notification):
+        notification = freeze(notification)
+        sequence = super().add(notification)
+        if not notification.get('read', False):
+            for recipient_id in _recipients(notification):
+                self._unread[recipient_id] = self._unread.get(recipient_id, 0) + 1
+            self.total_unread += 1
+        return sequence
+
+    def mark_read(self, notification_ids):
+        """Flip notifications to read, returning how many were unread"""
+        changed = 0
+        for notification_id in notification_ids:
+            notification = self.get(notification_id)
+            if notification is None or notification.get('read', False):
+                continue
+            self.replace(FrozenDict(notification, read=True))
+            for recipient_id in _recipients(notification):
+                self._unread[recipient_id] -= 1
+            self.total_unread -= 1
+            changed += 1
+        return changed
+
+    def unread_count(self, user_id):
+        return self._unread.get(user_id, 0) + self._unread.get(BROADCAST, 0)
+
+    def inbox_page(self, user_id, limit=DEFAULT_LIMIT, before=None, after=None):
+        """Newest notifications for a user, broadcasts included"""
+        return self.page((user_id, BROADCAST), limit, before, after)
+
+    def unread_ids(self, user_id):
+        """Ids of every unread notification a user can see"""
+        return [notification['id'] for notification in self.inbox_page(user_id, len(self)).items
+                if not notification.get('read', False)]
@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from storage import (collection_lock, data_path, freeze, load_data_for_update, read_data, save_data, unseen_records,
+                     FrozenDict)
+
+def replay(records, path):
+    """Records of a snapshot list as plain dicts, with the inserts and patches of a journal file applied"""
+    records = [dict(record) for record in records]
+    positions = {}
+    for position, record in enumerate(records):
+        positions.setdefault(record.get('id'), position)
+    try:
+        with open(path, 'rb') as f:
+            chunk = f.read()
+    except FileNotFoundError:
+        return records
+    # A line still being appended has no newline yet
+    for line in chunk[:chunk.rfind(b'\n') + 1].splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        if entry.get('op') == 'insert':
+            positions.setdefault(entry['record'].get('id'), len(records))
+            records.append(entry['record'])
+        elif entry.get('op') == 'patch' and entry['id'] in positions:
+            records[positions[entry['id']]].update(entry['changes'])
+    return records
+
+class Journal:
+    """Append-only JSONL journal over a list stored inside a JSON snapshot document
+
+    Inserts and patches are appended as one fsync'd line each. Reads replay the
+    snapshot plus the journal once and then only the lines appended since.
+    Compaction folds the journal back into the snapshot and truncates it.
+    """
+
+    def __init__(self, filename, key, compact_after=500):
+        self.filename = filename
+        self.key = key
+        self.journal_filename = f'{key}.journal.jsonl'
+        self.compact_after = compact_after
+        self._lock = threading.RLock()
+        self._compacting = False
+        self._reset_state(None)
+
+    def _reset_state(self, snapshot):
+        self._snapshot = snapshot
+        self._offset = 0
+        self._lines = 0
+        self._records = []
+        self._positions = {}
+        self._view = None
+
+    def _apply(self, entry):
+        op = entry.get('op')
+        if op == 'insert':
+            record = freeze(entry['record'])
+            self._positions.setdefault(record.get('id'), len(self._records))
+            self._records.append(record)
+        elif op == 'patch':
+            position = self._positions.get(entry['id'])
+            if position is not None:
+                merged = dict(self._records[position])
+                merged.update(freeze(entry['changes']))
+                self._records[position] = FrozenDict(merged)
+        self._view = None
+
+    def _journal_size(self):
+        try:
+            return os.path.getsize(data_path(self.journal_filename))
+        except FileNotFoundError:
+            return 0
+
+    def _refresh(self):
+        """Replay snapshot + journal, or just the journal lines added since the last read"""
+        # Always the current snapshot; pinning happens above the journal
+        if read_data(self.filename) is self._snapshot and self._journal_size() == self._offset:
+            return
+        # Under the journal lock, so another worker's compaction can't be seen half done
+        # (its new snapshot next to the journal it is about to truncate)
+        with collection_lock(self.journal_filename):
+            snapshot = read_data(self.filename)
+            size = self._journal_size()
+            if snapshot is not self._snapshot or size < self._offset:
+                self._reset_state(snapshot)
+                for record in snapshot.get(self.key, []):
+                    self._apply({'op': 'insert', 'record': record})
+
+            if size > self._offset:
+                with open(data_path(self.journal_filename), 'rb') as f:
+                    f.seek(self._offset)
+                    chunk = f.read(size - self._offset)
+                # Only consume complete lines, a concurrent append may still be in flight
+                end = chunk.rfind(b'\n') + 1
+                for line in chunk[:end].splitlines():
+                    if line.strip():
+                        self._apply(json.loads(line))
+                        self._lines += 1
+                self._offset += end
+
+    def records(self):
+        """Current records as read-only views, in insertion order"""
+        with self._lock:
+            self._refresh()
+            if self._view is None:
+                self._view = tuple(self._records)
+            return self._view
+
+    def get(self, record_id):
+        with self._lock:
+            self._refresh()
+            position = self._positions.get(record_id)
+            return self._records[position] if position is not None else None
+
+    @contextmanager
+    def write_lock(self):
+        """Hold off every other writer, in this process and others, for a series of calls"""
+        with self._lock, collection_lock(self.journal_filename):
+            yield
+
+    def _write(self, *entries):
+        os.makedirs(os.path.dirname(data_path(self.journal_filename)) or '.', exist_ok=True)
+        lines = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+        with open(data_path(self.journal_filename), 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, record):
+        """Journal a new record"""
+        with self._lock, collection_lock(self.journal_filename):
+            self._refresh()
+            self._write({'op': 'insert', 'record': record})
+            self._refresh()
+        self._maybe_compact()
+        return record
+
+    def append_many(self, records, unique_key=None):
+        """Journal several new records with a single fsync, returning the ones written
+
+        With unique_key, records whose value for it is already journaled are skipped.
+        """
+        with self._lock, collection_lock(self.journal_filename):
+            self._refresh()
+            if unique_key is not None:
+                records = unseen_records(self._records, records, unique_key)
+            if records:
+                self._write(*({'op': 'insert', 'record': record} for record in records))
+                self._refresh()
+        self._maybe_compact()
+        return records
+
+    def patch(self, record_id, changes):
+        """Journal changes to an existing record, returning the patched record or None"""
+        with self._lock, collection_lock(self.journal_filename):
+            self._refresh()
+            if record_id not in self._positions:
+                return None
+            self._write({'op': 'patch', 'id': record_id, 'changes': changes})
+            self._refresh()
+            patched = self._records[self._positions[record_id]]
+        self._maybe_compact()
+        return patched
+
+    def patch_many(self, record_ids, changes):
+        """Journal the same changes for several records with a single fsync"""
+        with self._lock, collection_lock(self.journal_filename):
+            self._refresh()
+            entries = [{'op': 'patch', 'id': record_id, 'changes': changes}
+                       for record_id in record_ids if record_id in self._positions]
+            if entries:
+                self._write(*entries)
+                self._refresh()
+        self._maybe_compact()
+        return len(entries)
+
+    def compact(self):
+        """Fold the journal into the snapshot document and truncate it"""
+        with self._lock, collection_lock(self.journal_filename), collection_lock(self.filename):
+            self._refresh()
+            document = load_data_for_update(self.filename)
+            document[self.key] = [dict(record) for record in self._records]
+            save_data(self.filename, document)
+            with open(data_path(self.journal_filename), 'w', encoding='utf-8'):
+                pass
+            self._reset_state(None)
+            self._refresh()
+
+    def reset(self):
+        """Drop the journal, e.g. after the snapshot was re-seeded"""
+        with self._lock:
+            try:
+                os.remove(data_path(self.journal_filename))
+            except FileNotFoundError:
+                pass
+            self._reset_state(None)
+
+    def _maybe_compact(self):
+        with self._lock:
+            if self._compacting or self._lines < self.compact_after:
+                return
+            self._compacting = True
+
+        def run():
+            try:
+                self.compact()
+            finally:
+                self._compacting = False
+
+        threading.Thread(target=run, name=f'journal-compact-{self.key}', daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            return {'records': len(self._records), 'journal_lines': self._lines}
@@ -0,0 +1,277 @@
+import heapq
+import os
+import random
+import smtplib
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+
+from background import WorkerThreads, latency_summary
+
+SMTP_HOST = os.environ.get('SMARTSTART_SMTP_HOST', '')
+SMTP_PORT = int(os.environ.get('SMARTSTART_SMTP_PORT', 25))
+SMTP_USER = os.environ.get('SMARTSTART_SMTP_USER', '')
+SMTP_PASSWORD = os.environ.get('SMARTSTART_SMTP_PASSWORD', '')
+SMTP_STARTTLS = os.environ.get('SMARTSTART_SMTP_STARTTLS') == '1'
+SMTP_TIMEOUT = 10
+MAIL_FROM = os.environ.get('SMARTSTART_MAIL_FROM', 'smartstart@bpi.com.ph')
+MAIL_WORKERS = int(os.environ.get('SMARTSTART_MAIL_WORKERS', 2))
+MAIL_BATCH = int(os.environ.get('SMARTSTART_MAIL_BATCH', 20))
+MAIL_MAX_ATTEMPTS = int(os.environ.get('SMARTSTART_MAIL_RETRIES', 5))
+
+# Retry n waits about BACKOFF_SECONDS * 2**(n-1), capped, with jitter
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 300.0
+
+# Envelope recipients per message; larger invitations are split (recipients go in Bcc)
+MAX_RECIPIENTS = 50
+
+LATENCY_SAMPLES = 1000
+
+def render_invitation(meeting, recipients, sender=MAIL_FROM):
+    """Invitation messages for a meeting, as (EmailMessage, envelope recipients) pairs
+
+    recipients are (name, email) pairs.
+    """
+    attendees = meeting.get('attendees', [])
+    link = meeting.get('meeting_link_data') or {}
+    lines = [
+        'BPI FINANCE DEPARTMENT MEETING INVITATION',
+        '',
+        f"Meeting: {meeting.get('title', 'Finance Team Meeting')}",
+        f"Date: {meeting.get('date', 'TBD')}",
+        f"Time: {meeting.get('time', 'TBD')}",
+        f"Duration: {meeting.get('duration', '30 minutes')}",
+        f"Platform: {meeting.get('video_platform', 'Google Meet').replace('_', ' ').title()}",
+    ]
+    if link:
+        lines.append(f"Meeting Link: {link.get('url', 'N/A')}")
+        if meeting.get('video_platform') == 'zoom':
+            lines.append(f"Meeting ID: {link.get('meeting_id', 'N/A')}")
+            lines.append(f"Passcode: {link.get('passcode', 'N/A')}")
+        else:
+            lines.append(f"Meeting Code: {link.get('meeting_code', 'N/A')}")
+    lines.append(f"Finance Team Attendees ({len(attendees)}): {', '.join(attendees)}")
+    if meeting.get('agenda'):
+        lines.append(f"Custom Agenda: {meeting['agenda']}")
+    if meeting.get('ai_agenda'):
+        lines += ['', 'AI-Generated Finance Agenda:', meeting['ai_agenda']]
+    body = '\n'.join(lines) + '\n'
+
+    messages = []
+    for start in range(0, len(recipients), MAX_RECIPIENTS):
+        chunk = recipients[start:start + MAX_RECIPIENTS]
+        message = EmailMessage()
+        message['Subject'] = f"Finance Meeting: {meeting.get('title', 'Finance Team Meeting')}"
+        message['From'] = formataddr(('BPI SmartStart', sender))
+        message['To'] = formataddr(chunk[0]) if len(chunk) == 1 else 'undisclosed-recipients:;'
+        message['Message-ID'] = make_msgid(domain=sender.rpartition('@')[2] or None)
+        message.set_content(body)
+        messages.append((message, [email for _, email in chunk]))
+    return messages
+
+class ConsoleTransport:
+    """Prints messages instead of sending them, for development without an SMTP server"""
+
+    name = 'console'
+
+    def send(self, batch):
+        for message, recipients in batch:
+            print('\n' + '=' * 70)
+            print(f"📧 {message['Subject']}")
+            print(f"📨 To ({len(recipients)}): {', '.join(recipients)}")
+            print('=' * 70)
+            print(message.get_content().rstrip())
+            print('=' * 70)
+        return {}
+
+class SmtpTransport:
+    """Delivers a batch of messages over one SMTP connection"""
+
+    name = 'smtp'
+
+    def __init__(self, host, port=25, username='', password='', starttls=False, timeout=SMTP_TIMEOUT,
+                 sender=MAIL_FROM):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.sender = sender
+
+    def send(self, batch):
+        """Send every message, returning {index in batch: exception} for the ones that failed"""
+        failures = {}
+        sent = 0
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                if self.starttls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password)
+                for index, (message, recipients) in enumerate(batch):
+                    try:
+                        smtp.send_message(message, self.sender, recipients)
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as exc:
+                        failures[index] = exc
+                    sent = index + 1
+        except (OSError, smtplib.SMTPException) as exc:
+            # The connection went away: whatever wasn't handed over yet failed with it
+            for index in range(sent, len(batch)):
+                failures.setdefault(index, exc)
+        return failures
+
+def transport_from_env():
+    if SMTP_HOST:
+        return SmtpTransport(SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_STARTTLS)
+    return ConsoleTransport()
+
+def is_permanent(exc):
+    """Whether retrying a failed send is pointless (5xx replies, every recipient refused)"""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+class _Job:
+    __slots__ = ('render', 'args', 'messages', 'attempts', 'enqueued_at')
+
+    def __init__(self, render, args):
+        self.render = render
+        self.args = args
+        self.messages = None
+        self.attempts = 0
+        self.enqueued_at = time.time()
+
+class MailQueue:
+    """Outbound email: requests enqueue, a worker pool renders and delivers
+
+    Each job is a render(*args) call that produces (message, recipients)
+    pairs; it runs on a worker, so the request only pays for the enqueue.
+    A worker takes up to batch_size ready jobs and sends all their messages
+    over one transport connection. Messages that fail transiently are
+    retried with exponential backoff and jitter, up to max_attempts; jobs
+    waiting for a retry sit in a heap ordered by due time.
+    """
+
+    def __init__(self, transport, workers=MAIL_WORKERS, batch_size=MAIL_BATCH, max_attempts=MAIL_MAX_ATTEMPTS,
+                 backoff=BACKOFF_SECONDS):
+        self.transport = transport
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._cond = threading.Condition()
+        self._ready = deque()
+        self._delayed = []
+        self._sequence = 0
+        self._in_flight = 0
+        self._workers = WorkerThreads(self._run, 'mail-worker', count=workers)
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.counters = {'enqueued': 0, 'sent': 0, 'failed': 0, 'retried': 0, 'batches': 0}
+
+    def submit(self, render, *args):
+        """Queue render(*args) for rendering and delivery"""
+        with self._cond:
+            self._workers.ensure_started()
+            self._ready.append(_Job(render, args))
+            self.counters['enqueued'] += 1
+            self._cond.notify()
+        return True
+
+    def _take(self):
+        with self._cond:
+            while True:
+                now = time.time()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._delayed)[2])
+                if self._ready:
+                    batch = [self._ready.popleft() for _ in range(min(self.batch_size, len(self._ready)))]
+                    self._in_flight += len(batch)
+                    return batch
+                self._cond.wait(self._delayed[0][0] - now if self._delayed else None)
+
+    def _run(self):
+        while True:
+            batch = self._take()
+            try:
+                self._deliver(batch)
+            except Exception as exc:
+                print(f'❌ Mail worker error: {exc}')
+                with self._cond:
+                    self.counters['failed'] += len(batch)
+            finally:
+                with self._cond:
+                    self._in_flight -= len(batch)
+                    self._cond.notify_all()
+
+    def _deliver(self, batch):
+        jobs = []
+        for job in batch:
+            if job.messages is None:
+                try:
+                    job.messages = list(job.render(*job.args))
+                except Exception as exc:
+                    print(f'❌ Could not render email: {exc}')
+                    with self._cond:
+                        self.counters['failed'] += 1
+                    continue
+            jobs.append(job)
+
+        outgoing = [(job, message) for job in jobs for message in job.messages]
+        failures = self.transport.send([message for _, message in outgoing]) if outgoing else {}
+        with self._cond:
+            self.counters['batches'] += 1
+
+        failed_messages = {}
+        for index, exc in failures.items():
+            job, message = outgoing[index]
+            failed_messages.setdefault(job, []).append((message, exc))
+
+        sent_at = time.time()
+        with self._cond:
+            for job in jobs:
+                failed = failed_messages.get(job, [])
+                retryable = [message for message, exc in failed if not is_permanent(exc)]
+                if not failed:
+                    self.counters['sent'] += 1
+                    self._latencies.append(sent_at - job.enqueued_at)
+                    continue
+                job.attempts += 1
+                if retryable and job.attempts < self.max_attempts:
+                    job.messages = retryable
+                    delay = min(MAX_BACKOFF_SECONDS, self.backoff * 2 ** (job.attempts - 1))
+                    self._sequence += 1
+                    heapq.heappush(self._delayed, (sent_at + delay * random.uniform(0.5, 1.0), self._sequence, job))
+                    self.counters['retried'] += 1
+                else:
+                    self.counters['failed'] += 1
+                    print(f'❌ Giving up on email after {job.attempts} attempt(s): {failed[0][1]}')
+            self._cond.notify()
+
+    def flush(self, timeout=None):
+        """Wait until nothing is queued, waiting for a retry or being delivered; False on timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._ready or self._delayed or self._in_flight:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stats(self):
+        with self._cond:
+            latencies = latency_summary(self._latencies)
+            oldest = min((job.enqueued_at for job in self._ready), default=None)
+            stats = dict(self.counters,
+                         transport=self.transport.name,
+                         queued=len(self._ready),
+                         waiting_retry=len(self._delayed),
+                         in_flight=self._in_flight,
+                         oldest_queued_seconds=round(time.time() - oldest, 3) if oldest is not None else 0)
+        if latencies:
+            stats['latency_ms'] = latencies
+        return stats
@@ -0,0 +1,194 @@
+import math
+import threading
+from bisect import bisect_left
+from datetime import datetime
+
+SLOT_MINUTES = 15
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+
+def parse_time_slot(time_label):
+    """'9:00 AM' or '14:30' -> index of the 15-minute slot it starts in"""
+    for fmt in ('%I:%M %p', '%H:%M'):
+        try:
+            parsed = datetime.strptime(time_label.strip(), fmt)
+            return (parsed.hour * 60 + parsed.minute) // SLOT_MINUTES
+        except (AttributeError, ValueError):
+            continue
+    raise ValueError(f'Unrecognized time: {time_label}')
+
+def parse_duration_slots(duration):
+    """'30 minutes' or 45 -> number of 15-minute slots"""
+    minutes = int(str(duration or 30).split()[0])
+    return max(1, math.ceil(minutes / SLOT_MINUTES))
+
+def format_slot(slot):
+    hour, minute = divmod(slot * SLOT_MINUTES, 60)
+    return datetime(2000, 1, 1, hour % 24, minute).strftime('%I:%M %p').lstrip('0')
+
+def meeting_interval(meeting):
+    """(date, start slot, end slot) of a stored meeting, or None if it has no usable time"""
+    try:
+        start = parse_time_slot(meeting.get('time'))
+        return meeting['date'], start, start + parse_duration_slots(meeting.get('duration'))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class MeetingConflict(Exception):
+    """Raised by MeetingCalendar.book when a meeting would double-book attendees"""
+
+    def __init__(self, conflicts):
+        super().__init__(f'{len(conflicts)} scheduling conflict(s)')
+        self.conflicts = conflicts
+
+class _DayIntervals:
+    """One attendee's meetings on one day, sorted by start slot
+
+    ends_max[i] is the largest end among intervals[:i + 1], so an overlap
+    query bisects on the start and walks back only while something can
+    still overlap. Instances are never modified once built: adding a
+    meeting makes a new one, so readers holding the old one stay consistent.
+    """
+
+    __slots__ = ('starts', 'intervals', 'ends_max')
+
+    def __init__(self, starts=(), intervals=(), ends_max=()):
+        self.starts = list(starts)
+        self.intervals = list(intervals)
+        self.ends_max = list(ends_max)
+
+    def with_interval(self, start, end, meeting):
+        position = bisect_left(self.starts, start)
+        day = _DayIntervals(self.starts, self.intervals, self.ends_max[:position])
+        day.starts.insert(position, start)
+        day.intervals.insert(position, (start, end, meeting))
+        running = day.ends_max[position - 1] if position else 0
+        for interval in day.intervals[position:]:
+            running = max(running, interval[1])
+            day.ends_max.append(running)
+        return day
+
+    def overlapping(self, start, end):
+        found = []
+        position = bisect_left(self.starts, end) - 1
+        while position >= 0 and self.ends_max[position] > start:
+            if self.intervals[position][1] > start:
+                found.append(self.intervals[position])
+            position -= 1
+        found.reverse()
+        return found
+
+class MeetingCalendar:
+    """Interval index over booked meetings per attendee and date, in 15-minute slots
+
+    Rebuilt from the repository only when the meetings collection changed
+    outside this process; meetings booked here, and meetings found while
+    booking, are indexed incrementally. Meetings are append-only with
+    sequential ids, so the index only needs the ones after the last id it has.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._lock = threading.Lock()
+        self._version = None
+        self._days = {}
+        self._last_id = 0
+
+    def _ensure_current(self):
+        version = self.repo.version('meetings')
+        if version != self._version:
+            self._days = {}
+            self._last_id = 0
+            for meeting in self.repo.list_meetings():
+                self._index(meeting)
+            self._version = version
+
+    def _index(self, meeting):
+        meeting_id = meeting.get('id') or 0
+        if meeting_id <= self._last_id:
+            return
+        self._last_id = meeting_id
+        interval = meeting_interval(meeting)
+        if interval is None:
+            return
+        date, start, end = interval
+        summary = {'id': meeting.get('id'), 'title': meeting.get('title'), 'time': meeting.get('time'),
+                   'duration': meeting.get('duration')}
+        for attendee_id in meeting.get('attendeeIds') or []:
+            day = self._days.get((attendee_id, date)) or _DayIntervals()
+            # Replaced rather than changed in place, for lookups running without the lock
+            self._days[(attendee_id, date)] = day.with_interval(start, end, summary)
+
+    def book(self, meeting, save, allow_conflicts=False, prepare=None):
+        """Save a meeting unless it overlaps an attendee's booked meetings, returning the conflicts
+
+        save(meeting, check) stores the meeting and must call check(newer_than)
+        inside its write of the meetings collection, before storing anything;
+        newer_than(meeting_id) lists the stored meetings after that id. So the
+        conflict check sees every meeting saved by any thread or worker, and
+        none can be booked between the check and the save. On a conflict it
+        raises MeetingConflict, unless allow_conflicts. prepare(conflicts)
+        then runs, still inside the write, just before the meeting is stored.
+        """
+        interval = meeting_interval(meeting)
+        found = []
+
+        def check(newer_than):
+            with self._lock:
+                self._ensure_current()
+                for stored in newer_than(self._last_id):
+                    self._index(stored)
+                if interval is not None:
+                    found.extend(self._conflicts(meeting.get('attendeeIds') or [], *interval))
+            if found and not allow_conflicts:
+                raise MeetingConflict(found)
+            if prepare is not None:
+                prepare(found)
+
+        try:
+            saved = save(meeting, check)
+        except MeetingConflict:
+            raise
+        except Exception:
+            # Meetings indexed during the check may not have been stored
+            with self._lock:
+                self._version = None
+            raise
+        with self._lock:
+            self._index(saved)
+            self._version = self.repo.version('meetings')
+        return found
+
+    def _conflicts(self, attendee_ids, date, start, end):
+        """Booked meetings overlapping [start, end) for each attendee"""
+        found = []
+        for attendee_id in attendee_ids:
+            day = self._days.get((attendee_id, date))
+            if day is None:
+                continue
+            for slot_start, slot_end, meeting in day.overlapping(start, end):
+                found.append({
+                    'attendee_id': attendee_id,
+                    'meeting_id': meeting['id'],
+                    'title': meeting['title'],
+                    'start': format_slot(slot_start),
+                    'end': format_slot(slot_end)
+                })
+        return found
+
+    def slot_lookup(self, windows):
+        """Callable (attendee_id, date) -> title of a booked meeting or None per (start, end) window"""
+        with self._lock:
+            self._ensure_current()
+            days = self._days
+
+        def lookup(attendee_id, date):
+            day = days.get((attendee_id, date))
+            if day is None:
+                return [None] * len(windows)
+            titles = []
+            for start, end in windows:
+                overlapping = day.overlapping(start, end)
+                titles.append(overlapping[0][2]['title'] if overlapping else None)
+            return titles
+
+        return lookup
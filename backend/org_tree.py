@@ -0,0 +1,123 @@
+from employee_views import EmployeeView
+
+TEAM, ORG = 'team', 'org'
+SCOPES = (TEAM, ORG)
+
+class OrgTree(EmployeeView):
+    """Manager -> team index, with manager -> sub-manager links for skip-level roll-ups
+
+    An employee belongs to the team of their manager_id, or, if that is
+    empty, to the manager whose managers[*].employees lists them. A manager
+    reports to whichever team their own employee record is in. Direct teams
+    are kept as id sets; org-wide roll-ups (everyone under a manager) are
+    computed on first use and dropped for the changed managers' chain of
+    command when an employee changes.
+    """
+
+    def __init__(self, repo):
+        super().__init__(repo)
+        self._managers = {}
+        self._listed = {}
+        self._manager_ids = {}
+        self._members = {}
+        self._positions = {}
+        self._teams = {}
+        self._parents = {}
+        self._children = {}
+        self._rollups = {}
+
+    def rebuild(self, employees):
+        self._managers = dict(self.repo.get_managers()) if self.repo is not None else {}
+        self._listed = {employee_id: manager_id for manager_id, manager in self._managers.items()
+                        for employee_id in manager.get('employees', [])}
+        self._members = {}
+        self._positions = {}
+        self._teams = {}
+        for position, member in enumerate(employees):
+            self._positions[member['id']] = position
+            self._members[member['id']] = member
+            manager_id = self.manager_of(member)
+            if manager_id:
+                self._teams.setdefault(manager_id, set()).add(member['id'])
+        self._link_managers()
+
+    def apply(self, before, after):
+        old_manager, new_manager = self.manager_of(before), self.manager_of(after)
+        self._members[after['id']] = after
+        if old_manager != new_manager:
+            if old_manager:
+                self._teams[old_manager].discard(after['id'])
+            if new_manager:
+                self._teams.setdefault(new_manager, set()).add(after['id'])
+        if after.get('employee_id') in self._manager_ids or before.get('employee_id') in self._manager_ids:
+            # A manager moved, so the tree itself changed
+            self._link_managers()
+            return
+        for manager_id in {old_manager, new_manager} - {None, ''}:
+            for ancestor in self.chain_of_command(manager_id):
+                self._rollups.pop(ancestor, None)
+
+    def _link_managers(self):
+        # employee_id of each manager's own employee record -> manager id
+        self._manager_ids = {manager.get('employee_id'): manager_id
+                             for manager_id, manager in self._managers.items() if manager.get('employee_id')}
+        self._parents = {}
+        self._children = {}
+        for member in self._members.values():
+            manager_id = self._manager_ids.get(member.get('employee_id'))
+            parent = self.manager_of(member)
+            if manager_id and parent and parent != manager_id:
+                self._parents[manager_id] = parent
+                self._children.setdefault(parent, []).append(manager_id)
+        self._rollups = {}
+
+    def manager_of(self, member):
+        """Manager id of the team an employee belongs to, or None"""
+        return member.get('manager_id') or self._listed.get(member.get('employee_id'))
+
+    def chain_of_command(self, manager_id):
+        """The manager followed by their managers up to the top of the tree"""
+        chain = []
+        while manager_id and manager_id not in chain:
+            chain.append(manager_id)
+            manager_id = self._parents.get(manager_id)
+        return chain
+
+    def is_manager(self, manager_id):
+        with self._lock:
+            self.ensure_current()
+            return manager_id in self._managers or manager_id in self._teams
+
+    def managers_under(self, manager_id, scope=TEAM):
+        """The manager, plus every manager below them for the org scope"""
+        with self._lock:
+            self.ensure_current()
+            if scope == TEAM:
+                return [manager_id]
+            managers, pending = [], [manager_id]
+            while pending:
+                current = pending.pop()
+                if current in managers:
+                    continue
+                managers.append(current)
+                pending.extend(self._children.get(current, ()))
+            return managers
+
+    def member_ids(self, manager_id, scope=TEAM):
+        """Ids of a manager's direct team, or of everyone under them for the org scope"""
+        with self._lock:
+            self.ensure_current()
+            if scope == TEAM:
+                return frozenset(self._teams.get(manager_id, ()))
+            rollup = self._rollups.get(manager_id)
+            if rollup is None:
+                rollup = frozenset().union(*(self._teams.get(manager, ())
+                                             for manager in self.managers_under(manager_id, ORG)))
+                self._rollups[manager_id] = rollup
+            return rollup
+
+    def members(self, manager_id, scope=TEAM):
+        """A manager's team (or whole org) records, in employee list order"""
+        with self._lock:
+            ids = self.member_ids(manager_id, scope)
+            return [self._members[member_id] for member_id in sorted(ids, key=self._positions.__getitem__)]
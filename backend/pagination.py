@@ -0,0 +1,123 @@
+import base64
+import heapq
+import json
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+from itertools import islice
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# items newest first; next_cursor pages to older items, prev_cursor to newer ones
+Page = namedtuple('Page', ['items', 'next_cursor', 'prev_cursor'])
+
+def encode_cursor(record):
+    """Opaque cursor for a record's (created_at, id) position"""
+    position = json.dumps([record.get('created_at') or '', record.get('id')], separators=(',', ':'))
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor; raises ValueError if it is malformed"""
+    try:
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(record_id, (str, int)):
+        raise ValueError('invalid cursor')
+    return created_at, record_id
+
+def parse_page_args(args, default_limit=DEFAULT_LIMIT):
+    """(limit, before, after) from query parameters; raises ValueError on bad input"""
+    try:
+        limit = int(args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f'limit must be between 1 and {MAX_LIMIT}')
+    before = args.get('before')
+    after = args.get('after')
+    if before and after:
+        raise ValueError('use either before or after, not both')
+    return limit, decode_cursor(before) if before else None, decode_cursor(after) if after else None
+
+def build_page(items, has_older, has_newer, before=None, after=None):
+    """Page with cursors to the neighbouring pages, if there are any"""
+    if not items:
+        # Nothing past the cursor; the cursor itself is still a valid way back
+        return Page(items, encode_cursor(dict(zip(('created_at', 'id'), after))) if after is not None else None,
+                    encode_cursor(dict(zip(('created_at', 'id'), before))) if before is not None else None)
+    return Page(items,
+                encode_cursor(items[-1]) if has_older else None,
+                encode_cursor(items[0]) if has_newer else None)
+
+def _entry_key(created_at, record_id):
+    return (created_at or '', str(record_id))
+
+def _descending(entries, end):
+    return (entries[i] for i in range(end - 1, -1, -1))
+
+def _ascending(entries, start):
+    return (entries[i] for i in range(start, len(entries)))
+
+class SortedIndex:
+    """Records grouped into lists sorted by (created_at, id), paged with a bisect seek
+
+    Each group holds (created_at, id, seq) entries, seq being the record's
+    position in insertion order. A page over one or more groups bisects to
+    the cursor in each and merges from there, so deep pages cost the same
+    as the first one.
+    """
+
+    def __init__(self, records=(), groups=None):
+        self.version = None
+        self._groups_of = groups or (lambda record: [None])
+        self._records = []
+        self._positions = {}
+        self._groups = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        sequence = len(self._records)
+        self._records.append(record)
+        # Updates by id apply to the first record with that id, as in storage
+        self._positions.setdefault(record.get('id'), sequence)
+        entry = _entry_key(record.get('created_at'), record.get('id')) + (sequence,)
+        for group in dict.fromkeys(self._groups_of(record)):
+            insort(self._groups.setdefault(group, []), entry)
+        return sequence
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, record_id):
+        sequence = self._positions.get(record_id)
+        return self._records[sequence] if sequence is not None else None
+
+    def replace(self, record):
+        """Swap in an updated record; created_at and grouping fields must not change"""
+        sequence = self._positions.get(record.get('id'))
+        if sequence is not None:
+            self._records[sequence] = record
+
+    def page(self, groups=(None,), limit=DEFAULT_LIMIT, before=None, after=None):
+        """Newest-first page across groups, older than before or newer than after"""
+        lists = [self._groups.get(group, []) for group in groups]
+        if after is not None:
+            floor = _entry_key(*after) + (math.inf,)
+            merged = heapq.merge(*(_ascending(entries, bisect_right(entries, floor)) for entries in lists))
+            entries = list(islice(merged, limit))[::-1]
+        else:
+            ceiling = _entry_key(*before) if before is not None else None
+            merged = heapq.merge(*(_descending(entries, len(entries) if ceiling is None else bisect_left(entries, ceiling))
+                                   for entries in lists), reverse=True)
+            entries = list(islice(merged, limit))
+
+        items = [self._records[entry[2]] for entry in entries]
+        if not entries:
+            return build_page(items, False, False, before, after)
+        oldest, newest = entries[-1][:2], entries[0][:2] + (math.inf,)
+        has_older = any(bisect_left(group, oldest) > 0 for group in lists)
+        has_newer = any(bisect_right(group, newest) < len(group) for group in lists)
+        return build_page(items, has_older, has_newer)
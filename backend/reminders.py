@@ -0,0 +1,211 @@
+import heapq
+import os
+import threading
+import time
+from datetime import datetime
+
+from background import WorkerThreads
+
+# Minutes before a meeting at which reminders go out, e.g. '1440,60,15'
+REMINDER_OFFSETS = tuple(sorted({int(offset) for offset in
+                                 os.environ.get('SMARTSTART_REMINDER_OFFSETS', '60,15').split(',') if offset.strip()},
+                                reverse=True))
+
+# How often the scheduler checks whether another process changed the stored meetings
+RESYNC_SECONDS = 60
+
+# Compact the heap once more than this share of it is cancelled entries
+STALE_RATIO = 0.5
+MIN_COMPACT_SIZE = 1024
+
+def meeting_start(meeting):
+    """Start of a booked meeting (date plus e.g. '9:00 AM') as a datetime, or None"""
+    date, start = meeting.get('date'), meeting.get('time')
+    if not date or not start:
+        return None
+    for pattern in ('%Y-%m-%d %I:%M %p', '%Y-%m-%d %H:%M'):
+        try:
+            return datetime.strptime(f'{date} {start.strip()}', pattern)
+        except ValueError:
+            continue
+    return None
+
+def request_start(meeting_request):
+    """Proposed start of a meeting request as a naive local datetime, or None
+
+    The pages send toISOString() values ('...T02:00:00.000Z'), which
+    fromisoformat() only reads from Python 3.11 on, so a trailing Z is
+    spelled out as +00:00. Values with an offset are converted to local time,
+    to compare with datetime.now() like every other stored time.
+    """
+    value = meeting_request.get('proposed_datetime') or ''
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    try:
+        starts_at = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return starts_at.astimezone().replace(tzinfo=None) if starts_at.tzinfo is not None else starts_at
+
+class ReminderScheduler:
+    """Fires reminders at fixed offsets before meetings, from a heap ordered by due time
+
+    Each source (a booked meeting or an accepted meeting request) gets one
+    heap entry per offset. The worker only ever looks at the top of the
+    heap, sleeping until it is due, so a tick costs O(log n) no matter how
+    many reminders are pending. Cancelling or rescheduling a source forgets
+    its live entries in O(1); the stale heap entries are skipped when they
+    surface and dropped in bulk once they make up most of the heap.
+
+    Nothing is persisted: load() yields (key, starts_at, payload) for every
+    stored source and runs at start-up and whenever another process changed
+    the underlying collections. Reminders whose time passed while the server
+    was down are sent late (only the most recent one per source) if the
+    meeting hasn't started yet. notify(key, offset, payload) must be
+    idempotent per (key, offset), since a restart can repeat a reminder.
+    """
+
+    def __init__(self, load, notify, offsets=REMINDER_OFFSETS, versions=None, clock=time.time):
+        self.load = load
+        self.notify = notify
+        self.offsets = tuple(sorted(set(offsets), reverse=True))
+        self.versions = versions
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._heap = []
+        self._live = {}
+        self._payloads = {}
+        self._live_count = 0
+        self._sequence = 0
+        self._loaded_versions = None
+        self._worker = WorkerThreads(self._run, 'reminder-scheduler', on_start=self._load)
+        self.counters = {'scheduled': 0, 'cancelled': 0, 'fired': 0, 'late': 0, 'rebuilds': 0, 'compactions': 0}
+
+    def ensure_started(self):
+        """Load the stored meetings and start the worker, once per process"""
+        self._worker.ensure_started()
+
+    def _load(self):
+        with self._cond:
+            self._rebuild()
+
+    def _rebuild(self):
+        versions = self.versions() if self.versions is not None else None
+        self._heap, self._live, self._payloads, self._live_count = [], {}, {}, 0
+        for key, starts_at, payload in self.load():
+            self._schedule(key, starts_at, payload)
+        heapq.heapify(self._heap)
+        self._loaded_versions = versions
+        self.counters['rebuilds'] += 1
+
+    def _schedule(self, key, starts_at, payload, push=list.append):
+        """Add heap entries for a source; push is heapq.heappush outside of a rebuild"""
+        now = self.clock()
+        start = starts_at.timestamp() if isinstance(starts_at, datetime) else starts_at
+        if start <= now:
+            return
+        live = {}
+        missed = [offset for offset in self.offsets if start - offset * 60 <= now]
+        for offset in self.offsets:
+            due = start - offset * 60
+            if due <= now:
+                # Only the latest reminder that is already due is still worth sending
+                if offset != missed[-1]:
+                    continue
+                due = now
+                self.counters['late'] += 1
+            self._sequence += 1
+            live[offset] = self._sequence
+            push(self._heap, (due, self._sequence, key, offset))
+        if live:
+            self._live[key] = live
+            self._payloads[key] = payload
+            self._live_count += len(live)
+            self.counters['scheduled'] += len(live)
+
+    def schedule(self, key, starts_at, payload):
+        """(Re)schedule the reminders for one source"""
+        with self._cond:
+            rescheduled = self._forget(key)
+            self._schedule(key, starts_at, payload, push=heapq.heappush)
+            if rescheduled:
+                self._maybe_compact()
+            self._cond.notify()
+
+    def cancel(self, key):
+        """Drop a source's pending reminders"""
+        with self._cond:
+            if self._forget(key):
+                self.counters['cancelled'] += 1
+                self._maybe_compact()
+
+    def _forget(self, key):
+        self._payloads.pop(key, None)
+        live = self._live.pop(key, None)
+        if live is None:
+            return False
+        self._live_count -= len(live)
+        return True
+
+    def _maybe_compact(self):
+        stale = len(self._heap) - self._live_count
+        if len(self._heap) >= MIN_COMPACT_SIZE and stale > len(self._heap) * STALE_RATIO:
+            self._heap = [entry for entry in self._heap if self._live.get(entry[2], {}).get(entry[3]) == entry[1]]
+            heapq.heapify(self._heap)
+            self.counters['compactions'] += 1
+
+    def _due(self):
+        """Pop the reminders that are due, or return ([], seconds until the next one)"""
+        now = self.clock()
+        fired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, sequence, key, offset = heapq.heappop(self._heap)
+            live = self._live.get(key)
+            if live is None or live.get(offset) != sequence:
+                continue
+            del live[offset]
+            self._live_count -= 1
+            payload = self._payloads[key]
+            if not live:
+                del self._live[key]
+                del self._payloads[key]
+            fired.append((key, offset, payload))
+        wait = self._heap[0][0] - now if self._heap else None
+        return fired, wait
+
+    def _run(self):
+        last_resync = self.clock()
+        while True:
+            with self._cond:
+                if self.versions is not None and self.clock() - last_resync >= RESYNC_SECONDS:
+                    last_resync = self.clock()
+                    if self.versions() != self._loaded_versions:
+                        self._rebuild()
+                fired, wait = self._due()
+                if not fired:
+                    self._cond.wait(min(wait, RESYNC_SECONDS) if wait is not None else RESYNC_SECONDS)
+                    continue
+                self.counters['fired'] += len(fired)
+            for key, offset, payload in fired:
+                try:
+                    self.notify(key, offset, payload)
+                except Exception as exc:
+                    print(f'❌ Reminder {key} ({offset} min) failed: {exc}')
+
+    def record_write(self, versions_before, versions_after):
+        """Note an own write that was scheduled directly, so it doesn't trigger a rebuild
+
+        If anything else changed the data since the last load, the versions
+        won't line up and the next resync rebuilds anyway.
+        """
+        with self._cond:
+            if self._loaded_versions == versions_before:
+                self._loaded_versions = versions_after
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self.counters, offsets=list(self.offsets), pending=self._live_count,
+                         stale_entries=len(self._heap) - self._live_count, sources=len(self._live))
+            next_due = self._heap[0][0] if self._heap else None
+        stats['next_due'] = datetime.fromtimestamp(next_due).isoformat() if next_due is not None else None
+        return stats
@@ -0,0 +1,85 @@
+"""Benchmark the batched team availability engine against the per-slot implementation
+
+    python scripts/bench_availability.py
+    python scripts/bench_availability.py --sizes 10 1000 10000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import generate_member_schedule, generate_member_status
+from availability import member_day, member_statuses, team_availability
+
+def legacy_team_availability(date, team_members):
+    """The original per (slot, member) implementation, kept for comparison"""
+    times = ['9:00 AM', '10:00 AM', '11:00 AM', '2:00 PM', '3:00 PM']
+    availability = []
+    for time_label in times:
+        available_members = []
+        unavailable_members = []
+        for member in team_members:
+            member_schedule = generate_member_schedule(member['id'], date)
+            time_slot = next((slot for slot in member_schedule if slot['time'] == time_label), None)
+            if time_slot and time_slot['available'] and member['status'] == 'available':
+                available_members.append({'id': member['id'], 'name': member['name'], 'role': member['role']})
+            else:
+                reason = 'Away' if member['status'] != 'available' else (time_slot['meeting'] if time_slot and time_slot['meeting'] else 'Busy')
+                unavailable_members.append({'id': member['id'], 'name': member['name'], 'role': member['role'], 'reason': reason})
+        available_count = len(available_members)
+        if available_count <= 5:
+            status = 'poor'
+        elif available_count <= 8:
+            status = 'limited'
+        else:
+            status = 'excellent'
+        availability.append({
+            'time': time_label,
+            'availableMembers': available_members,
+            'unavailableMembers': unavailable_members,
+            'status': status,
+            'allAvailable': available_count == len(team_members),
+            'availableCount': available_count,
+            'canScheduleTeam': available_count >= 5,
+            'canScheduleSmall': available_count >= 2
+        })
+    return availability
+
+def legacy_request(date, base_members):
+    team = [dict(m, status=generate_member_status(m['id'], date)) for m in base_members]
+    return legacy_team_availability(date, team)
+
+def batched_request(date, base_members):
+    # Measure the cold path, not the per (member, date) memo
+    member_day.cache_clear()
+    statuses = member_statuses([m['id'] for m in base_members], date)
+    team = [dict(m, status=status) for m, status in zip(base_members, statuses)]
+    return team_availability(date, team)
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--date', default='2025-08-25')
+    args = parser.parse_args()
+
+    print(f"{'members':>8} {'legacy':>10} {'batched':>10} {'speedup':>8}  identical")
+    for size in args.sizes:
+        members = [{'id': i, 'name': f'Member {i}', 'role': 'Finance Analyst'} for i in range(1, size + 1)]
+        legacy_time, legacy = best_of(lambda: legacy_request(args.date, members), args.repeat)
+        batched_time, batched = best_of(lambda: batched_request(args.date, members), args.repeat)
+        print(f"{size:>8} {legacy_time * 1000:>8.1f}ms {batched_time * 1000:>8.1f}ms "
+              f"{legacy_time / batched_time:>7.1f}x  {legacy == batched}")
+
+if __name__ == '__main__':
+    main()
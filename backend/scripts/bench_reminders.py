@@ -0,0 +1,118 @@
+"""Benchmark for the meeting reminder scheduler
+
+Schedules reminders for a large number of meetings against a fake clock,
+cancels and reschedules a share of them, then advances the clock past every
+meeting and drains the heap the way the worker does, checking that each
+live reminder fires exactly once and no cancelled one fires at all. Also
+checks that proposed start times as the pages send them (toISOString(),
+ending in Z) parse to the same local time as their naive equivalents.
+
+    python scripts/bench_reminders.py --meetings 300000
+    python scripts/bench_reminders.py --meetings 300000 --cancel 0.6 --offsets 1440,60,15
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def check_start_times():
+    """Number of proposed_datetime spellings that don't parse to the expected naive local time"""
+    from reminders import request_start
+
+    expected = (datetime.now() + timedelta(hours=2)).replace(microsecond=0)
+    utc = expected.astimezone(timezone.utc)
+    spellings = [
+        expected.isoformat(),
+        utc.strftime('%Y-%m-%dT%H:%M:%S.000Z'),  # Date.prototype.toISOString()
+        utc.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        utc.isoformat(),
+        expected.astimezone(timezone(timedelta(hours=8))).isoformat(),
+    ]
+    failures = 0
+    for spelling in spellings:
+        starts_at = request_start({'proposed_datetime': spelling})
+        # send_reminder subtracts datetime.now(), which fails for aware values
+        if starts_at != expected or starts_at - datetime.now() <= timedelta(0):
+            failures += 1
+            print(f'❌ {spelling!r} parsed as {starts_at!r}')
+    if request_start({'proposed_datetime': 'not a date'}) is not None:
+        failures += 1
+        print("❌ 'not a date' parsed")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--meetings', type=int, default=300000)
+    parser.add_argument('--cancel', type=float, default=0.3, help='share of meetings cancelled')
+    parser.add_argument('--reschedule', type=float, default=0.2, help='share of meetings moved')
+    parser.add_argument('--offsets', default='60,15', help='minutes before the meeting')
+    parser.add_argument('--seed', type=int, default=19)
+    args = parser.parse_args()
+
+    from reminders import ReminderScheduler
+
+    rng = random.Random(args.seed)
+    now = [1_000_000.0]
+    fired = Counter()
+    offsets = [int(offset) for offset in args.offsets.split(',')]
+    week = 7 * 24 * 3600
+    sources = [(f'meeting:{i}', now[0] + rng.uniform(3600 * 2, week), {'title': f'Meeting {i}'})
+               for i in range(args.meetings)]
+    scheduler = ReminderScheduler(lambda: sources, lambda key, offset, payload: fired.update([(key, offset)]),
+                                  offsets=offsets, clock=lambda: now[0])
+
+    started = time.perf_counter()
+    scheduler._rebuild()
+    rebuild_elapsed = time.perf_counter() - started
+
+    keys = [key for key, _, _ in sources]
+    cancelled = set(rng.sample(keys, int(len(keys) * args.cancel)))
+    moved = rng.sample([key for key in keys if key not in cancelled], int(len(keys) * args.reschedule))
+
+    started = time.perf_counter()
+    for key in cancelled:
+        scheduler.cancel(key)
+    cancel_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for key in moved:
+        scheduler.schedule(key, now[0] + rng.uniform(3600 * 2, week), {'title': key})
+    schedule_elapsed = time.perf_counter() - started
+    heap_size = len(scheduler._heap)
+
+    # Drain in ten-minute ticks, as the worker would wake up over the week
+    started = time.perf_counter()
+    ticks = 0
+    while scheduler._heap:
+        now[0] += 600
+        ticks += 1
+        due, _ = scheduler._due()
+        for key, offset, payload in due:
+            scheduler.notify(key, offset, payload)
+    drain_elapsed = time.perf_counter() - started
+
+    expected = (len(keys) - len(cancelled)) * len(offsets)
+    wrong = sum(1 for key, _ in fired if key in cancelled)
+    repeated = sum(1 for count in fired.values() if count > 1)
+    stats = scheduler.stats()
+    print(f'{args.meetings} meetings x {len(offsets)} offsets: rebuild {rebuild_elapsed * 1000:.0f}ms')
+    print(f'cancel: {cancel_elapsed / max(len(cancelled), 1) * 1e6:.2f}µs each ({len(cancelled)}), '
+          f'reschedule: {schedule_elapsed / max(len(moved), 1) * 1e6:.2f}µs each ({len(moved)})')
+    print(f'heap after updates: {heap_size} entries for {expected} live reminders, '
+          f"{stats['compactions']} compaction(s)")
+    print(f'drain: {len(fired)} reminders over {ticks} ticks in {drain_elapsed:.2f}s')
+    ok = len(fired) == expected and not wrong and not repeated and stats['pending'] == 0
+    print('✅ every live reminder fired once' if ok else
+          f'❌ fired {len(fired)}/{expected}, {wrong} cancelled, {repeated} repeated')
+    start_failures = check_start_times()
+    if not start_failures:
+        print('✅ proposed start times parse with and without a UTC offset')
+    return 0 if ok and not start_failures else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Benchmark for the team performance search index
+
+Builds a synthetic org of N employees and compares query latency of the
+search index against the substring scan it replaced, for exact, prefix,
+typo and multi-word queries, with and without a status filter, fetching
+the first page of 20 results.
+
+    python scripts/bench_search.py --employees 50000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIRST_NAMES = ['Juan', 'Maria', 'Jose', 'Ana', 'Miguel', 'Sofia', 'Carlos', 'Isabel', 'Rafael', 'Lisa',
+               'Jennifer', 'Mark', 'Patricia', 'Antonio', 'Grace', 'Paolo', 'Camille', 'Enrique', 'Bea', 'Ramon']
+LAST_NAMES = ['dela Cruz', 'Santos', 'Reyes', 'Garcia', 'Mendoza', 'Torres', 'Villanueva', 'Ramos',
+              'Aquino', 'Castillo', 'Thompson', 'Kim', 'Bautista', 'Navarro', 'Flores', 'Gonzales']
+POSITIONS = ['Finance Analyst', 'Senior Financial Analyst', 'Budget Analyst', 'Financial Controller',
+             'Accounts Payable Specialist', 'Senior Accountant', 'Tax Analyst', 'Payroll Specialist',
+             'Accounts Receivable Specialist', 'Treasury Analyst', 'Cost Analyst', 'Risk Officer']
+ACTIVITIES = ['SAP Finance Module Training', 'Compliance Orientation', 'Banking Systems Onboarding',
+              'Treasury Operations Shadowing', 'Tax Filing Workshop', 'Payroll System Setup',
+              'Audit Procedures Review', 'Credit Risk Fundamentals', 'Core Banking System Access']
+
+QUERIES = ['analyst', 'anal', 'analist', 'juan', 'santos', 'payroll specialist', 'trea', 'complaince', 'sap fin', 'x']
+
+def synthetic_employees(count, rng):
+    return [{
+        'id': i,
+        'employee_id': f'emp_{i:05d}',
+        'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}',
+        'position': rng.choice(POSITIONS),
+        'activity': rng.choice(ACTIVITIES),
+        'manager_id': f'mgr_{rng.randint(1, 500):03d}',
+        'completion': rng.choice([0, 25, 45, 60, 90, 95, 100]),
+        'risk_level': rng.choice(['low', 'low', 'medium', 'high']),
+        'status': 'active',
+    } for i in range(1, count + 1)]
+
+def substring_scan(employees, query, status_filter):
+    """The search the index replaced"""
+    from search_index import status_matches
+    query = query.lower()
+    members = [m for m in employees if m.get('position') != 'Finance Manager']
+    members = [m for m in members
+               if query in m.get('name', '').lower() or query in m.get('position', '').lower()
+               or query in m.get('activity', '').lower()]
+    return [m for m in members if status_matches(m, status_filter)]
+
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return result, statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--employees', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=15)
+    args = parser.parse_args()
+
+    from search_index import TeamSearchIndex
+
+    rng = random.Random(args.seed)
+    employees = synthetic_employees(args.employees, rng)
+    index = TeamSearchIndex(repo=None)
+
+    started = time.perf_counter()
+    index.rebuild(employees)
+    print(f'{args.employees} employees, index built in {time.perf_counter() - started:.2f}s '
+          f'({len(index._postings)} terms)')
+
+    # Repo-less benchmark: mark the index current so search() doesn't consult a repository
+    index.ensure_current = lambda: None
+
+    print(f"{'query':<22}{'status':<13}{'matches':>8}{'index p50':>11}{'p99':>9}{'scan p50':>10}")
+    for query in QUERIES:
+        for status_filter in ('', 'Overdue'):
+            (matches, _), p50, p99 = timed(lambda: index.search(query, status_filter, limit=20), args.repeat)
+            _, scan_p50, _ = timed(lambda: substring_scan(employees, query, status_filter), max(3, args.repeat // 10))
+            print(f'{query!r:<22}{status_filter or "-":<13}{matches:>8}{p50:>9.2f}ms{p99:>7.2f}ms{scan_p50:>8.2f}ms')
+
+    updates = 1000
+    started = time.perf_counter()
+    for _ in range(updates):
+        before = rng.choice(employees)
+        after = dict(before, activity=rng.choice(ACTIVITIES), position=rng.choice(POSITIONS))
+        index.apply(before, after)
+        employees[after['id'] - 1] = after
+    print(f'incremental update: {(time.perf_counter() - started) / updates * 1e6:.0f}µs per employee change')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""End-to-end check of the email queue against a local aiosmtpd sink
+
+Starts an in-process SMTP sink (pip install aiosmtpd), queues meeting
+invitations through the same MailQueue/SmtpTransport the app uses and checks
+that every recipient received exactly one invitation. --fail-first makes
+the sink answer the first N messages with a temporary 451 error to exercise
+retries and backoff.
+
+    python scripts/mail_sink_check.py --meetings 200 --attendees 120
+    python scripts/mail_sink_check.py --meetings 50 --fail-first 10
+
+To watch the app itself deliver, run a sink and point the backend at it:
+
+    python -m aiosmtpd -n -l localhost:8025
+    SMARTSTART_SMTP_HOST=localhost SMARTSTART_SMTP_PORT=8025 python app.py
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class SinkHandler:
+    def __init__(self, fail_first):
+        self.fail_first = fail_first
+        self.received = Counter()
+        self.messages = 0
+        self.lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return '451 Temporary failure, try again later'
+            self.messages += 1
+            self.received.update(envelope.rcpt_tos)
+        return '250 Message accepted for delivery'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--meetings', type=int, default=100)
+    parser.add_argument('--attendees', type=int, default=20, help='recipients per meeting')
+    parser.add_argument('--fail-first', type=int, default=0, help='messages the sink rejects with 451 first')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--batch', type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        print('aiosmtpd is not installed: pip install aiosmtpd')
+        return 2
+    from mailer import MailQueue, SmtpTransport, render_invitation
+
+    handler = SinkHandler(args.fail_first)
+    controller = Controller(handler, hostname='127.0.0.1', port=args.port)
+    controller.start()
+    try:
+        mail_queue = MailQueue(SmtpTransport('127.0.0.1', args.port), workers=args.workers,
+                               batch_size=args.batch, backoff=0.05)
+        started = time.perf_counter()
+        for meeting_id in range(args.meetings):
+            meeting = {'id': meeting_id, 'title': f'Budget sync {meeting_id}', 'date': '2025-09-01',
+                       'time': '10:00 AM', 'attendees': [f'Attendee {i}' for i in range(args.attendees)],
+                       'meeting_link_data': {'url': 'https://meet.google.com/abc-defg-hij', 'meeting_code': 'abc-defg-hij'}}
+            recipients = [(f'Attendee {i}', f'attendee{i}.m{meeting_id}@example.com') for i in range(args.attendees)]
+            mail_queue.submit(render_invitation, meeting, recipients)
+        enqueued = time.perf_counter() - started
+        drained = mail_queue.flush(timeout=120)
+        elapsed = time.perf_counter() - started
+    finally:
+        controller.stop()
+
+    stats = mail_queue.stats()
+    expected = args.meetings * args.attendees
+    duplicates = sum(1 for count in handler.received.values() if count > 1)
+    print(f'{args.meetings} invitations x {args.attendees} recipients: enqueued in {enqueued * 1000:.1f}ms, '
+          f'delivered in {elapsed:.2f}s')
+    print(f'sink: {handler.messages} messages, {len(handler.received)}/{expected} recipients, {duplicates} duplicates')
+    print(f'queue: {stats}')
+    ok = drained and len(handler.received) == expected and not duplicates and stats['failed'] == 0
+    print('✅ every recipient got one invitation' if ok else '❌ missing, duplicated or failed deliveries')
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Check that migrating JSON data to SQLite keeps journaled records
+
+Copies the data directory, writes notifications, meeting requests and
+escalations through the journaled JSON repository (some of them patched
+afterwards) without compacting, migrates the copy into SQLite and compares
+what both repositories return.
+
+    python scripts/migration_check.py
+    python scripts/migration_check.py --records 2000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+USERS = ['emp_001', 'emp_002', 'mgr_001']
+STATUSES = ['pending', 'accepted', 'declined']
+
+def contents(repo):
+    """Everything the routes can read from the journaled collections, as comparable values"""
+    everything = 10 ** 9
+    found = {}
+    for user in USERS:
+        page, unread = repo.list_notifications_for_user(user, everything)
+        found[f'inbox {user}'] = (sorted((n['id'], n['title'], bool(n.get('read'))) for n in page.items), unread)
+        page = repo.list_meeting_requests_for_user(user, everything)
+        found[f'requests {user}'] = sorted((r['id'], r.get('status')) for r in page.items)
+    for status in STATUSES:
+        found[f'requests {status}'] = sorted(r['id'] for r in repo.list_meeting_requests_by_status(status))
+    found['escalations'] = sorted(e['id'] for e in repo.list_escalation_history(everything).items)
+    return found
+
+def size(value):
+    return len(value[0]) if isinstance(value, tuple) else len(value)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=200, help='records journaled per collection')
+    args = parser.parse_args()
+
+    import storage
+    from sqlite_store import SqliteRepository, migrate_json
+
+    data_dir = tempfile.mkdtemp(prefix='smartstart-migration-')
+    shutil.copytree(os.path.join(BACKEND_DIR, 'data'), data_dir, dirs_exist_ok=True)
+    storage.DATA_DIR = data_dir
+
+    # Large enough that nothing is compacted before the migration
+    repo = storage.JsonRepository(journal=True)
+    for journal in repo.journals.values():
+        journal.compact_after = args.records * 10
+    started = datetime(2030, 1, 1)
+    notification_ids = []
+    for i in range(args.records):
+        created_at = (started + timedelta(minutes=i)).isoformat()
+        added = repo.add_notifications([{'type': 'system', 'title': f'Journaled {i}', 'message': '',
+                                         'recipient_ids': [USERS[i % len(USERS)]], 'created_at': created_at,
+                                         'read': False, 'delivery_key': f'migration-{i}'}])
+        notification_ids.extend(notification['id'] for notification in added)
+        repo.add_meeting_request({'id': f'journaled_{i}', 'from_user': USERS[i % 2], 'to_user': 'mgr_001',
+                                  'status': 'pending', 'created_at': created_at})
+        repo.add_escalation({'id': f'journaled_{i}', 'employee_id': 1, 'created_at': created_at})
+    repo.mark_notifications_read(notification_ids[::3])
+    for i in range(0, args.records, 4):
+        repo.update_meeting_request(f'journaled_{i}', {'status': STATUSES[1 + i % 2]})
+
+    journal_lines = sum(journal.stats()['journal_lines'] for journal in repo.journals.values())
+    migrate_json(data_dir, os.path.join(data_dir, 'smartstart.db'))
+    expected = contents(repo)
+    migrated = contents(SqliteRepository(os.path.join(data_dir, 'smartstart.db')))
+
+    failures = 0
+    for name, value in expected.items():
+        if migrated[name] != value:
+            failures += 1
+            print(f'❌ {name}: {size(value)} records in JSON, {size(migrated[name])} after migrating')
+    print(f'{journal_lines} journal lines, {len(expected)} views compared')
+    print('✅ SQLite matches the journaled JSON store' if not failures else f'❌ {failures} views differ')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
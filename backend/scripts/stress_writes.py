@@ -0,0 +1,94 @@
+"""Stress test for concurrent writes to the JSON data store
+
+Starts N writer processes (or threads) that all append meeting requests and
+meetings to the same data directory at once, then checks that every record
+made it to disk and that meeting ids are unique.
+
+    python scripts/stress_writes.py --writers 8 --writes 200
+    python scripts/stress_writes.py --writers 8 --writes 200 --journal
+    python scripts/stress_writes.py --writers 8 --writes 200 --threads --write-queue
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def writer(data_dir, writer_id, writes, journal):
+    import storage
+    storage.DATA_DIR = data_dir
+    repo = storage.JsonRepository(journal=journal)
+    for i in range(writes):
+        repo.add_meeting_request({
+            'id': str(uuid.uuid4()),
+            'from_user': f'writer_{writer_id}',
+            'to_user': 'mgr_001',
+            'title': f'Request {i}',
+            'status': 'pending',
+            'created_at': f'2025-01-01T00:00:00.{writer_id:03d}{i:03d}'
+        })
+        repo.add_meeting({'title': f'Meeting {writer_id}-{i}', 'attendeeIds': [writer_id]})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=100, help='records per writer and collection')
+    parser.add_argument('--threads', action='store_true', help='use threads in one process instead of processes')
+    parser.add_argument('--journal', action='store_true', help='use the JSONL journal for meeting requests')
+    parser.add_argument('--write-queue', action='store_true', help='route updates through the single-writer queue')
+    args = parser.parse_args()
+
+    if args.write_queue:
+        os.environ['SMARTSTART_WRITE_QUEUE'] = '1'
+    import storage
+    from journal import Journal
+
+    data_dir = tempfile.mkdtemp(prefix='smartstart-stress-')
+    storage.DATA_DIR = data_dir
+    storage.save_data('meeting_requests.json', {'meeting_requests': []})
+    storage.save_data('meetings.json', {'meetings': []})
+
+    if args.threads:
+        workers = [threading.Thread(target=writer, args=(data_dir, i, args.writes, args.journal))
+                   for i in range(args.writers)]
+    else:
+        workers = [multiprocessing.Process(target=writer, args=(data_dir, i, args.writes, args.journal))
+                   for i in range(args.writers)]
+
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    if args.journal:
+        requests = Journal('meeting_requests.json', 'meeting_requests').records()
+    else:
+        with open(os.path.join(data_dir, 'meeting_requests.json'), encoding='utf-8') as f:
+            requests = json.load(f)['meeting_requests']
+    with open(os.path.join(data_dir, 'meetings.json'), encoding='utf-8') as f:
+        meetings = json.load(f)['meetings']
+
+    expected = args.writers * args.writes
+    meeting_ids = [meeting['id'] for meeting in meetings]
+    print(f"{args.writers} {'threads' if args.threads else 'processes'} x {args.writes} writes "
+          f"in {elapsed:.2f}s ({2 * expected / elapsed:.0f} writes/s)")
+    print(f"meeting requests: {len(requests)}/{expected}")
+    print(f"meetings:         {len(meetings)}/{expected} (unique ids: {len(set(meeting_ids))})")
+    if args.write_queue and storage._write_queue is not None:
+        print(f"write queue:      {storage._write_queue.stats}")
+
+    ok = (len(requests) == expected and len(meetings) == expected
+          and sorted(meeting_ids) == list(range(1, expected + 1)))
+    print('✅ no lost updates' if ok else '❌ lost or duplicated updates')
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Consistency check for the incrementally maintained dashboard aggregates
+
+Copies the data directory, applies random employee updates through the same
+path the PATCH route uses and, every few updates, compares the aggregates
+with a full recompute. Also times dashboard reads against a team of the
+given size.
+
+    python scripts/verify_aggregates.py --updates 2000
+    python scripts/verify_aggregates.py --updates 2000 --employees 20000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+def random_changes(rng, managers):
+    changes = {}
+    if rng.random() < 0.6:
+        changes['completion'] = rng.choice([0, 10, 45, 90, 95, 99, 100, rng.randint(0, 100)])
+    if rng.random() < 0.5:
+        changes['risk_level'] = rng.choice(['low', 'medium', 'high'])
+    if rng.random() < 0.3:
+        changes['status'] = rng.choice(['active', 'Overdue', 'inactive'])
+    if rng.random() < 0.2:
+        changes['manager_id'] = rng.choice(managers)
+    if rng.random() < 0.05:
+        changes['position'] = rng.choice(['Finance Analyst', 'Finance Manager'])
+    return changes or {'pending_items': rng.randint(0, 5)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--updates', type=int, default=1000)
+    parser.add_argument('--employees', type=int, default=0, help='grow the team to this many members first')
+    parser.add_argument('--check-every', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=14)
+    args = parser.parse_args()
+
+    import storage
+    from dashboard import DashboardAggregates
+    from employee_views import EmployeeChanges
+    from org_tree import ORG, OrgTree
+
+    data_dir = tempfile.mkdtemp(prefix='smartstart-aggregates-')
+    shutil.copytree(os.path.join(BACKEND_DIR, 'data'), data_dir, dirs_exist_ok=True)
+    storage.DATA_DIR = data_dir
+    rng = random.Random(args.seed)
+
+    if args.employees:
+        def grow(employees_data):
+            employees = employees_data['employees']
+            template = employees[0]
+            for new_id in range(max(e['id'] for e in employees) + 1, args.employees + 1):
+                employees.append(dict(template, id=new_id, employee_id=f'emp_{new_id:05d}'))
+        storage.update_data('employees.json', grow)
+
+    repo = storage.JsonRepository()
+    changes = EmployeeChanges(repo)
+    org = changes.register(OrgTree(repo))
+    dashboard = changes.register(DashboardAggregates(repo, org))
+    employee_ids = [employee['id'] for employee in repo.list_employees()]
+    managers = ['mgr_001', 'mgr_002', 'mgr_003']
+
+    started = time.perf_counter()
+    failures = 0
+    for i in range(1, args.updates + 1):
+        changes.update(rng.choice(employee_ids), random_changes(rng, managers))
+        if i % args.check_every == 0 or i == args.updates:
+            differences = dashboard.check_consistency()
+            if differences:
+                failures += 1
+                print(f'❌ after {i} updates: {differences}')
+    elapsed = time.perf_counter() - started
+
+    reads = 10000
+    read_started = time.perf_counter()
+    for _ in range(reads):
+        dashboard.overview('mgr_001')
+        dashboard.analytics('mgr_001')
+        dashboard.alert_members('mgr_001', ORG)
+    read_elapsed = time.perf_counter() - read_started
+
+    print(f'{len(employee_ids)} employees, {args.updates} updates in {elapsed:.2f}s (checks included)')
+    print(f'dashboard reads: {read_elapsed / reads * 1e6:.1f}µs per overview + analytics + alerts')
+    print('✅ aggregates match a full recompute' if not failures else f'❌ {failures} inconsistent checks')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
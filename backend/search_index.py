@@ -0,0 +1,176 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+
+from employee_views import EmployeeView
+
+# Searched fields and how much a match in each counts towards relevance
+FIELD_WEIGHTS = {'name': 3.0, 'position': 2.0, 'activity': 1.0}
+
+# How much each kind of token match counts, relative to an exact one
+EXACT, PREFIX, FUZZY = 1.0, 0.7, 0.4
+
+# Query tokens shorter than this are not matched with a typo
+MIN_FUZZY_LENGTH = 4
+
+_TOKEN_RE = re.compile(r'\w+')
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+def _deletions(term):
+    """The term and every variant of it with one character removed"""
+    return {term} | {term[:i] + term[i + 1:] for i in range(len(term))}
+
+def within_one_edit(a, b):
+    """True if a and b differ by at most one insertion, deletion, substitution or adjacent swap"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return (a[i + 1:] == b[i + 1:]
+                or (i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]))
+    return a[i:] == b[i + 1:]
+
+def status_matches(member, status_filter):
+    """The team performance status filter (Complete / In Progress / Overdue)"""
+    completion = member.get('completion', 0)
+    if status_filter == 'Complete':
+        return completion == 100
+    if status_filter == 'In Progress':
+        return 0 < completion < 100
+    if status_filter == 'Overdue':
+        return member.get('risk_level') == 'high'
+    return True
+
+class TeamSearchIndex(EmployeeView):
+    """Inverted index over employees' name, position and activity
+
+    Each query token matches index terms exactly, as a prefix (so results
+    follow the user as they type) or within one typo, found through a
+    one-deletion neighbourhood of the vocabulary instead of comparing against
+    every term. Every query token must match; members are ranked by the sum
+    of match quality times field weight, ties kept in employee list order.
+    """
+
+    def __init__(self, repo):
+        super().__init__(repo)
+        self._members = {}
+        self._positions = {}
+        self._postings = {}
+        self._terms = []
+        self._deletions = {}
+        self._member_terms = {}
+
+    def rebuild(self, employees):
+        self._members = {}
+        self._positions = {}
+        self._postings = {}
+        self._terms = []
+        self._deletions = {}
+        self._member_terms = {}
+        for position, member in enumerate(employees):
+            self._positions[member['id']] = position
+            self._index(member)
+        self._terms = sorted(self._postings)
+
+    def apply(self, before, after):
+        self._unindex(before)
+        self._index(after, keep_sorted=True)
+
+    def _index(self, member, keep_sorted=False):
+        member_id = member['id']
+        self._members[member_id] = member
+        terms = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(member.get(field, '')):
+                terms[term] = max(terms.get(term, 0), weight)
+        self._member_terms[member_id] = terms
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                for variant in _deletions(term):
+                    self._deletions.setdefault(variant, set()).add(term)
+                if keep_sorted:
+                    insort(self._terms, term)
+            postings[member_id] = weight
+
+    def _unindex(self, member):
+        member_id = member['id']
+        self._members.pop(member_id, None)
+        for term in self._member_terms.pop(member_id, ()):
+            postings = self._postings[term]
+            del postings[member_id]
+            if postings:
+                continue
+            del self._postings[term]
+            del self._terms[bisect_left(self._terms, term)]
+            for variant in _deletions(term):
+                variants = self._deletions[variant]
+                variants.discard(term)
+                if not variants:
+                    del self._deletions[variant]
+
+    def _candidates(self, token):
+        """Index terms a query token matches, with their match quality"""
+        matches = {}
+        if len(token) >= MIN_FUZZY_LENGTH:
+            for variant in _deletions(token):
+                for term in self._deletions.get(variant, ()):
+                    if within_one_edit(token, term):
+                        matches[term] = FUZZY
+        position = bisect_left(self._terms, token)
+        while position < len(self._terms) and self._terms[position].startswith(token):
+            matches[self._terms[position]] = PREFIX
+            position += 1
+        if token in self._postings:
+            matches[token] = EXACT
+        return matches
+
+    def _score(self, token):
+        scores = {}
+        for term, quality in self._candidates(token).items():
+            for member_id, weight in self._postings[term].items():
+                score = quality * weight
+                if score > scores.get(member_id, 0):
+                    scores[member_id] = score
+        return scores
+
+    def search(self, query='', status_filter='', offset=0, limit=None, member_ids=None):
+        """(total, page of members) matching the query and status filter, most relevant first
+
+        member_ids restricts the search to one team (see OrgTree.member_ids).
+        """
+        with self._lock:
+            self.ensure_current()
+            tokens = list(dict.fromkeys(tokenize(query)))
+            if not tokens:
+                totals = dict.fromkeys(self._members if member_ids is None else member_ids, 0)
+            else:
+                # Rarest token first, so the candidate set shrinks as early as possible
+                per_token = sorted((self._score(token) for token in tokens), key=len)
+                totals = per_token[0]
+                for scores in per_token[1:]:
+                    totals = {member_id: total + scores[member_id]
+                              for member_id, total in totals.items() if member_id in scores}
+                if member_ids is not None:
+                    totals = {member_id: total for member_id, total in totals.items() if member_id in member_ids}
+            if status_filter:
+                totals = {member_id: total for member_id, total in totals.items()
+                          if status_matches(self._members[member_id], status_filter)}
+
+            def rank(member_id):
+                return (-totals[member_id], self._positions[member_id])
+
+            if limit is None:
+                ranked = sorted(totals, key=rank)[offset:]
+            else:
+                ranked = heapq.nsmallest(offset + limit, totals, key=rank)[offset:]
+            return len(totals), [self._members[member_id] for member_id in ranked]
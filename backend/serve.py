@@ -0,0 +1,168 @@
+"""Production entry point for the SmartStart backend under gunicorn
+
+The app is imported, its data loaded and every dashboard route requested
+once in the master before workers fork, so workers start with the parsed
+data files, derived indexes (org tree, aggregates, search) and agenda
+templates already in memory and serve their first request warm. The warmed
+objects are moved out of the garbage collector's reach (gc.freeze) so that
+collections in the workers don't touch, and un-share, those pages. Debug
+mode stays off. SIGTERM (or Ctrl-C) stops accepting connections, gives
+in-flight requests up to the graceful timeout, and waits for queued
+emails and notifications to be written before a worker exits.
+
+Each worker is its own process: SSE streams only see notifications created
+in the worker serving them, and every worker runs its own reminder
+scheduler (reminders still go out once, as notifications are deduplicated
+by delivery key). An open notification stream holds one of the worker's
+threads for as long as it stays open, so streams are capped per worker
+(--max-streams, default half of --threads) and always leave at least one
+thread for ordinary requests; past the cap /api/stream answers 503 and the
+pages fall back to polling.
+
+    pip install gunicorn
+    python serve.py
+    python serve.py --workers 4 --threads 8 --bind 0.0.0.0:5000 --data-dir /srv/smartstart
+    python serve.py --workers 1 --threads 32 --max-streams 24
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+from datetime import datetime
+
+STARTED = time.monotonic()
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    sys.exit('gunicorn is not installed: pip install gunicorn')
+
+BIND = os.environ.get('SMARTSTART_BIND', '0.0.0.0:5000')
+WORKERS = int(os.environ.get('SMARTSTART_WORKERS', 2))
+THREADS = int(os.environ.get('SMARTSTART_THREADS', 8))
+TIMEOUT = int(os.environ.get('SMARTSTART_TIMEOUT', 30))
+GRACEFUL_TIMEOUT = int(os.environ.get('SMARTSTART_GRACEFUL_TIMEOUT', 20))
+MAX_STREAMS = int(os.environ['SMARTSTART_MAX_STREAMS']) if os.environ.get('SMARTSTART_MAX_STREAMS') else None
+
+# Read-only routes requested once before forking, so their caches are built in the master
+WARM_UP_PATHS = [
+    '/api/health',
+    '/api/stats',
+    '/api/teams/members/{today}',
+    '/api/schedules/team/{today}',
+    '/api/manager/dashboard/overview',
+    '/api/manager/analytics',
+    '/api/manager/team/performance',
+    '/api/manager/notifications',
+    '/api/manager/escalations',
+    '/api/manager/escalations/history',
+    '/api/manager/coaching/scripts',
+]
+
+class SmartStartServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        started = time.perf_counter()
+        from app import app, ensure_data, repo
+        app.debug = False
+        imported = time.perf_counter()
+
+        ensure_data()
+        repo.preload()
+        loaded = time.perf_counter()
+
+        # Workers start their own reminder threads; none should run in the master
+        app.config['START_REMINDERS'] = False
+        today = datetime.now().strftime('%Y-%m-%d')
+        with app.test_client() as client:
+            for path in WARM_UP_PATHS:
+                path = path.format(today=today)
+                path_started = time.perf_counter()
+                response = client.get(path)
+                if response.status_code != 200:
+                    print(f'❌ Warm-up {path} returned {response.status_code}')
+                else:
+                    print(f'   {path} {(time.perf_counter() - path_started) * 1000:.0f}ms')
+        app.config['START_REMINDERS'] = True
+        warmed = time.perf_counter()
+
+        gc.collect()
+        gc.freeze()
+        print(f'📋 App imported in {(imported - started) * 1000:.0f}ms, data loaded in '
+              f'{(loaded - imported) * 1000:.0f}ms, routes warmed in {(warmed - loaded) * 1000:.0f}ms')
+        return app
+
+def when_ready(server):
+    print(f"🚀 BPI SmartStart backend is running on http://{server.cfg.bind[0]} "
+          f"({server.cfg.workers} workers x {server.cfg.threads} threads, "
+          f"up to {os.environ['SMARTSTART_MAX_STREAMS']} event streams each, "
+          f"ready {time.monotonic() - STARTED:.2f}s after start)")
+
+_forked_at = None
+
+def post_fork(server, worker):
+    global _forked_at
+    _forked_at = time.monotonic()
+
+def post_worker_init(worker):
+    # From fork to accepting connections; the app itself was loaded before forking
+    print(f'✅ Worker {worker.pid} ready in {(time.monotonic() - _forked_at) * 1000:.0f}ms '
+          f'({time.monotonic() - STARTED:.2f}s after start)')
+
+def worker_exit(server, worker):
+    from app import fanout, mail_queue
+    if not fanout.flush(timeout=5):
+        print(f'❌ Worker {worker.pid} exited with notifications still queued')
+    if not mail_queue.flush(timeout=5):
+        print(f'❌ Worker {worker.pid} exited with emails still queued')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bind', default=BIND)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--threads', type=int, default=THREADS)
+    parser.add_argument('--timeout', type=int, default=TIMEOUT, help='seconds before a stuck worker is restarted')
+    parser.add_argument('--graceful-timeout', type=int, default=GRACEFUL_TIMEOUT,
+                        help='seconds in-flight requests get to finish on shutdown')
+    parser.add_argument('--max-streams', type=int, default=MAX_STREAMS,
+                        help='open event streams per worker (default: half of --threads, at most --threads - 1)')
+    parser.add_argument('--data-dir', help='directory holding the data files (default: backend/data)')
+    args = parser.parse_args()
+
+    # Each stream pins a thread; keep one free so the worker can still answer requests
+    limit = max(args.threads - 1, 0)
+    max_streams = args.max_streams if args.max_streams is not None else args.threads // 2
+    if max_streams > limit:
+        print(f'❌ --max-streams {max_streams} would leave no thread for requests, using {limit}')
+        max_streams = limit
+    # Read by events.py when the app is imported, before the workers fork
+    os.environ['SMARTSTART_MAX_STREAMS'] = str(max_streams)
+    if args.data_dir:
+        os.environ['SMARTSTART_DATA_DIR'] = os.path.abspath(args.data_dir)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    SmartStartServer({
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'keepalive': 5,
+        'accesslog': None,
+        'when_ready': when_ready,
+        'post_fork': post_fork,
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit,
+    }).run()
+
+if __name__ == '__main__':
+    main()
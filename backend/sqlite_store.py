@@ -0,0 +1,554 @@
+import argparse
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from pagination import build_page
+from storage import numbered
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS employees (
+    id INTEGER PRIMARY KEY,
+    employee_id TEXT,
+    manager_id TEXT,
+    position TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_employees_employee_id ON employees(employee_id);
+CREATE INDEX IF NOT EXISTS idx_employees_manager_id ON employees(manager_id);
+
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER PRIMARY KEY,
+    date TEXT,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_meetings_date ON meetings(date);
+
+CREATE TABLE IF NOT EXISTS meeting_requests (
+    id TEXT PRIMARY KEY,
+    from_user TEXT,
+    to_user TEXT,
+    status TEXT,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_meeting_requests_from;
+DROP INDEX IF EXISTS idx_meeting_requests_to;
+CREATE INDEX IF NOT EXISTS idx_meeting_requests_from_page ON meeting_requests(from_user, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_meeting_requests_to_page ON meeting_requests(to_user, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_meeting_requests_status ON meeting_requests(status);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id INTEGER NOT NULL,
+    type TEXT,
+    created_at TEXT,
+    read INTEGER NOT NULL DEFAULT 0,
+    broadcast INTEGER NOT NULL DEFAULT 0,
+    delivery_key TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notifications_id ON notifications(id);
+DROP INDEX IF EXISTS idx_notifications_broadcast;
+CREATE INDEX IF NOT EXISTS idx_notifications_broadcast_page ON notifications(broadcast, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_notifications_read ON notifications(read);
+
+CREATE TABLE IF NOT EXISTS notification_recipients (
+    notification_seq INTEGER NOT NULL REFERENCES notifications(seq) ON DELETE CASCADE,
+    recipient_id TEXT NOT NULL,
+    created_at TEXT,
+    PRIMARY KEY (recipient_id, created_at, notification_seq)
+) WITHOUT ROWID;
+
+-- Unread notifications per recipient ('*' counts broadcasts), kept current by triggers
+CREATE TABLE IF NOT EXISTS notification_unread (
+    recipient_id TEXT PRIMARY KEY,
+    unread INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_unread_broadcast AFTER INSERT ON notifications
+WHEN NEW.broadcast = 1 AND NEW.read = 0
+BEGIN
+    INSERT INTO notification_unread (recipient_id, unread) VALUES ('*', 1)
+    ON CONFLICT(recipient_id) DO UPDATE SET unread = unread + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unread_recipient AFTER INSERT ON notification_recipients
+WHEN (SELECT read FROM notifications WHERE seq = NEW.notification_seq) = 0
+BEGIN
+    INSERT INTO notification_unread (recipient_id, unread) VALUES (NEW.recipient_id, 1)
+    ON CONFLICT(recipient_id) DO UPDATE SET unread = unread + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unread_read AFTER UPDATE OF read ON notifications
+WHEN OLD.read = 0 AND NEW.read = 1
+BEGIN
+    UPDATE notification_unread SET unread = unread - 1
+    WHERE recipient_id IN (SELECT recipient_id FROM notification_recipients WHERE notification_seq = NEW.seq)
+       OR (NEW.broadcast = 1 AND recipient_id = '*');
+END;
+
+CREATE TABLE IF NOT EXISTS escalation_history (
+    id TEXT PRIMARY KEY,
+    employee_id INTEGER,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_escalation_history_created;
+CREATE INDEX IF NOT EXISTS idx_escalation_history_page ON escalation_history(created_at, id);
+
+CREATE TABLE IF NOT EXISTS versions (
+    collection TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+# Tables whose writes bump each collection's change counter
+COLLECTION_TABLES = {
+    'employees': ['employees'],
+    'meetings': ['meetings'],
+    'meeting_requests': ['meeting_requests'],
+    'notifications': ['notifications'],
+    'escalation_history': ['escalation_history'],
+    'manager_data': ['documents', 'escalation_history'],
+}
+
+TABLES = ['notification_unread', 'notification_recipients', 'notifications', 'escalation_history', 'meeting_requests',
+          'meetings', 'employees', 'documents']
+
+def _bump(conn, *collections):
+    """Advance the change counters for collections written in this transaction"""
+    conn.executemany(
+        'INSERT INTO versions (collection, version) VALUES (?, 1) '
+        'ON CONFLICT(collection) DO UPDATE SET version = version + 1',
+        [(collection,) for collection in collections])
+
+class SqliteRepository:
+    """Repository backed by an indexed SQLite database in WAL mode"""
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection().executescript(SCHEMA)
+        columns = {row['name'] for row in self._query('PRAGMA table_info(notifications)')}
+        if 'delivery_key' not in columns:
+            # Databases created before idempotent fan-out
+            self.connection().execute('ALTER TABLE notifications ADD COLUMN delivery_key TEXT')
+        self.connection().execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_notifications_delivery_key '
+                                  'ON notifications(delivery_key) WHERE delivery_key IS NOT NULL')
+        if not self._query('SELECT 1 FROM notification_unread LIMIT 1'):
+            # Databases created before the counters existed
+            with self.transaction() as conn:
+                _rebuild_unread(conn)
+
+    def connection(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def transaction(self):
+        return _Transaction(self.connection())
+
+    @contextmanager
+    def snapshot(self):
+        """Read transaction, so every query in this thread sees one WAL snapshot"""
+        conn = self.connection()
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute('BEGIN')
+        try:
+            yield
+        finally:
+            conn.execute('COMMIT')
+
+    def _query(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    def _document(self, name, default):
+        rows = self._query('SELECT data FROM documents WHERE name = ?', (name,))
+        return json.loads(rows[0]['data']) if rows else default
+
+    def is_initialized(self):
+        return bool(self._query('SELECT 1 FROM employees LIMIT 1'))
+
+    def preload(self):
+        """Read every table once, so the database pages are in the OS cache before workers start"""
+        for table in TABLES:
+            self._query(f'SELECT * FROM {table}')
+
+    def version(self, collection):
+        """Change token for a collection; differs whenever any process modified it"""
+        rows = self._query('SELECT version FROM versions WHERE collection = ?', (collection,))
+        return rows[0][0] if rows else 0
+
+    def _page(self, sources, limit, before=None, after=None, load=None):
+        """Newest-first keyset page over (select, params, (created_at column, id column)) sources
+
+        Each source is read with one index range scan from the cursor, at
+        most limit + 1 rows, and the sources are merged by (created_at, id).
+        """
+        load = load or (lambda row: json.loads(row['data']))
+        cursor = after if after is not None else before
+        comparison, order = ('>', 'ASC') if after is not None else ('<', 'DESC')
+        streams = []
+        for select, params, (created_column, id_column) in sources:
+            sql, args = select, list(params)
+            if cursor is not None:
+                sql += f' AND ({created_column}, {id_column}) {comparison} (?, ?)'
+                args += list(cursor)
+            sql += f' ORDER BY {created_column} {order}, {id_column} {order} LIMIT ?'
+            streams.append(self._query(sql, args + [limit + 1]))
+
+        seen = set()
+        rows = []
+        merged = heapq.merge(*streams, key=lambda row: (row['created_at'] or '', row['id']), reverse=order == 'DESC')
+        for row in merged:
+            if row['id'] not in seen:
+                seen.add(row['id'])
+                rows.append(row)
+                if len(rows) > limit:
+                    break
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if after is not None:
+            rows.reverse()
+        items = [load(row) for row in rows]
+
+        # Paging from a cursor means the cursor's side has at least that record
+        return build_page(items, has_more if after is None else True,
+                          has_more if after is not None else before is not None, before, after)
+
+    def seed(self, employees_data, meeting_requests, manager_data):
+        """Replace every collection with the given default data"""
+        with self.transaction() as conn:
+            for table in TABLES:
+                conn.execute(f'DELETE FROM {table}')
+            _insert_employees(conn, employees_data)
+            _insert_manager_data(conn, manager_data)
+            for meeting_request in meeting_requests:
+                _insert_meeting_request(conn, meeting_request)
+            _bump(conn, *COLLECTION_TABLES)
+
+    # Employees
+    def list_employees(self):
+        return [json.loads(row['data']) for row in self._query('SELECT data FROM employees ORDER BY id')]
+
+    def get_employee(self, employee_id):
+        rows = self._query('SELECT data FROM employees WHERE id = ?', (employee_id,))
+        return json.loads(rows[0]['data']) if rows else None
+
+    def get_managers(self):
+        return self._document('managers', {})
+
+    def update_employee(self, employee_id, changes):
+        """Apply changes to an employee, returning the updated record or None if missing"""
+        with self.transaction() as conn:
+            row = conn.execute('SELECT data FROM employees WHERE id = ?', (employee_id,)).fetchone()
+            if row is None:
+                return None
+            employee = json.loads(row['data'])
+            employee.update(changes)
+            conn.execute('UPDATE employees SET employee_id = ?, manager_id = ?, position = ?, data = ? WHERE id = ?',
+                         (employee.get('employee_id'), employee.get('manager_id'), employee.get('position'),
+                          _dumps(employee), employee_id))
+            _bump(conn, 'employees')
+        return employee
+
+    # Meetings
+    def list_meetings(self):
+        return [json.loads(row['data']) for row in self._query('SELECT data FROM meetings ORDER BY id')]
+
+    def add_meeting(self, meeting, check=None):
+        """Store a meeting and assign its sequential id
+
+        check(newer_than), if given, runs inside the write transaction before
+        the meeting is stored and can raise to abort; newer_than(meeting_id)
+        lists the stored meetings after that id.
+        """
+        with self.transaction() as conn:
+            if check is not None:
+                check(lambda meeting_id: [json.loads(row['data']) for row in conn.execute(
+                    'SELECT data FROM meetings WHERE id > ? ORDER BY id', (meeting_id,))])
+            meeting['id'] = conn.execute('SELECT COUNT(*) FROM meetings').fetchone()[0] + 1
+            _insert_meeting(conn, meeting)
+            _bump(conn, 'meetings')
+        return meeting
+
+    # Meeting requests
+    def list_meeting_requests_for_user(self, user_id, limit=20, before=None, after=None):
+        """Page of meeting requests sent by or to a user, most recent first"""
+        select = 'SELECT id, created_at, data FROM meeting_requests WHERE {} = ?'
+        return self._page([(select.format('from_user'), (user_id,), ('created_at', 'id')),
+                           (select.format('to_user'), (user_id,), ('created_at', 'id'))],
+                          limit, before, after)
+
+    def count_meeting_requests(self, status):
+        return self._query('SELECT COUNT(*) FROM meeting_requests WHERE status = ?', (status,))[0][0]
+
+    def list_meeting_requests_by_status(self, status):
+        return [json.loads(row['data'])
+                for row in self._query('SELECT data FROM meeting_requests WHERE status = ? ORDER BY created_at', (status,))]
+
+    def add_meeting_request(self, meeting_request):
+        with self.transaction() as conn:
+            _insert_meeting_request(conn, meeting_request)
+            _bump(conn, 'meeting_requests')
+        return meeting_request
+
+    def update_meeting_request(self, request_id, changes):
+        """Apply changes to a meeting request, returning it or None if missing"""
+        with self.transaction() as conn:
+            row = conn.execute('SELECT data FROM meeting_requests WHERE id = ?', (request_id,)).fetchone()
+            if row is None:
+                return None
+            req = json.loads(row['data'])
+            req.update(changes)
+            conn.execute('UPDATE meeting_requests SET status = ?, data = ? WHERE id = ?',
+                         (req.get('status'), _dumps(req), request_id))
+            _bump(conn, 'meeting_requests')
+        return req
+
+    # Notifications
+    def add_notification(self, notification):
+        """Store a notification under a new id, returning it or None if its delivery_key is already stored"""
+        added = self.add_notifications([notification])
+        return added[0] if added else None
+
+    def add_notifications(self, notifications):
+        """Store a batch of notifications in one transaction, skipping delivery_keys already stored
+
+        Each gets a new id, taken inside the write transaction so no two
+        writers hand out the same one. Returns the notifications that were added.
+        """
+        with self.transaction() as conn:
+            first_id = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM notifications').fetchone()[0]
+            added = [notification for notification in numbered(notifications, first_id)
+                     if _insert_notification(conn, notification)]
+            if added:
+                _bump(conn, 'notifications')
+        return added
+
+    def list_notifications_for_user(self, user_id, limit=20, before=None, after=None):
+        """Return (page of most recent notifications, unread count) for a user"""
+        page = self._page([
+            ('SELECT n.id, r.created_at, n.read, n.data FROM notification_recipients r '
+             'JOIN notifications n ON n.seq = r.notification_seq WHERE r.recipient_id = ?',
+             (user_id,), ('r.created_at', 'n.id')),
+            ('SELECT id, created_at, read, data FROM notifications WHERE broadcast = 1',
+             (), ('created_at', 'id')),
+        ], limit, before, after, load=_notification_from_row)
+        return page, self.count_unread_notifications(user_id)
+
+    def list_unread_notification_ids(self, user_id):
+        rows = self._query(
+            'SELECT n.id FROM notification_recipients r JOIN notifications n ON n.seq = r.notification_seq '
+            'WHERE r.recipient_id = ? AND n.read = 0 '
+            'UNION ALL SELECT id FROM notifications WHERE broadcast = 1 AND read = 0', (user_id,))
+        return [row[0] for row in rows]
+
+    def mark_notification_read(self, notification_id, user_id=None):
+        return self.mark_notifications_read([notification_id], user_id) > 0
+
+    def mark_notifications_read(self, notification_ids, user_id=None):
+        """Mark several notifications read in one transaction, returning how many changed
+
+        With user_id, only notifications in that user's inbox (theirs or broadcasts) are touched.
+        """
+        notification_ids = list(notification_ids)
+        inbox_only = ''
+        if user_id is not None:
+            inbox_only = (' AND (broadcast = 1 OR EXISTS (SELECT 1 FROM notification_recipients r '
+                          'WHERE r.recipient_id = ? AND r.created_at IS notifications.created_at '
+                          'AND r.notification_seq = notifications.seq))')
+        changed = 0
+        with self.transaction() as conn:
+            for start in range(0, len(notification_ids), 500):
+                chunk = notification_ids[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                params = chunk + ([str(user_id)] if user_id is not None else [])
+                changed += conn.execute(
+                    f'UPDATE notifications SET read = 1 WHERE read = 0 AND id IN ({placeholders}){inbox_only}',
+                    params).rowcount
+            if changed:
+                _bump(conn, 'notifications')
+        return changed
+
+    def count_unread_notifications(self, user_id=None):
+        """Unread notifications overall, or visible to one user"""
+        if user_id is None:
+            return self._query('SELECT COUNT(*) FROM notifications WHERE read = 0')[0][0]
+        return self._query(
+            "SELECT COALESCE(SUM(unread), 0) FROM notification_unread WHERE recipient_id IN (?, '*')",
+            (user_id,))[0][0]
+
+    # Manager data
+    def get_coaching_scripts(self):
+        return self._document('coaching_scripts', {})
+
+    def get_escalation_paths(self):
+        return self._document('escalation_paths', [])
+
+    def add_escalation(self, escalation_record):
+        with self.transaction() as conn:
+            _insert_escalation(conn, escalation_record)
+            _bump(conn, 'escalation_history', 'manager_data')
+        return escalation_record
+
+    def list_escalation_history(self, limit=20, before=None, after=None):
+        """Page of escalations, most recent first"""
+        return self._page([('SELECT id, created_at, data FROM escalation_history WHERE 1', (), ('created_at', 'id'))],
+                          limit, before, after)
+
+    def count_escalations_since(self, since):
+        return self._query('SELECT COUNT(*) FROM escalation_history WHERE created_at > ?',
+                           (since.isoformat(),))[0][0]
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+def _dumps(record):
+    return json.dumps(record, ensure_ascii=False)
+
+def _notification_from_row(row):
+    notification = json.loads(row['data'])
+    notification['read'] = bool(row['read'])
+    return notification
+
+def _rebuild_unread(conn):
+    conn.execute('DELETE FROM notification_unread')
+    conn.execute(
+        'INSERT INTO notification_unread (recipient_id, unread) '
+        'SELECT r.recipient_id, COUNT(*) FROM notification_recipients r '
+        'JOIN notifications n ON n.seq = r.notification_seq WHERE n.read = 0 GROUP BY r.recipient_id')
+    conn.execute(
+        "INSERT INTO notification_unread (recipient_id, unread) "
+        "SELECT '*', COUNT(*) FROM notifications WHERE broadcast = 1 AND read = 0")
+
+def _insert_employees(conn, employees_data):
+    for employee in employees_data.get('employees', []):
+        conn.execute('INSERT INTO employees (id, employee_id, manager_id, position, data) VALUES (?, ?, ?, ?, ?)',
+                     (employee['id'], employee.get('employee_id'), employee.get('manager_id'),
+                      employee.get('position'), _dumps(employee)))
+    conn.execute('INSERT OR REPLACE INTO documents (name, data) VALUES (?, ?)',
+                 ('managers', _dumps(employees_data.get('managers', {}))))
+
+def _insert_manager_data(conn, manager_data):
+    for name in ('coaching_scripts', 'escalation_paths'):
+        conn.execute('INSERT OR REPLACE INTO documents (name, data) VALUES (?, ?)',
+                     (name, _dumps(manager_data.get(name, {} if name == 'coaching_scripts' else []))))
+    for escalation_record in manager_data.get('escalation_history', []):
+        _insert_escalation(conn, escalation_record)
+
+def _insert_meeting(conn, meeting):
+    conn.execute('INSERT INTO meetings (id, date, created_at, data) VALUES (?, ?, ?, ?)',
+                 (meeting['id'], meeting.get('date'), meeting.get('created_at'), _dumps(meeting)))
+
+def _insert_meeting_request(conn, meeting_request):
+    conn.execute('INSERT INTO meeting_requests (id, from_user, to_user, status, created_at, data) '
+                 'VALUES (?, ?, ?, ?, ?, ?)',
+                 (meeting_request['id'], meeting_request.get('from_user'), meeting_request.get('to_user'),
+                  meeting_request.get('status'), meeting_request.get('created_at'), _dumps(meeting_request)))
+
+def _insert_notification(conn, notification):
+    """Insert a notification, returning False if its delivery_key was already stored"""
+    recipient_ids = notification.get('recipient_ids') or []
+    cursor = conn.execute(
+        'INSERT OR IGNORE INTO notifications (id, type, created_at, read, broadcast, delivery_key, data) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (notification['id'], notification.get('type'), notification.get('created_at'),
+         int(bool(notification.get('read'))), int(not recipient_ids), notification.get('delivery_key'),
+         _dumps(notification)))
+    if not cursor.rowcount:
+        return False
+    conn.executemany(
+        'INSERT OR IGNORE INTO notification_recipients (notification_seq, recipient_id, created_at) VALUES (?, ?, ?)',
+        [(cursor.lastrowid, str(recipient_id), notification.get('created_at')) for recipient_id in recipient_ids])
+    return True
+
+def _insert_escalation(conn, escalation_record):
+    conn.execute('INSERT INTO escalation_history (id, employee_id, created_at, data) VALUES (?, ?, ?, ?)',
+                 (escalation_record['id'], escalation_record.get('employee_id'),
+                  escalation_record.get('created_at'), _dumps(escalation_record)))
+
+def migrate_json(data_dir, db_path):
+    """One-shot import of the JSON data files into a fresh SQLite database
+
+    Records still in a journal (SMARTSTART_JOURNAL=1, not yet compacted) are
+    replayed onto their snapshot first, so nothing journaled is left behind.
+    """
+    from journal import replay
+
+    def read(filename, journaled_key=None):
+        try:
+            with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            document = {}
+        if journaled_key is not None:
+            document[journaled_key] = replay(document.get(journaled_key, []),
+                                             os.path.join(data_dir, f'{journaled_key}.journal.jsonl'))
+        return document
+
+    repository = SqliteRepository(db_path)
+    with repository.transaction() as conn:
+        for table in TABLES:
+            conn.execute(f'DELETE FROM {table}')
+        _insert_employees(conn, read('employees.json'))
+        _insert_manager_data(conn, read('manager_data.json', 'escalation_history'))
+        for meeting in read('meetings.json').get('meetings', []):
+            _insert_meeting(conn, meeting)
+        for meeting_request in read('meeting_requests.json', 'meeting_requests').get('meeting_requests', []):
+            _insert_meeting_request(conn, meeting_request)
+        for notification in read('notifications.json', 'notifications').get('notifications', []):
+            _insert_notification(conn, notification)
+        _bump(conn, *COLLECTION_TABLES)
+
+    counts = {table: repository._query(f'SELECT COUNT(*) FROM {table}')[0][0] for table in reversed(TABLES)}
+    return counts
+
+if __name__ == '__main__':
+    from storage import DATA_DIR
+
+    parser = argparse.ArgumentParser(description='Migrate SmartStart JSON data files into SQLite')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='directory holding the JSON data files')
+    parser.add_argument('--db', default=os.path.join(DATA_DIR, 'smartstart.db'), help='SQLite database to create')
+    args = parser.parse_args()
+
+    print(f"🔄 Migrating {args.data_dir}/*.json into {args.db}")
+    for table, count in migrate_json(args.data_dir, args.db).items():
+        print(f"   {table}: {count}")
+    print("✅ Migration complete. Start the backend with SMARTSTART_STORAGE=sqlite")
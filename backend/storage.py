@@ -0,0 +1,651 @@
+import json
+import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+
+from background import WorkerThreads
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+# Next to the code unless configured, so the working directory doesn't matter
+DATA_DIR = os.environ.get('SMARTSTART_DATA_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+class FrozenDict(dict):
+    """Read-only dict handed out by the data cache"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('cached data is read-only, copy it before modifying')
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+def freeze(value):
+    """Convert parsed JSON into read-only dicts and tuples"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def unseen_records(existing, records, unique_key):
+    """The records whose unique_key value is in neither existing nor earlier records (None never clashes)"""
+    seen = {record.get(unique_key) for record in existing}
+    fresh = []
+    for record in records:
+        value = record.get(unique_key)
+        if value is None or value not in seen:
+            seen.add(value)
+            fresh.append(record)
+    return fresh
+
+def next_record_id(records):
+    """One more than the largest integer id among records"""
+    return max((record['id'] for record in records if isinstance(record.get('id'), int)), default=0) + 1
+
+def numbered(records, first_id):
+    """Copies of records with consecutive ids from first_id"""
+    return [dict(record, id=first_id + offset) for offset, record in enumerate(records)]
+
+def thaw(value):
+    """Convert a frozen document back into plain, mutable dicts and lists"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+# Parsed documents keyed by file name, revalidated by file stat and by an
+# in-process version counter bumped on every save
+_cache = {}
+_versions = {}
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+def data_path(filename):
+    """Resolve a data file name inside the data directory"""
+    return os.path.join(DATA_DIR, filename)
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+# Reads pinned for the duration of a snapshot() block, per thread
+_pin_state = threading.local()
+
+@contextmanager
+def pinned_reads():
+    """Within the block, every read in this thread sees the state of its first read"""
+    if getattr(_pin_state, 'reads', None) is not None:
+        yield
+        return
+    _pin_state.reads = {}
+    try:
+        yield
+    finally:
+        _pin_state.reads = None
+
+def _pinned(key, read):
+    reads = getattr(_pin_state, 'reads', None)
+    if reads is None:
+        return read()
+    if key not in reads:
+        reads[key] = read()
+    return reads[key]
+
+def load_data(filename):
+    """Load data from JSON file as a read-only view, served from cache when unchanged"""
+    return _pinned(('data', filename), lambda: read_data(filename))
+
+def read_data(filename):
+    """Cached read of the current file contents, ignoring any pinned snapshot"""
+    path = data_path(filename)
+    signature = _file_signature(path)
+    version = _versions.get(filename, 0)
+    entry = _cache.get(filename)
+    if entry is not None and entry[0] == signature and entry[1] == version:
+        with _cache_lock:
+            _cache_stats['hits'] += 1
+        return entry[2]
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = freeze(json.load(f))
+    except FileNotFoundError:
+        data = FrozenDict()
+    with _cache_lock:
+        _cache_stats['misses'] += 1
+        if _versions.get(filename, 0) == version:
+            _cache[filename] = (signature, version, data)
+    return data
+
+def load_data_for_update(filename):
+    """Load a mutable copy of a data file for a load-modify-save cycle"""
+    # Never from a pinned snapshot: updates must start from the current file
+    return thaw(read_data(filename))
+
+def save_data(filename, data):
+    """Save data to JSON file atomically (temp file + rename)"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = data_path(filename)
+    fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, prefix=f'.{filename}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    with _cache_lock:
+        version = _versions.get(filename, 0) + 1
+        _versions[filename] = version
+        _cache[filename] = (_file_signature(path), version, freeze(data))
+
+# Per-collection locks: a re-entrant in-process lock plus an advisory fcntl
+# lock on data/.locks/<file>.lock so load-modify-save is safe across workers
+_locks = {}
+_locks_guard = threading.Lock()
+_lock_state = threading.local()
+
+@contextmanager
+def collection_lock(filename):
+    """Hold the exclusive write lock for a data file"""
+    with _locks_guard:
+        lock = _locks.setdefault(filename, threading.RLock())
+    with lock:
+        held = getattr(_lock_state, 'held', None)
+        if held is None:
+            held = _lock_state.held = {}
+        if held.get(filename):
+            held[filename] += 1
+            try:
+                yield
+            finally:
+                held[filename] -= 1
+            return
+
+        lock_file = None
+        if fcntl is not None:
+            lock_dir = os.path.join(DATA_DIR, '.locks')
+            os.makedirs(lock_dir, exist_ok=True)
+            lock_file = open(os.path.join(lock_dir, f'{filename}.lock'), 'a')
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        held[filename] = 1
+        try:
+            yield
+        finally:
+            held[filename] = 0
+            if lock_file is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                lock_file.close()
+
+def _apply_update(filename, mutate):
+    with collection_lock(filename):
+        before = data_version(filename)
+        document = load_data_for_update(filename)
+        result = mutate(document)
+        save_data(filename, document)
+        return result, before, data_version(filename)
+
+class WriteQueue:
+    """Single writer thread that coalesces bursts of updates into one flush per file
+
+    Callers submit mutate(document) functions. The writer drains everything
+    queued, takes each file's lock once, applies the pending mutations in
+    submission order and saves the file a single time.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker = WorkerThreads(self._run, 'data-writer')
+        self.stats = {'updates': 0, 'flushes': 0}
+
+    def submit(self, filename, mutate):
+        """Queue an update, returning a Future for (mutate's return value, version before, version after)"""
+        future = Future()
+        self._worker.ensure_started()
+        self._queue.put((filename, mutate, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        by_file = {}
+        for filename, mutate, future in batch:
+            by_file.setdefault(filename, []).append((mutate, future))
+        for filename, updates in by_file.items():
+            try:
+                with collection_lock(filename):
+                    before = data_version(filename)
+                    document = load_data_for_update(filename)
+                    results = []
+                    for mutate, future in updates:
+                        try:
+                            results.append((future, mutate(document), None))
+                        except Exception as exc:
+                            results.append((future, None, exc))
+                    save_data(filename, document)
+                    after = data_version(filename)
+            except Exception as exc:
+                for _, future in updates:
+                    future.set_exception(exc)
+                continue
+            self.stats['updates'] += len(updates)
+            self.stats['flushes'] += 1
+            for position, (future, result, exc) in enumerate(results):
+                if exc is not None:
+                    future.set_exception(exc)
+                else:
+                    # Only the first update of the flush knows the version just before it
+                    future.set_result((result, before if position == 0 else None, after))
+
+_write_queue = WriteQueue() if os.environ.get('SMARTSTART_WRITE_QUEUE', '0') == '1' else None
+
+def update_data(filename, mutate):
+    """Run a locked load-modify-save of a data file, returning mutate's result"""
+    return update_data_versioned(filename, mutate)[0]
+
+def update_data_versioned(filename, mutate):
+    """update_data, also returning the file's data_version just before and just after the save
+
+    Both are taken under the file lock; the one before is None when it is
+    unknown (the update was coalesced behind another one).
+    """
+    if _write_queue is not None:
+        return _write_queue.submit(filename, mutate).result()
+    return _apply_update(filename, mutate)
+
+def data_version(filename):
+    """Cheap change token for a data file: file stat plus the in-process save counter"""
+    return (_file_signature(data_path(filename)), _versions.get(filename, 0))
+
+def cache_stats():
+    """Hit/miss counters for the data file cache"""
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats['entries'] = len(_cache)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+    return stats
+
+REQUIRED_FILES = ['employees.json', 'meetings.json', 'notifications.json', 'meeting_requests.json', 'manager_data.json']
+
+# Append-heavy collections: name -> (snapshot file, key of the list inside it)
+JOURNALED_COLLECTIONS = {
+    'notifications': ('notifications.json', 'notifications'),
+    'meeting_requests': ('meeting_requests.json', 'meeting_requests'),
+    'escalation_history': ('manager_data.json', 'escalation_history'),
+}
+
+# Collection name -> data file holding it, for change tokens
+COLLECTION_FILES = {
+    'employees': 'employees.json',
+    'meetings': 'meetings.json',
+    'meeting_requests': 'meeting_requests.json',
+    'notifications': 'notifications.json',
+    'escalation_history': 'manager_data.json',
+    'manager_data': 'manager_data.json',
+}
+
+class JsonRepository:
+    """Repository backed by the JSON documents in the data directory
+
+    With journal=True, notifications, meeting requests and escalation history
+    are written as appends to a JSONL journal instead of rewriting the file.
+    """
+
+    name = 'json'
+
+    def __init__(self, journal=False):
+        self.journals = {}
+        self._indexes = {}
+        self._index_lock = threading.Lock()
+        if journal:
+            from journal import Journal
+            self.journals = {
+                collection: Journal(filename, key)
+                for collection, (filename, key) in JOURNALED_COLLECTIONS.items()
+            }
+
+    def is_initialized(self):
+        return all(os.path.exists(data_path(file)) for file in REQUIRED_FILES)
+
+    def seed(self, employees_data, meeting_requests, manager_data):
+        """Replace every collection with the given default data"""
+        save_data('employees.json', employees_data)
+        save_data('meeting_requests.json', {'meeting_requests': meeting_requests})
+        save_data('meetings.json', {'meetings': [], 'requests': []})
+        save_data('notifications.json', {'notifications': []})
+        save_data('manager_data.json', manager_data)
+        for journal in self.journals.values():
+            journal.reset()
+
+    def snapshot(self):
+        """Context in which this thread's reads all see one consistent state"""
+        return pinned_reads()
+
+    def preload(self):
+        """Parse every data file (and journal) into the cache, e.g. before forking workers"""
+        for filename in sorted(set(COLLECTION_FILES.values())):
+            read_data(filename)
+        for collection in self.journals:
+            self._records(collection)
+
+    def _records(self, collection):
+        if collection in self.journals:
+            return _pinned(('records', collection), self.journals[collection].records)
+        filename, key = JOURNALED_COLLECTIONS[collection]
+        return load_data(filename).get(key, [])
+
+    # Writes return (result, version before, version after), both versions taken
+    # under the collection's write lock, for _update_index()
+    def _journal_write(self, collection, write):
+        journal = self.journals[collection]
+        with journal.write_lock():
+            before = self._version(collection)
+            result = write(journal)
+            return result, before, self._version(collection)
+
+    def _append(self, collection, record):
+        if collection in self.journals:
+            return self._journal_write(collection, lambda journal: journal.append(record))
+        filename, key = JOURNALED_COLLECTIONS[collection]
+
+        def append(document):
+            document.setdefault(key, []).append(record)
+            return record
+
+        return update_data_versioned(filename, append)
+
+    def _extend(self, collection, records, unique_key, assign_ids=False):
+        """Append records in one write, skipping those whose unique_key value is already stored
+
+        With assign_ids, records get consecutive ids after the largest stored
+        one, picked under the write lock so no two writers hand out the same id.
+        """
+        if collection in self.journals:
+            def extend_journal(journal):
+                fresh = numbered(records, next_record_id(journal.records())) if assign_ids else records
+                return journal.append_many(fresh, unique_key)
+
+            return self._journal_write(collection, extend_journal)
+        filename, key = JOURNALED_COLLECTIONS[collection]
+
+        def extend(document):
+            stored = document.setdefault(key, [])
+            fresh = unseen_records(stored, numbered(records, next_record_id(stored)) if assign_ids else records,
+                                   unique_key)
+            stored.extend(fresh)
+            return fresh
+
+        return update_data_versioned(filename, extend)
+
+    def _patch(self, collection, record_ids, changes, where=None):
+        """Apply the same changes to records by id, returning the patched records
+
+        With where, only records for which where(record) holds are patched.
+        """
+        def selected(record):
+            return record is not None and (where is None or where(record))
+
+        if collection in self.journals:
+            def patch_journal(journal):
+                ids = [record['id'] for record in map(journal.get, record_ids) if selected(record)]
+                journal.patch_many(ids, changes)
+                return [journal.get(record_id) for record_id in ids]
+
+            return self._journal_write(collection, patch_journal)
+        filename, key = JOURNALED_COLLECTIONS[collection]
+
+        def patch(document):
+            pending = set(record_ids)
+            patched = []
+            for record in document.get(key, []):
+                if record['id'] in pending:
+                    pending.discard(record['id'])
+                    if selected(record):
+                        record.update(changes)
+                        patched.append(record)
+            return patched
+
+        return update_data_versioned(filename, patch)
+
+    def version(self, collection):
+        """Change token for a collection; differs whenever any process modified it"""
+        return _pinned(('version', collection), lambda: self._version(collection))
+
+    def _version(self, collection):
+        token = data_version(COLLECTION_FILES[collection])
+        if collection in self.journals:
+            journal_file = data_path(self.journals[collection].journal_filename)
+            token += (_file_signature(journal_file),)
+        return token
+
+    def _current_index(self, collection):
+        """Sorted index over a collection, rebuilt only when another process changed it"""
+        version = self.version(collection)
+        index = self._indexes.get(collection)
+        if index is None or index.version != version:
+            records = self._records(collection)
+            if collection == 'notifications':
+                from inbox import InboxIndex
+                index = InboxIndex(records)
+            elif collection == 'meeting_requests':
+                from pagination import SortedIndex
+                index = SortedIndex(records, groups=lambda req: [req.get('from_user'), req.get('to_user')])
+            else:
+                from pagination import SortedIndex
+                index = SortedIndex(records)
+            # A write landing while the records were read could be stamped as indexed; rebuild next time instead
+            index.version = version if self._version(collection) == version else None
+            self._indexes[collection] = index
+        return index
+
+    def _update_index(self, collection, written, apply):
+        """Apply a write's (result, version before, version after) to the collection's index, returning the result
+
+        The index takes the change only if it was current just before the
+        write; otherwise (another thread or worker wrote in between) it is
+        dropped and rebuilt on the next read, so no write is ever stamped as
+        indexed without being in it.
+        """
+        result, before, after = written
+        with self._index_lock:
+            index = self._indexes.get(collection)
+            if index is not None:
+                if before is not None and index.version == before:
+                    apply(index, result)
+                    index.version = after
+                else:
+                    index.version = None
+        return result
+
+    def compact(self):
+        """Fold every journal back into its snapshot file"""
+        for journal in self.journals.values():
+            journal.compact()
+
+    # Employees
+    def list_employees(self):
+        return load_data('employees.json').get('employees', [])
+
+    def get_employee(self, employee_id):
+        return next((emp for emp in self.list_employees() if emp['id'] == employee_id), None)
+
+    def get_managers(self):
+        return load_data('employees.json').get('managers', {})
+
+    def update_employee(self, employee_id, changes):
+        """Apply changes to an employee, returning the updated record or None if missing"""
+        def update(employees_data):
+            employee = next((emp for emp in employees_data.get('employees', []) if emp['id'] == employee_id), None)
+            if employee is not None:
+                employee.update(changes)
+                return dict(employee)
+            return None
+
+        return update_data('employees.json', update)
+
+    # Meetings
+    def list_meetings(self):
+        return load_data('meetings.json').get('meetings', [])
+
+    def add_meeting(self, meeting, check=None):
+        """Store a meeting and assign its sequential id
+
+        check(newer_than), if given, runs under the write lock before the
+        meeting is stored and can raise to abort; newer_than(meeting_id)
+        lists the stored meetings after that id.
+        """
+        def add(meetings_data):
+            meetings = meetings_data.setdefault('meetings', [])
+            if check is not None:
+                # Ids are sequential, so meeting n is at position n - 1
+                check(lambda meeting_id: meetings[meeting_id:])
+            meeting['id'] = len(meetings) + 1
+            meetings.append(meeting)
+            return meeting
+
+        return update_data('meetings.json', add)
+
+    # Meeting requests
+    def list_meeting_requests_for_user(self, user_id, limit=20, before=None, after=None):
+        """Page of meeting requests sent by or to a user, most recent first"""
+        with self._index_lock:
+            return self._current_index('meeting_requests').page((user_id,), limit, before, after)
+
+    def count_meeting_requests(self, status):
+        return len([req for req in self._records('meeting_requests') if req.get('status') == status])
+
+    def list_meeting_requests_by_status(self, status):
+        return [req for req in self._records('meeting_requests') if req.get('status') == status]
+
+    def add_meeting_request(self, meeting_request):
+        return self._update_index('meeting_requests', self._append('meeting_requests', meeting_request),
+                                  lambda index, added: index.add(freeze(added)))
+
+    def update_meeting_request(self, request_id, changes):
+        """Apply changes to a meeting request, returning it or None if missing"""
+        def replace(index, patched):
+            if patched:
+                index.replace(freeze(patched[0]))
+
+        patched = self._update_index('meeting_requests', self._patch('meeting_requests', [request_id], changes),
+                                     replace)
+        return patched[0] if patched else None
+
+    # Notifications
+    def add_notification(self, notification):
+        """Store a notification under a new id, returning it or None if its delivery_key is already stored"""
+        added = self.add_notifications([notification])
+        return added[0] if added else None
+
+    def add_notifications(self, notifications):
+        """Store a batch of notifications in one write, skipping delivery_keys already stored
+
+        Each gets a new id from the store. Returns the notifications that were added.
+        """
+        def add(inbox, added):
+            for notification in added:
+                inbox.add(notification)
+
+        return self._update_index('notifications',
+                                  self._extend('notifications', notifications, 'delivery_key', assign_ids=True), add)
+
+    def list_notifications_for_user(self, user_id, limit=20, before=None, after=None):
+        """Return (page of most recent notifications, unread count) for a user"""
+        with self._index_lock:
+            inbox = self._current_index('notifications')
+            return inbox.inbox_page(user_id, limit, before, after), inbox.unread_count(user_id)
+
+    def list_unread_notification_ids(self, user_id):
+        with self._index_lock:
+            return self._current_index('notifications').unread_ids(user_id)
+
+    def mark_notification_read(self, notification_id, user_id=None):
+        return self.mark_notifications_read([notification_id], user_id) > 0
+
+    def mark_notifications_read(self, notification_ids, user_id=None):
+        """Mark several notifications read with a single write, returning how many changed
+
+        With user_id, only notifications in that user's inbox (theirs or broadcasts) are touched.
+        """
+        from inbox import visible_to
+
+        def unread(notification):
+            return not notification.get('read', False) and (user_id is None or visible_to(notification, user_id))
+
+        patched = self._update_index(
+            'notifications', self._patch('notifications', notification_ids, {'read': True}, where=unread),
+            lambda inbox, patched: inbox.mark_read([notification['id'] for notification in patched]))
+        return len(patched)
+
+    def count_unread_notifications(self, user_id=None):
+        """Unread notifications overall, or visible to one user"""
+        with self._index_lock:
+            inbox = self._current_index('notifications')
+            return inbox.total_unread if user_id is None else inbox.unread_count(user_id)
+
+    # Manager data
+    def get_coaching_scripts(self):
+        return load_data('manager_data.json').get('coaching_scripts', {})
+
+    def get_escalation_paths(self):
+        return load_data('manager_data.json').get('escalation_paths', [])
+
+    def add_escalation(self, escalation_record):
+        return self._update_index('escalation_history', self._append('escalation_history', escalation_record),
+                                  lambda index, added: index.add(freeze(added)))
+
+    def list_escalation_history(self, limit=20, before=None, after=None):
+        """Page of escalations, most recent first"""
+        with self._index_lock:
+            return self._current_index('escalation_history').page(limit=limit, before=before, after=after)
+
+    def count_escalations_since(self, since):
+        return len([e for e in self._records('escalation_history')
+                    if datetime.fromisoformat(e.get('created_at', '2025-08-01T00:00:00')) > since])
+
+_repository = None
+
+def get_repository():
+    """Return the configured storage backend (SMARTSTART_STORAGE=json|sqlite)"""
+    global _repository
+    if _repository is None:
+        backend = os.environ.get('SMARTSTART_STORAGE', 'json').lower()
+        if backend == 'sqlite':
+            from sqlite_store import SqliteRepository
+            _repository = SqliteRepository(os.environ.get('SMARTSTART_DB', data_path('smartstart.db')))
+        elif backend == 'json':
+            _repository = JsonRepository(journal=os.environ.get('SMARTSTART_JOURNAL', '0') == '1')
+        else:
+            raise ValueError(f"Unknown storage backend: {backend}")
+    return _repository
@@ -1,12 +1,25 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import re
+import os
+import time
+
+from intent_classifier import IntentClassifier, load_examples
+from intent_matcher import IntentMatcher, normalize_message
+from sessions import ResponseCache, SessionStore
 
 app = Flask(__name__)
 CORS(app)
 
+DEFAULT_RESPONSE = "I'm here to help with BPI onboarding! You can ask me about system access, benefits, leave requests, training, or workflow status. What would you like to know?"
+
+EXAMPLES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'training_examples.json')
+
+# Below this classifier confidence the keyword matcher decides, then the default reply
+MIN_CONFIDENCE = float(os.environ.get('SMARTSTART_BOT_MIN_CONFIDENCE', 0.1))
+MAX_BATCH_MESSAGES = int(os.environ.get('SMARTSTART_BOT_MAX_BATCH', 10000))
+
 class BPIChatbot:
-    def __init__(self):
+    def __init__(self, examples_file=EXAMPLES_FILE):
         self.responses = {
             'greet': "Hello! I'm your BPI SmartStart assistant. How can I help you with your onboarding today?",
             'system_access': """To request system access at BPI:
@@ -53,39 +66,195 @@ Which training do you need information about?""",
             'goodbye': "Thank you for using SmartStart! If you need more help with your onboarding, just ask. Have a great day at BPI!"
         }
         
-        self.patterns = {
-            'greet': r'hello|hi|hey|good morning|good afternoon|greetings',
-            'system_access': r'system|access|login|account|password|CBS|VPN|IT|computer|software',
-            'benefits_payroll': r'benefit|payroll|salary|insurance|health|HR|retirement|medical',
-            'leave_request': r'leave|vacation|sick|time off|holiday|absence|day off',
-            'workflow_status': r'workflow|complete|status|progress|done|finished|tracking',
-            'training_compliance': r'training|AMLA|BSP|compliance|certification|regulation|course',
-            'goodbye': r'bye|goodbye|thank|thanks|see you|farewell'
+        # Answers to the questions some replies end with ("Need help with specific systems?")
+        self.follow_up_responses = {
+            'system_access': {
+                'vpn': """Setting up VPN access at BPI:
+
+1. Request VPN access in the IT Service Portal (Remote Access category)
+2. Your supervisor approves the request
+3. IT sends the VPN client installer and your token setup instructions
+4. Connect using your network ID and the one-time code from your token
+
+Connection problems? Call the IT Service Desk and mention your laptop's asset tag.""",
+                'cbs': """Getting Core Banking System (CBS) access:
+
+1. Your supervisor raises a CBS access request with the role you need
+2. Complete the CBS user training assigned to your role
+3. Information Security reviews the request for segregation of duties
+4. IT creates your CBS user ID and sends first-login instructions
+
+CBS access usually takes 3-5 business days because of the security review.""",
+                'password': """Resetting a password at BPI:
+
+1. Use the self-service password reset on the IT Service Portal
+2. Verify with your registered mobile number or security questions
+3. Pick a new password (at least 12 characters, not one of your last 5)
+
+Locked out after too many attempts? Call the IT Service Desk to unlock your account."""
+            },
+            'training_compliance': {
+                'amla': """AMLA Training:
+
+- Required for all employees within 30 days of joining, then every year
+- Covers anti-money laundering rules, red flags and suspicious transaction reporting
+- Take it on the e-learning portal; a passing score of 80% earns your certificate""",
+                'bsp': """BSP Regulations Modules:
+
+- Cover the Bangko Sentral ng Pilipinas rules that apply to your role
+- Assigned automatically based on your department
+- Complete them on the e-learning portal within your first 60 days""",
+                'data_privacy': """Data Privacy Certification:
+
+- Mandatory for everyone who handles client or employee data
+- Covers the Data Privacy Act, data handling and breach reporting
+- Complete the course and assessment on the e-learning portal and keep your certificate"""
+            }
         }
-    
-    def get_response(self, message):
-        message_lower = message.lower()
+        self.follow_ups = {intent: IntentMatcher(topics) for intent, topics in {
+            'system_access': {
+                'vpn': ['VPN', 'remote access', 'work from home'],
+                'cbs': ['CBS', 'core banking'],
+                'password': ['password', 'reset', 'locked out', 'unlock']
+            },
+            'training_compliance': {
+                'amla': ['AMLA', 'money laundering'],
+                'bsp': ['BSP', 'Bangko Sentral', 'banking regulation'],
+                'data_privacy': ['data privacy', 'privacy', 'DPA']
+            }
+        }.items()}
         
-        for intent, pattern in self.patterns.items():
-            if re.search(pattern, message_lower):
-                return self.responses[intent]
+        self.keywords = {
+            'greet': ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'greetings'],
+            'system_access': ['system', 'access', 'login', 'account', 'password', 'CBS', 'VPN', 'IT', 'computer', 'software'],
+            'benefits_payroll': ['benefit', 'payroll', 'salary', 'insurance', 'health', 'HR', 'retirement', 'medical'],
+            'leave_request': ['leave', 'vacation', 'sick', 'time off', 'holiday', 'absence', 'day off'],
+            'workflow_status': ['workflow', 'complete', 'status', 'progress', 'done', 'finished', 'tracking'],
+            'training_compliance': ['training', 'AMLA', 'BSP', 'compliance', 'certification', 'regulation', 'course'],
+            'goodbye': ['bye', 'goodbye', 'thank', 'thanks', 'see you', 'farewell']
+        }
         
-        return "I'm here to help with BPI onboarding! You can ask me about system access, benefits, leave requests, training, or workflow status. What would you like to know?"
+        # Small talk only wins when the message is about nothing else
+        self.matcher = IntentMatcher(self.keywords, priority=[
+            'system_access', 'benefits_payroll', 'leave_request', 'workflow_status',
+            'training_compliance', 'greet', 'goodbye'
+        ])
+        self.classifier = IntentClassifier(load_examples(examples_file))
+        self.sessions = SessionStore()
+        self.response_cache = ResponseCache()
+    
+    def classify_batch(self, messages):
+        """[(intent or None, confidence, source)] for many messages, scored in one vectorized call
+
+        source is 'classifier', 'keywords' when the classifier wasn't confident
+        but a keyword matched, or 'default' when neither found an intent.
+        """
+        results = []
+        for message, (intent, confidence) in zip(messages, self.classifier.predict(messages)):
+            if confidence >= MIN_CONFIDENCE:
+                results.append((intent, confidence, 'classifier'))
+            else:
+                intent = self.matcher.match(message)
+                results.append((intent, confidence, 'keywords' if intent else 'default'))
+        return results
+    
+    def classify(self, message):
+        """Intent of a message, or None if it matches none"""
+        return self.classify_batch([message])[0][0]
+    
+    def answers(self, messages):
+        """Reply, intent and confidence for each message"""
+        return [{
+            'text': self.responses.get(intent, DEFAULT_RESPONSE),
+            'intent': intent,
+            'confidence': round(confidence, 3),
+            'source': source
+        } for intent, confidence, source in self.classify_batch(messages)]
+    
+    def respond(self, message, sender=None):
+        """Answer one message, in the context of the sender's conversation if there is one
+        
+        A message about one of the topics the previous reply asked about gets
+        the specific answer; anything else is classified, with results
+        cached by normalized message.
+        """
+        last_intent = self.sessions.last_intent(sender) if sender else None
+        topic = self.follow_ups[last_intent].match(message) if last_intent in self.follow_ups else None
+        if topic is not None:
+            answer = {
+                'text': self.follow_up_responses[last_intent][topic],
+                'intent': last_intent,
+                'confidence': None,
+                'source': 'follow_up',
+                'topic': topic,
+                'cached': False
+            }
+        else:
+            key = normalize_message(message)
+            result = self.response_cache.get(key)
+            cached = result is not None
+            if not cached:
+                result = self.classify_batch([message])[0]
+                self.response_cache.put(key, result)
+            intent, confidence, source = result
+            answer = {
+                'text': self.responses.get(intent, DEFAULT_RESPONSE),
+                'intent': intent,
+                'confidence': round(confidence, 3),
+                'source': source,
+                'cached': cached
+            }
+        if sender:
+            self.sessions.record(sender, message, answer['intent'])
+        return answer
+    
+    def get_response(self, message):
+        return self.responses.get(self.classify(message), DEFAULT_RESPONSE)
 
 chatbot = BPIChatbot()
 
 @app.route('/webhooks/rest/webhook', methods=['POST'])
 def chat():
     user_message = request.json.get('message', '')
-    response = chatbot.get_response(user_message)
+    answer = chatbot.respond(user_message, request.json.get('sender'))
+    
+    return jsonify([{'text': answer.pop('text'), 'custom': answer}])
+
+@app.route('/webhooks/rest/batch', methods=['POST'])
+def chat_batch():
+    """Classify and answer many messages in one call, e.g. to replay chat logs"""
+    body = request.get_json(silent=True)
+    messages = body.get('messages') if isinstance(body, dict) else None
+    if not isinstance(messages, list):
+        return jsonify({'error': 'messages must be a list of strings or {sender, message} objects'}), 400
+    if len(messages) > MAX_BATCH_MESSAGES:
+        return jsonify({'error': f'At most {MAX_BATCH_MESSAGES} messages per batch'}), 413
+    texts = [item.get('message', '') if isinstance(item, dict) else item for item in messages]
+    if not all(isinstance(text, str) for text in texts):
+        return jsonify({'error': 'messages must be a list of strings or {sender, message} objects'}), 400
+    
+    started = time.perf_counter()
+    results = chatbot.answers(texts)
+    for item, result in zip(messages, results):
+        if isinstance(item, dict) and 'sender' in item:
+            result['sender'] = item['sender']
     
-    return jsonify([{'text': response}])
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+    })
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'BPI SmartStart Chatbot is running!'})
+    return jsonify({
+        'status': 'BPI SmartStart Chatbot is running!',
+        'sessions': chatbot.sessions.stats(),
+        'response_cache': chatbot.response_cache.stats()
+    })
 
 if __name__ == '__main__':
     print("🤖 BPI SmartStart Chatbot is running on http://localhost:5005")
     print("📋 Ready to help with BPI onboarding questions!")
+    print("⚠️  Development server; run python serve.py in production")
     app.run(host='0.0.0.0', port=5005, debug=True)
\ No newline at end of file
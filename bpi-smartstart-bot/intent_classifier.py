@@ -0,0 +1,112 @@
+import json
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+WORD = re.compile(r'\w+')
+
+# Crude stemming so "requests", "requested" and "requesting" share a feature
+STEM_SUFFIXES = ('ing', 'ed', 'es', 's')
+MIN_STEM_LENGTH = 4
+
+# Function words carry no intent, but would make every question look alike
+STOP_WORDS = frozenset('''
+a about am an and any are as at be can could did do does for from get got had has have how i i'm if in is
+it its me my of on or our should so that the there this to was we what when where which who will with would
+you your
+'''.split())
+
+def stem(word):
+    for suffix in STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+def features(message):
+    """Stemmed words and adjacent word pairs of a message"""
+    words = [stem(word) for word in WORD.findall(message.lower()) if word not in STOP_WORDS]
+    return words + [f'{first} {second}' for first, second in zip(words, words[1:])]
+
+def load_examples(path):
+    """{intent: [example messages]} from a JSON file"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+class IntentClassifier:
+    """Nearest-centroid intent classifier over TF-IDF features
+
+    Trained from labeled examples when constructed: each intent's centroid
+    is the normalized mean of its examples' L2-normalized TF-IDF vectors,
+    kept as one dense (vocabulary x intents) matrix. Messages become sparse
+    rows in CSR form (indptr, indices, data) and are scored all at once:
+    each stored feature weight selects and scales its row of the centroid
+    matrix, and np.add.reduceat sums those rows per message. A message's
+    score for an intent is the cosine similarity to its centroid, and the
+    best score is reported as the confidence (0 when no known feature
+    occurs).
+    """
+
+    def __init__(self, examples):
+        self.intents = list(examples)
+        documents, labels = [], []
+        for label, intent in enumerate(self.intents):
+            for example in examples[intent]:
+                documents.append(Counter(features(example)))
+                labels.append(label)
+
+        document_frequency = Counter(feature for document in documents for feature in document)
+        self.vocabulary = {feature: index for index, feature in enumerate(sorted(document_frequency))}
+        self.idf = np.array([math.log((1 + len(documents)) / (1 + document_frequency[feature])) + 1
+                             for feature in sorted(document_frequency)])
+
+        indptr, indices, data = self._vectorize(documents)
+        centroids = np.zeros((len(self.vocabulary), len(self.intents)))
+        rows = np.repeat(np.arange(len(documents)), np.diff(indptr))
+        np.add.at(centroids, (indices, np.array(labels)[rows]), data)
+        norms = np.linalg.norm(centroids, axis=0)
+        self.centroids = centroids / np.where(norms > 0, norms, 1)
+
+    def _vectorize(self, documents):
+        """CSR arrays of L2-normalized TF-IDF rows for feature Counters"""
+        indptr, indices, counts = [0], [], []
+        vocabulary = self.vocabulary
+        for document in documents:
+            for feature, count in document.items():
+                index = vocabulary.get(feature)
+                if index is not None:
+                    indices.append(index)
+                    counts.append(count)
+            indptr.append(len(indices))
+        indptr = np.array(indptr)
+        indices = np.array(indices, dtype=np.intp)
+        data = (1 + np.log(np.array(counts, dtype=float))) * self.idf[indices]
+
+        lengths = np.diff(indptr)
+        nonempty = lengths > 0
+        norms = np.zeros(len(documents))
+        if data.size:
+            norms[nonempty] = np.sqrt(np.add.reduceat(data * data, indptr[:-1][nonempty]))
+        data /= np.repeat(np.where(norms > 0, norms, 1), lengths)
+        return indptr, indices, data
+
+    def scores(self, messages):
+        """(messages x intents) cosine similarities"""
+        indptr, indices, data = self._vectorize([Counter(features(message)) for message in messages])
+        scores = np.zeros((len(messages), len(self.intents)))
+        nonempty = np.diff(indptr) > 0
+        if data.size:
+            # reduceat sums each message's slice; empty rows would pick up a neighbour's value, so skip them
+            scores[nonempty] = np.add.reduceat(self.centroids[indices] * data[:, None],
+                                               indptr[:-1][nonempty], axis=0)
+        return scores
+
+    def predict(self, messages):
+        """[(intent, confidence)] for a list of messages"""
+        scores = self.scores(messages)
+        if not len(messages):
+            return []
+        best = scores.argmax(axis=1)
+        confidence = scores[np.arange(len(messages)), best]
+        return [(self.intents[label], float(score)) for label, score in zip(best, confidence)]
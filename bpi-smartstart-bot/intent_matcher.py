@@ -0,0 +1,85 @@
+import re
+
+WORD = re.compile(r'\w+')
+
+# Inflections accepted after keywords of at least MIN_SUFFIX_LENGTH letters ("benefits", "completed")
+SUFFIXES = ('s', 'es', 'ed', 'd', 'ing')
+MIN_SUFFIX_LENGTH = 4
+
+def keyword_forms(keyword):
+    """Lower-cased spellings that count as the keyword"""
+    keyword = ' '.join(keyword.lower().split())
+    forms = [keyword]
+    if len(keyword.rsplit(' ', 1)[-1]) >= MIN_SUFFIX_LENGTH:
+        forms += [keyword + suffix for suffix in SUFFIXES]
+    return forms
+
+def is_case_sensitive(keyword):
+    """Short acronyms written in capitals (IT, HR) only count in capitals, so "is it done?" isn't about IT"""
+    return keyword.isupper() and len(keyword) <= 2
+
+def normalize_message(message):
+    """Message reduced to what matching looks at: its words, lower-cased except case-sensitive acronyms
+
+    Messages with the same normalized form always get the same intent, so it
+    works as a cache key ("Hi!" and "hi" share one entry, "IT" and "it" don't).
+    """
+    return ' '.join(word if is_case_sensitive(word) else word.lower() for word in WORD.findall(message))
+
+class IntentMatcher:
+    """Scores every intent in one pass over the words of a message
+
+    Keywords are expanded once into lookup tables of whole words and short
+    phrases (every accepted inflection included), so matching is a
+    dictionary lookup per word instead of a regex search per intent, and
+    "hi" no longer matches inside "this". Each keyword occurrence counts one
+    point for its intent; the intent with the most points wins, ties going
+    to the one listed first in priority (by default the order of keywords).
+    """
+
+    def __init__(self, keywords, priority=None):
+        self.priority = list(priority or keywords)
+        self._rank = {intent: rank for rank, intent in enumerate(self.priority)}
+        self._words = {}
+        self._exact_case = {}
+        self._phrases = {}
+        for intent, intent_keywords in keywords.items():
+            for keyword in intent_keywords:
+                if is_case_sensitive(keyword):
+                    self._exact_case.setdefault(keyword, intent)
+                    continue
+                for form in keyword_forms(keyword):
+                    table = self._phrases if ' ' in form else self._words
+                    table.setdefault(form, intent)
+        self._phrase_lengths = sorted({phrase.count(' ') + 1 for phrase in self._phrases})
+        # Last words of phrases: only these words need the phrase lookups
+        self._phrase_ends = {phrase.rsplit(' ', 1)[1] for phrase in self._phrases}
+        self._window = max(self._phrase_lengths, default=0)
+
+    def scores(self, message):
+        """Keyword hits per intent"""
+        scores = {}
+        recent = []
+        words, exact_case, phrase_ends = self._words, self._exact_case, self._phrase_ends
+        for word in WORD.findall(message):
+            lowered = word.lower()
+            intent = words.get(lowered) or exact_case.get(word)
+            if intent is not None:
+                scores[intent] = scores.get(intent, 0) + 1
+            if self._window:
+                recent.append(lowered)
+                if len(recent) > self._window:
+                    del recent[0]
+                if lowered in phrase_ends:
+                    for length in self._phrase_lengths:
+                        intent = self._phrases.get(' '.join(recent[-length:])) if len(recent) >= length else None
+                        if intent is not None:
+                            scores[intent] = scores.get(intent, 0) + 1
+        return scores
+
+    def match(self, message):
+        """Best-scoring intent for a message, or None if no keyword occurs"""
+        scores = self.scores(message)
+        if len(scores) <= 1:
+            return next(iter(scores), None)
+        return min(scores, key=lambda intent: (-scores[intent], self._rank[intent]))
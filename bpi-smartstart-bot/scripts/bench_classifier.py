@@ -0,0 +1,64 @@
+"""Accuracy and batch throughput of the chatbot's TF-IDF intent classifier
+
+Runs data/regression_corpus.json through the full routing (classifier,
+then keywords below the confidence threshold, then the default reply) and
+through the classifier alone, then times classifying the corpus repeated
+as one batch against one message per call, the way the webhook does.
+
+    python scripts/bench_classifier.py
+    python scripts/bench_classifier.py --messages 100000 --batch 5000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BOT_DIR)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', default=os.path.join(BOT_DIR, 'data', 'regression_corpus.json'))
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--batch', type=int, default=5000, help='messages per batch call')
+    args = parser.parse_args()
+
+    from bpi_chatbot import MIN_CONFIDENCE, chatbot
+
+    with open(args.corpus) as f:
+        corpus = json.load(f)
+    texts = [case['message'] for case in corpus]
+
+    failures = 0
+    sources = {}
+    for case, (intent, confidence, source) in zip(corpus, chatbot.classify_batch(texts)):
+        sources[source] = sources.get(source, 0) + 1
+        if intent != case['intent']:
+            failures += 1
+            print(f"❌ {case['message']!r}: expected {case['intent']}, got {intent} ({source}, {confidence:.3f})")
+    on_topic = [(case, prediction) for case, prediction in zip(corpus, chatbot.classifier.predict(texts))
+                if case['intent'] is not None]
+    classifier_correct = sum(1 for case, (intent, _) in on_topic if intent == case['intent'])
+    print(f'routing: {len(corpus) - failures}/{len(corpus)} correct, decided by {sources} '
+          f'(threshold {MIN_CONFIDENCE})')
+    print(f'classifier alone: {classifier_correct}/{len(on_topic)} on-topic questions correct')
+
+    messages = (texts * (args.messages // len(texts) + 1))[:args.messages]
+    chatbot.classify_batch(messages[:1000])
+    started = time.perf_counter()
+    for start in range(0, len(messages), args.batch):
+        chatbot.classify_batch(messages[start:start + args.batch])
+    batched = len(messages) / (time.perf_counter() - started)
+
+    single_messages = messages[:min(len(messages), 10000)]
+    started = time.perf_counter()
+    for message in single_messages:
+        chatbot.classify_batch([message])
+    single = len(single_messages) / (time.perf_counter() - started)
+    print(f'batches of {args.batch}: {batched:,.0f} messages/s')
+    print(f'one per call:     {single:,.0f} messages/s ({batched / single:.1f}x)')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Regression check and throughput benchmark for the chatbot's intent matcher
+
+Classifies every question in data/regression_corpus.json and fails if any
+lands on a different intent than listed (null means the default reply).
+Then measures messages per second for the compiled single-pass matcher and
+for the original first-match regex loop, over the corpus repeated.
+
+    python scripts/bench_intents.py
+    python scripts/bench_intents.py --messages 200000
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BOT_DIR)
+
+# The matcher as it was before: uncompiled searches on the lower-cased message, first match wins
+LEGACY_PATTERNS = {
+    'greet': r'hello|hi|hey|good morning|good afternoon|greetings',
+    'system_access': r'system|access|login|account|password|CBS|VPN|IT|computer|software',
+    'benefits_payroll': r'benefit|payroll|salary|insurance|health|HR|retirement|medical',
+    'leave_request': r'leave|vacation|sick|time off|holiday|absence|day off',
+    'workflow_status': r'workflow|complete|status|progress|done|finished|tracking',
+    'training_compliance': r'training|AMLA|BSP|compliance|certification|regulation|course',
+    'goodbye': r'bye|goodbye|thank|thanks|see you|farewell'
+}
+
+def legacy_classify(message):
+    message_lower = message.lower()
+    for intent, pattern in LEGACY_PATTERNS.items():
+        if re.search(pattern, message_lower):
+            return intent
+    return None
+
+def throughput(classify, messages):
+    started = time.perf_counter()
+    for message in messages:
+        classify(message)
+    return len(messages) / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', default=os.path.join(BOT_DIR, 'data', 'regression_corpus.json'))
+    parser.add_argument('--messages', type=int, default=100000)
+    args = parser.parse_args()
+
+    from bpi_chatbot import chatbot
+
+    with open(args.corpus) as f:
+        corpus = json.load(f)
+
+    failures = 0
+    legacy_correct = 0
+    for case in corpus:
+        got = chatbot.matcher.match(case['message'])
+        legacy_correct += legacy_classify(case['message']) == case['intent']
+        if got != case['intent']:
+            failures += 1
+            print(f"❌ {case['message']!r}: expected {case['intent']}, got {got}")
+    print(f'corpus: {len(corpus) - failures}/{len(corpus)} correct '
+          f'(first-match regex loop: {legacy_correct}/{len(corpus)})')
+
+    messages = [case['message'] for case in corpus] * (args.messages // len(corpus) + 1)
+    messages = messages[:args.messages]
+    throughput(chatbot.matcher.match, messages[:1000])
+    compiled = throughput(chatbot.matcher.match, messages)
+    legacy = throughput(legacy_classify, messages)
+    print(f'compiled single pass: {compiled:,.0f} messages/s')
+    print(f'first-match loop:     {legacy:,.0f} messages/s ({compiled / legacy:.1f}x)')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Load test for the chatbot webhook at rising concurrency
+
+Each client thread keeps one HTTP connection open and posts questions from
+data/regression_corpus.json as its own sender for a fixed time per level.
+Clients are spread over up to one process per CPU so the load generator's
+own GIL doesn't cap the numbers. Reports requests per second and p50/p99
+latency for every concurrency level.
+Start the server first, e.g. python serve.py --workers 2 --threads 8.
+
+    python scripts/load_test.py
+    python scripts/load_test.py --url http://127.0.0.1:5005 --levels 1,4,16,64 --seconds 10
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEBHOOK_PATH = '/webhooks/rest/webhook'
+
+def client(host, port, sender, messages, deadline, latencies, errors):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    i = 0
+    while time.perf_counter() < deadline:
+        body = json.dumps({'sender': sender, 'message': messages[i % len(messages)]})
+        i += 1
+        started = time.perf_counter()
+        try:
+            connection.request('POST', WEBHOOK_PATH, body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(type(exc).__name__)
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+
+def run_clients(host, port, level, first, count, messages, seconds):
+    """Run clients first..first+count-1 in threads, returning (latencies, errors, elapsed seconds)"""
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + seconds
+    threads = [threading.Thread(target=client, args=(host, port, f'load-{level}-{i}',
+                                                     messages[i % len(messages):] + messages[:i % len(messages)],
+                                                     deadline, latencies, errors))
+               for i in range(first, first + count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+def percentile(sorted_values, share):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * share))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5005')
+    parser.add_argument('--levels', default='1,2,4,8,16,32', help='concurrent clients per step')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='load generator processes')
+    args = parser.parse_args()
+
+    target = urlsplit(args.url)
+    with open(os.path.join(BOT_DIR, 'data', 'regression_corpus.json')) as f:
+        messages = [case['message'] for case in json.load(f)]
+
+    print(f"{'clients':>7} {'requests':>9} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for level in [int(level) for level in args.levels.split(',')]:
+        processes = max(1, min(level, args.processes))
+        shares = [level // processes + (i < level % processes) for i in range(processes)]
+        jobs = [(target.hostname, target.port or 80, level, sum(shares[:i]), share, messages, args.seconds)
+                for i, share in enumerate(shares)]
+        if processes == 1:
+            results = [run_clients(*jobs[0])]
+        else:
+            with multiprocessing.Pool(processes) as pool:
+                results = pool.starmap(run_clients, jobs)
+        elapsed = max(result[2] for result in results)
+        latencies = [latency for result in results for latency in result[0]]
+        errors = [error for result in results for error in result[1]]
+        if not latencies:
+            print(f'{level:>7} {0:>9} {len(errors):>6}  no successful requests')
+            continue
+        latencies.sort()
+        print(f'{level:>7} {len(latencies):>9} {len(errors):>6} {len(latencies) / elapsed:>9,.0f} '
+              f'{percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
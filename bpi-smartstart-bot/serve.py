@@ -0,0 +1,80 @@
+"""Production entry point for the chatbot webhook under gunicorn
+
+The app, its intent tables and the classifier are loaded once in the master
+before workers fork, so workers start warm and share those pages. Debug
+mode stays off. SIGTERM (or Ctrl-C) stops accepting connections and gives
+in-flight requests up to the graceful timeout to finish.
+
+Conversation sessions and the response cache live in each worker process,
+so follow-up questions only keep their context when a sender's messages
+reach the same worker: with more than one worker, put a proxy in front
+that routes by sender, or scale with threads instead.
+
+    pip install gunicorn
+    python serve.py
+    python serve.py --workers 4 --threads 8 --bind 0.0.0.0:5005
+"""
+import argparse
+import os
+import sys
+import time
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    sys.exit('gunicorn is not installed: pip install gunicorn')
+
+BIND = os.environ.get('SMARTSTART_BOT_BIND', '0.0.0.0:5005')
+WORKERS = int(os.environ.get('SMARTSTART_BOT_WORKERS', 1))
+THREADS = int(os.environ.get('SMARTSTART_BOT_THREADS', 8))
+TIMEOUT = int(os.environ.get('SMARTSTART_BOT_TIMEOUT', 30))
+GRACEFUL_TIMEOUT = int(os.environ.get('SMARTSTART_BOT_GRACEFUL_TIMEOUT', 20))
+
+class ChatbotServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        started = time.perf_counter()
+        from bpi_chatbot import app, chatbot
+        app.debug = False
+        # The first classification pays for numpy's lazy set-up; do it before fork too
+        chatbot.classify_batch(['hello'])
+        print(f'📋 Intent tables and classifier loaded in {(time.perf_counter() - started) * 1000:.0f}ms')
+        return app
+
+def when_ready(server):
+    print(f"🤖 BPI SmartStart Chatbot is running on http://{server.cfg.bind[0]} "
+          f"({server.cfg.workers} workers x {server.cfg.threads} threads)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bind', default=BIND)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--threads', type=int, default=THREADS)
+    parser.add_argument('--timeout', type=int, default=TIMEOUT, help='seconds before a stuck worker is restarted')
+    parser.add_argument('--graceful-timeout', type=int, default=GRACEFUL_TIMEOUT,
+                        help='seconds in-flight requests get to finish on shutdown')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    ChatbotServer({
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'keepalive': 5,
+        'accesslog': None,
+        'when_ready': when_ready,
+    }).run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+MAX_SESSIONS = int(os.environ.get('SMARTSTART_BOT_MAX_SESSIONS', 10000))
+SESSION_TTL_SECONDS = float(os.environ.get('SMARTSTART_BOT_SESSION_TTL', 30 * 60))
+MAX_TURNS = 5
+RESPONSE_CACHE_SIZE = int(os.environ.get('SMARTSTART_BOT_RESPONSE_CACHE', 5000))
+
+# Rough per-object sizes for the memory estimate in stats()
+TURN_BYTES = sys.getsizeof(('', None))
+
+def _hit_rate(hits, misses):
+    return round(hits / (hits + misses), 3) if hits + misses else None
+
+class Session:
+    __slots__ = ('sender', 'last_intent', 'turns', 'last_seen', 'size')
+
+    def __init__(self, sender, now):
+        self.sender = sender
+        self.last_intent = None
+        self.turns = deque(maxlen=MAX_TURNS)
+        self.last_seen = now
+        self.size = sys.getsizeof(self) + sys.getsizeof(self.turns) + sys.getsizeof(sender)
+
+class SessionStore:
+    """Recent conversation state per sender, bounded by count (LRU) and idle time (TTL)
+
+    Sessions are kept in access order, so the least recently used one is
+    always first: expired sessions are dropped from the front on every
+    access, and the front is evicted when the store is full. Each session
+    keeps the last intent and the last MAX_TURNS (message, intent) turns.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL_SECONDS, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self.counters = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+
+    def _drop(self, session):
+        del self._sessions[session.sender]
+        self._bytes -= session.size
+
+    def _expire(self, now):
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_seen < self.ttl:
+                break
+            self._drop(session)
+            self.counters['expired'] += 1
+
+    def last_intent(self, sender):
+        """Intent of the sender's previous message, or None for a new or expired conversation"""
+        with self._lock:
+            self._expire(self.clock())
+            session = self._sessions.get(sender)
+            if session is None:
+                self.counters['misses'] += 1
+                return None
+            self.counters['hits'] += 1
+            return session.last_intent
+
+    def record(self, sender, message, intent):
+        """Add a turn to the sender's conversation, starting one if needed"""
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(sender)
+            if session is None:
+                session = self._sessions[sender] = Session(sender, now)
+                self._bytes += session.size
+                if len(self._sessions) > self.max_sessions:
+                    self._drop(next(iter(self._sessions.values())))
+                    self.counters['evicted'] += 1
+            else:
+                self._sessions.move_to_end(sender)
+            if len(session.turns) == session.turns.maxlen:
+                dropped = sys.getsizeof(session.turns[0][0]) + TURN_BYTES
+                session.size -= dropped
+                self._bytes -= dropped
+            session.turns.append((message, intent))
+            added = sys.getsizeof(message) + TURN_BYTES
+            session.size += added
+            self._bytes += added
+            if intent is not None:
+                session.last_intent = intent
+            session.last_seen = now
+
+    def turns(self, sender):
+        """The sender's recent (message, intent) turns, oldest first"""
+        with self._lock:
+            session = self._sessions.get(sender)
+            return list(session.turns) if session is not None else []
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, sessions=len(self._sessions), max_sessions=self.max_sessions,
+                        ttl_seconds=self.ttl, hit_rate=_hit_rate(self.counters['hits'], self.counters['misses']),
+                        approx_bytes=self._bytes)
+
+class ResponseCache:
+    """LRU cache of classification results keyed by normalized message"""
+
+    def __init__(self, max_size=RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.counters = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            old_value = self._entries.pop(key, None)
+            if old_value is not None:
+                self._bytes -= sys.getsizeof(key) + sys.getsizeof(old_value)
+            self._entries[key] = value
+            self._bytes += sys.getsizeof(key) + sys.getsizeof(value)
+            if len(self._entries) > self.max_size:
+                old_key, old_value = self._entries.popitem(last=False)
+                self._bytes -= sys.getsizeof(old_key) + sys.getsizeof(old_value)
+                self.counters['evicted'] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, entries=len(self._entries), max_entries=self.max_size,
+                        hit_rate=_hit_rate(self.counters['hits'], self.counters['misses']),
+                        approx_bytes=self._bytes)